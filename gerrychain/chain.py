@@ -1,4 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from .checkpoint import load_checkpoint, restore_constraints, restore_partition
 from .constraints import Validator
+from .instrumentation import Instrumentation
+from .partition import MutablePartition, Partition
+from .random import random
 
 
 class MarkovChain:
@@ -16,7 +22,22 @@ class MarkovChain:
 
     """
 
-    def __init__(self, proposal, constraints, accept, initial_state, total_steps=1000):
+    def __init__(
+        self,
+        proposal,
+        constraints,
+        accept,
+        initial_state,
+        total_steps=1000,
+        in_place=False,
+        instrumentation=None,
+        checkpoint=None,
+        burn_in=0,
+        thin=1,
+        speculate=1,
+        executor=None,
+        monitor=None,
+    ):
         """
         :param proposal: Function proposing the next state from the current state.
         :param constraints: A function with signature ``Partition -> bool`` determining whether
@@ -27,8 +48,57 @@ class MarkovChain:
             Metropolis-Hastings acceptance rule, this is where you would implement it.
         :param initial_state: Initial :class:`gerrychain.partition.Partition` class.
         :param total_steps: Number of steps to run.
+        :param in_place: (optional, default False) Whether to run the chain on a
+            single :class:`~gerrychain.partition.MutablePartition` that is flipped in
+            place and rolled back when a proposal is invalid or rejected, instead of
+            building a new partition at every step. The chain then yields that same
+            object at every step (in its current state), so save whatever you need
+            from it inside the loop. The proposal must call ``partition.flip`` on the
+            state it is given.
+        :param instrumentation: (optional) An
+            :class:`~gerrychain.instrumentation.Instrumentation` to record the time
+            spent in each stage, constraint, and updater into, or ``True`` to create
+            one. It is available as ``chain.instrumentation``. Disabled by default.
+        :param checkpoint: (optional) A :class:`~gerrychain.checkpoint.Checkpointer`
+            that periodically saves a snapshot of the chain, which :meth:`resume`
+            can continue from.
+        :param burn_in: (optional) The number of initial steps to run without
+            yielding their states.
+        :param thin: (optional) Yield only every ``thin``-th state after the burn-in.
+            The skipped states are still checked and accepted, but no updater is
+            computed on them beyond those the proposal, constraints, and
+            acceptance function use.
+        :param speculate: (optional) The number of proposals to draw from the
+            current state at a time. When greater than 1, the constraints are
+            checked on all of them concurrently, and the first valid proposal in
+            the order they were drawn is used, so the chain samples from the same
+            distribution as when proposals are drawn one at a time. This saves time
+            when most proposals are invalid and the constraints are expensive (and
+            release the GIL, or run in other processes). Constraints should not
+            change shared state, since they run concurrently. Not available for
+            in-place or instrumented chains, since the instrumentation's counters
+            and timings are not safe to update from several threads.
+        :param executor: (optional) The :class:`concurrent.futures.Executor` that
+            checks the speculative proposals. Defaults to a thread pool with
+            ``speculate`` threads, which is shut down when the chain stops. An
+            executor that is passed in is left running.
+        :param monitor: (optional) A
+            :class:`~gerrychain.diagnostics.ConvergenceMonitor` that is updated with
+            the chain's current state at each yielded step. The chain stops early
+            once the monitor's targets are met.
 
         """
+        if burn_in < 0:
+            raise ValueError("burn_in must be non-negative.")
+        if thin < 1:
+            raise ValueError("thin must be at least 1.")
+        if speculate < 1:
+            raise ValueError("speculate must be at least 1.")
+        if speculate > 1 and in_place:
+            raise ValueError("In-place chains cannot draw speculative proposals.")
+        if speculate > 1 and instrumentation:
+            raise ValueError("Speculative chains cannot be instrumented.")
+
         if callable(constraints):
             is_valid = constraints
         else:
@@ -46,27 +116,105 @@ class MarkovChain:
             )
             raise ValueError(message)
 
+        if instrumentation is True:
+            instrumentation = Instrumentation()
+        if instrumentation is not None:
+            if isinstance(is_valid, Validator):
+                is_valid = Validator(
+                    [instrumentation.constraint(c) for c in is_valid.constraints],
+                    adaptive=is_valid.adaptive,
+                    reorder_every=is_valid.reorder_every,
+                )
+            proposal = instrumentation.stage("proposal", proposal, count_failures=False)
+            is_valid = instrumentation.stage("constraints", is_valid)
+            accept = instrumentation.stage("accept", accept)
+
         self.proposal = proposal
         self.is_valid = is_valid
         self.accept = accept
+        self.instrumentation = instrumentation
         self.total_steps = total_steps
+        self.burn_in = burn_in
+        self.thin = thin
+        self.speculate = speculate
+        self.executor = executor
+        self.monitor = monitor
+        self.in_place = in_place
+        self.checkpoint = checkpoint
         self.initial_state = initial_state
         self.state = initial_state
+        self._resume_from = None
+        self._thread_pool = None
+        self._keep_parents = False
+
+    @classmethod
+    def resume(
+        cls, path, proposal, constraints, accept, initial_state, total_steps=1000, **kwargs
+    ):
+        """Continue a chain from a snapshot saved by a
+        :class:`~gerrychain.checkpoint.Checkpointer`. Iterating over the returned
+        chain yields the remaining states of the original run, exactly as the
+        original run would have.
+
+        :param path: The checkpoint file.
+        :param proposal: The proposal of the original chain.
+        :param constraints: New constraints, configured as for the original chain.
+            Their saved state (e.g. self-configured bounds) is restored.
+        :param accept: The acceptance function of the original chain.
+        :param initial_state: The initial state of the original chain. The resumed
+            state uses its graph, updaters, and class.
+        :param total_steps: The total number of steps of the original chain.
+        :param kwargs: Other arguments to pass to :class:`MarkovChain`.
+        """
+        data = load_checkpoint(path)
+        restore_constraints(constraints, data["constraints"])
+        state = restore_partition(data, initial_state)
+        chain = cls(proposal, constraints, accept, state, total_steps, **kwargs)
+        chain._resume_from = (data["counter"], data["random_state"])
+        return chain
 
     def __iter__(self):
         self.counter = 0
-        self.state = self.initial_state
+        if self._resume_from is not None:
+            self.counter, random_state = self._resume_from
+            random.setstate(random_state)
+        if self.in_place:
+            self.state = self._instrument(MutablePartition.from_partition(self.initial_state))
+        else:
+            self.state = self.initial_state
         return self
 
     def __next__(self):
+        if self.monitor is not None and self.monitor.should_stop():
+            self._shutdown()
+            raise StopIteration
+        while True:
+            try:
+                state = self._next()
+            except StopIteration:
+                self._shutdown()
+                raise
+            if self.checkpoint is not None:
+                self.checkpoint.step(self)
+            step = self.counter - 1
+            if step >= self.burn_in and (step - self.burn_in) % self.thin == 0:
+                if self.monitor is not None:
+                    self.monitor.update(self.state)
+                return state
+
+    def _next(self):
         if self.counter == 0:
             self.counter += 1
             return self.state
 
+        if self.in_place:
+            return self._next_in_place()
+        if self.speculate > 1:
+            return self._next_speculatively()
+
         while self.counter < self.total_steps:
-            proposed_next_state = self.proposal(self.state)
-            # Erase the parent of the parent, to avoid memory leak
-            self.state.parent = None
+            proposed_next_state = self._instrument(self.proposal(self.state))
+            self._forget_parent()
 
             if self.is_valid(proposed_next_state):
                 proposed_next_state.accepted = self.accept(proposed_next_state)
@@ -77,8 +225,107 @@ class MarkovChain:
                 return proposed_next_state
         raise StopIteration
 
+    def _instrument(self, state):
+        # Only the states the chain creates are instrumented, so that the
+        # caller's initial state is left as it was.
+        if self.instrumentation is not None and isinstance(state, Partition):
+            state.instrumentation = self.instrumentation
+        return state
+
+    def _forget_parent(self):
+        # Erase the parent of the parent, to avoid memory leak. States that
+        # with_multiplicities has yet to yield keep theirs until it has.
+        if not self._keep_parents:
+            self.state.parent = None
+
+    def _shutdown(self):
+        # Only the thread pool the chain created itself is shut down.
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown()
+            self._thread_pool = None
+
+    def _next_speculatively(self):
+        executor = self.executor
+        if executor is None:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(self.speculate)
+            executor = self._thread_pool
+        while self.counter < self.total_steps:
+            candidates = [
+                self._instrument(self.proposal(self.state)) for _ in range(self.speculate)
+            ]
+            self._forget_parent()
+
+            checks = [executor.submit(self.is_valid, c) for c in candidates]
+            for candidate, check in zip(candidates, checks):
+                if check.result():
+                    for other in checks:
+                        other.cancel()
+                    candidate.accepted = self.accept(candidate)
+                    if candidate.accepted:
+                        self.state = candidate
+                    self.counter += 1
+                    return candidate
+        raise StopIteration
+
+    def _next_in_place(self):
+        state = self.state
+        while self.counter < self.total_steps:
+            if self.proposal(state) is not state:
+                raise TypeError(
+                    "In-place chains need a proposal that returns partition.flip(...) "
+                    "of the partition it is given."
+                )
+
+            if self.is_valid(state):
+                state.accepted = self.accept(state)
+                if state.accepted:
+                    state.commit()
+                else:
+                    state.rollback()
+                self.counter += 1
+                return state
+            state.rollback()
+        raise StopIteration
+
     def __len__(self):
-        return self.total_steps
+        """The number of states the chain yields."""
+        return max(0, -(-(self.total_steps - self.burn_in) // self.thin))
+
+    def with_multiplicities(self):
+        """Iterate over the states of the chain as ``(state, multiplicity)`` pairs.
+
+        Unlike iterating over the chain, which yields each proposal (even when it
+        is rejected), this yields the state the chain is in after each step, and
+        collapses consecutive steps in the same state into one pair whose
+        ``multiplicity`` is the number of (kept) steps spent in it. Weighted
+        statistics over the pairs equal the statistics over the steps, and each
+        distinct state only needs to be scored once. Each state keeps its parent
+        until it is yielded, so that its updaters are still computed incrementally.
+
+        Not available for in-place chains, whose single state changes before its
+        multiplicity is known.
+        """
+        if self.in_place:
+            raise ValueError("In-place chains cannot be iterated with multiplicities.")
+        current = None
+        multiplicity = 0
+        self._keep_parents = True
+        try:
+            for _ in self:
+                if self.state is current:
+                    multiplicity += 1
+                    continue
+                if multiplicity:
+                    yield (current, multiplicity)
+                    current.parent = None
+                current = self.state
+                multiplicity = 1
+            if multiplicity:
+                yield (current, multiplicity)
+                current.parent = None
+        finally:
+            self._keep_parents = False
 
     def with_progress_bar(self):
         from tqdm.auto import tqdm
@@ -0,0 +1,176 @@
+"""Checkpoints for long Markov chain runs.
+
+A :class:`Checkpointer` periodically saves a snapshot of a running
+:class:`~gerrychain.MarkovChain`: the current assignment, the step counter, the
+state of the random number generator of :mod:`gerrychain.random`, the state of
+constraints that configure themselves (like
+:class:`~gerrychain.constraints.SelfConfiguringUpperBound`), and the updater
+values of the current state (except for sets of edges, which are recomputed).
+:meth:`MarkovChain.resume <gerrychain.MarkovChain.resume>` continues the chain
+from a snapshot exactly as the original run would have::
+
+    chain = MarkovChain(proposal, constraints, accept, initial_partition,
+                        total_steps=10**6, checkpoint=Checkpointer("run.checkpoint"))
+
+    # ... after the process was interrupted:
+    chain = MarkovChain.resume("run.checkpoint", proposal, constraints, accept,
+                               initial_partition, total_steps=10**6,
+                               checkpoint=Checkpointer("run.checkpoint"))
+
+The proposal, constraints, and acceptance function passed to ``resume`` should
+be new objects configured as in the original run.
+
+The restored partition has the same parts and cut edges as the saved one, but
+its sets may iterate in a different order, which depends on how a set was
+built. So a proposal should not let the order of a set decide its random
+choices. The proposals of :mod:`gerrychain.proposals` choose from the sorted
+edges and nodes instead.
+"""
+import os
+import pickle
+import tempfile
+from collections.abc import Mapping
+
+from .constraints import Validator
+from .graph.edges import EdgeSet
+from .instrumentation import TimedCall
+from .random import random
+
+VERSION = 1
+
+
+class Checkpointer:
+    """Saves a snapshot of a chain to ``path`` every ``every`` steps."""
+
+    def __init__(self, path, every=1000):
+        """
+        :param path: The file to write the snapshots to. Each snapshot replaces the
+            previous one.
+        :param every: (optional) The number of steps between snapshots.
+        """
+        self.path = path
+        self.every = every
+
+    def step(self, chain):
+        """Called by the chain after each step."""
+        if chain.counter % self.every == 0:
+            self.save(chain)
+
+    def save(self, chain):
+        write_atomically(self.path, pickle.dumps(snapshot(chain), pickle.HIGHEST_PROTOCOL))
+
+
+def write_atomically(path, data):
+    """Write ``data`` to ``path`` so that the file either keeps its old contents or
+    has all of the new contents, even if the process dies while writing."""
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".checkpoint-")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def load_checkpoint(path):
+    """Load a snapshot written by a :class:`Checkpointer`."""
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    if data.get("version") != VERSION:
+        raise ValueError("Unsupported checkpoint version: {}".format(data.get("version")))
+    return data
+
+
+def snapshot(chain):
+    """The snapshot of a chain, as a dictionary."""
+    state = chain.state
+    return {
+        "version": VERSION,
+        "counter": chain.counter,
+        "assignment": state.assignment.to_dict(),
+        "cache": saved_values(state._cache),
+        "random_state": random.getstate(),
+        "constraints": [
+            constraint.checkpoint_state() if hasattr(constraint, "checkpoint_state") else None
+            for constraint in constraint_list(chain.is_valid)
+        ],
+    }
+
+
+def saved_values(cache):
+    """The updater values to save in a snapshot: those that can be pickled,
+    except for sets of edges, which are recomputed exactly from the assignment
+    (and would otherwise bring their whole edge index along)."""
+    values = {}
+    for key, value in cache.items():
+        if holds_edge_sets(value):
+            continue
+        try:
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            continue
+        values[key] = value
+    return values
+
+
+def holds_edge_sets(value):
+    """Whether an updater value is an :class:`~gerrychain.graph.EdgeSet`, or a
+    dictionary of them (like ``cut_edges_by_part``)."""
+    if isinstance(value, Mapping):
+        return any(isinstance(item, EdgeSet) for item in value.values())
+    return isinstance(value, EdgeSet)
+
+
+def constraint_list(constraints):
+    """The individual constraint objects of a list of constraints, a
+    :class:`~gerrychain.constraints.Validator`, or a single constraint function."""
+    if isinstance(constraints, TimedCall):
+        constraints = constraints.function
+    if isinstance(constraints, Validator):
+        constraints = constraints.constraints
+    elif callable(constraints):
+        constraints = [constraints]
+    return [
+        constraint.function if isinstance(constraint, TimedCall) else constraint
+        for constraint in constraints
+    ]
+
+
+def restore_constraints(constraints, states):
+    constraints = constraint_list(constraints)
+    if len(constraints) != len(states):
+        raise ValueError(
+            "The checkpoint was saved with {} constraints, but {} were given.".format(
+                len(states), len(constraints)
+            )
+        )
+    for constraint, state in zip(constraints, states):
+        if hasattr(constraint, "restore_state"):
+            constraint.restore_state(state)
+
+
+def restore_partition(data, initial_state):
+    """Rebuild the partition of a snapshot by flipping ``initial_state``, so that it
+    has the same class, graph, updaters and order of parts as the original run."""
+    assignment = initial_state.assignment
+    partition = initial_state.flip(
+        {
+            node: part
+            for node, part in data["assignment"].items()
+            if assignment[node] != part
+        }
+    )
+    partition.parent = None
+    partition.flips = None
+
+    # Recomputing the updaters from scratch can give slightly different floating
+    # point values than the original run, which computed them incrementally, so
+    # we use the saved values.
+    partition._cache.update(
+        (key, saved) for key, saved in data["cache"].items() if key in partition.updaters
+    )
+    return partition
@@ -1,3 +1,7 @@
+import weakref
+from collections.abc import Mapping
+
+
 class Bounds:
     """
     Wrapper for numeric-validators to enforce upper and lower limits.
@@ -6,21 +10,54 @@ class Bounds:
     return is ``True`` if the numeric validator is within set limits, and
     ``False`` otherwise.
 
+    If the function returns a mapping from parts to values (like a
+    :class:`~gerrychain.updaters.Tally`), and the parent of the partition passed
+    this constraint, then only the values of the parts changed by the last flip
+    are checked. The values of the other parts must not depend on the flip.
     """
 
     def __init__(self, func, bounds):
         """
-        :param func: Numeric validator function. Should return an iterable of values.
+        :param func: Numeric validator function. Should return an iterable of values,
+            or a mapping from parts to values.
         :param bounds: Tuple of (lower, upper) numeric bounds.
         """
         self.func = func
         self.bounds = bounds
+        self._passed = weakref.WeakSet()
 
     def __call__(self, *args, **kwargs):
         lower, upper = self.bounds
         values = self.func(*args, **kwargs)
+        if isinstance(values, Mapping) and len(args) == 1:
+            return self._check_parts(args[0], values)
         return lower <= min(values) and max(values) <= upper
 
+    def _check_parts(self, partition, values):
+        lower, upper = self.bounds
+        parent = getattr(partition, "parent", None)
+        if parent is not None and parent in self._passed and partition.flows is not None:
+            parts = [part for part in partition.flows if part in values]
+        else:
+            parts = values.keys()
+
+        within_bounds = all(lower <= values[part] <= upper for part in parts)
+        if within_bounds:
+            try:
+                self._passed.add(partition)
+            except TypeError:
+                pass
+        return within_bounds
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_passed"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._passed = weakref.WeakSet()
+
     @property
     def __name__(self):
         return "Bounds({},{})".format(self.func.__name__, str(self.bounds))
@@ -109,6 +146,13 @@ class SelfConfiguringUpperBound:
             self.bound = self.func(partition)
         return self.func(partition) <= self.bound
 
+    def checkpoint_state(self):
+        """The configured bound, for saving in a chain checkpoint."""
+        return self.bound
+
+    def restore_state(self, state):
+        self.bound = state
+
 
 class SelfConfiguringLowerBound:
     """
@@ -138,6 +182,13 @@ class SelfConfiguringLowerBound:
             self.bound = self.func(partition) - self.epsilon
         return self.func(partition) >= self.bound
 
+    def checkpoint_state(self):
+        """The configured bound, for saving in a chain checkpoint."""
+        return self.bound
+
+    def restore_state(self, state):
+        self.bound = state
+
 
 class WithinPercentRangeOfBounds:
     def __init__(self, func, percent):
@@ -153,3 +204,10 @@ class WithinPercentRangeOfBounds:
             return True
         else:
             return self.lbound <= self.func(partition) <= self.ubound
+
+    def checkpoint_state(self):
+        """The configured bounds, for saving in a chain checkpoint."""
+        return (self.lbound, self.ubound)
+
+    def restore_state(self, state):
+        self.lbound, self.ubound = state
@@ -1,8 +1,10 @@
+from collections import deque
 from heapq import heappop, heappush
 from itertools import count
 
 import networkx as nx
 
+from ..graph.compiled import CompiledGraph, EdgeData
 from ..random import random
 from .bounds import SelfConfiguringLowerBound
 
@@ -20,6 +22,9 @@ def are_reachable(G, source, avoid, targets):
         of the source nodes.
     :rtype: dict
     """
+    if isinstance(G, CompiledGraph):
+        return are_reachable_compiled(G, source, avoid, targets)
+
     G_succ = G._succ if G.is_directed() else G._adj
 
     push = heappush
@@ -51,6 +56,38 @@ def are_reachable(G, source, avoid, targets):
     return all(t in seen for t in targets)
 
 
+def are_reachable_compiled(G, source, avoid, targets):
+    """:func:`are_reachable` for a :class:`~gerrychain.graph.CompiledGraph`. It
+    reads the neighbors and edges of each node from the graph's arrays, and
+    searches breadth-first, without the distances (which are not needed to
+    tell whether the targets are reachable).
+    """
+    node_ids = G.node_ids
+    labels = None if G._ids_are_labels else G.node_labels
+    indptr, indices, adjacent_edges = G._indptr, G._indices, G._adjacent_edges
+
+    remaining = set(targets)
+    remaining.discard(source)
+    seen = {source}
+    fringe = deque([source])
+
+    while remaining and fringe:
+        v = fringe.popleft()
+        i = node_ids[v]
+        start, end = indptr[i], indptr[i + 1]
+        neighbors = indices[start:end].tolist()
+        if labels is not None:
+            neighbors = [labels[j] for j in neighbors]
+        for u, edge_id in zip(neighbors, adjacent_edges[start:end].tolist()):
+            if u in seen or avoid(v, u, EdgeData(G, edge_id)):
+                continue
+            seen.add(u)
+            remaining.discard(u)
+            fringe.append(u)
+
+    return not remaining
+
+
 def single_flip_contiguous(partition):
     """Check if swapping the given node from its old assignment disconnects the
     old assignment class.
@@ -1,3 +1,7 @@
+import threading
+import weakref
+from time import perf_counter
+
 from ..updaters import CountySplit
 from .bounds import Bounds
 
@@ -16,11 +20,49 @@ class Validator:
         chain = MarkovChain(proposal, is_valid, accept, initial_state, total_steps)
     """
 
-    def __init__(self, constraints):
+    def __init__(self, constraints, adaptive=False, reorder_every=100):
         """
         :param constraints: List of validator functions that will check partitions.
+        :param adaptive: (optional) Whether to learn the order in which to check the
+            constraints. The validator then measures the time each constraint takes
+            and how often it fails, and checks the constraints in increasing order of
+            ``mean time / failure rate``, so that cheap constraints that often fail
+            run first. The result is the same as for the given order, as long as the
+            constraints do not depend on being called in that order. The learned
+            order is available as :attr:`learned_order`. An adaptive validator can
+            be shared by the threads of a speculative chain.
+        :param reorder_every: (optional) The number of partitions to check between
+            updates of the learned order.
         """
         self.constraints = constraints
+        self.adaptive = adaptive
+        self.reorder_every = reorder_every
+        if adaptive:
+            self.constraints = list(constraints)
+            number = len(self.constraints)
+            self._order = list(range(number))
+            self._times = [0.0] * number
+            self._calls = [0] * number
+            self._failures = [0] * number
+            self._checks = 0
+            self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.adaptive:
+            self._lock = threading.Lock()
+
+    @property
+    def learned_order(self):
+        """The constraints in the order they are checked in."""
+        if not self.adaptive:
+            return list(self.constraints)
+        return [self.constraints[i] for i in self._order]
 
     def __call__(self, partition):
         """Determine if the given partition is valid.
@@ -28,21 +70,62 @@ class Validator:
         :param partition: :class:`Partition` class to check.
 
         """
+        if self.adaptive:
+            return self._call_adaptively(partition)
+
         # check each constraint function and fail when a constraint test fails
         for constraint in self.constraints:
-            is_valid = constraint(partition)
-            if is_valid is False:
+            if not check_constraint(constraint, partition):
                 return False
-            elif is_valid is True:
-                pass
-            else:
-                raise TypeError(
-                    "Constraint {} returned a non-boolean.".format(repr(constraint))
-                )
 
         # all constraints are satisfied
         return True
 
+    def _call_adaptively(self, partition):
+        # The statistics and the order are only read and written under the lock,
+        # and each call checks a copy of the order, so that concurrent calls
+        # (as in speculative chains) neither lose updates nor see a reordering.
+        with self._lock:
+            self._checks += 1
+            if self._checks % self.reorder_every == 0:
+                self._reorder()
+            order = tuple(self._order)
+
+        constraints = self.constraints
+        for i in order:
+            start = perf_counter()
+            is_valid = check_constraint(constraints[i], partition)
+            elapsed = perf_counter() - start
+            with self._lock:
+                self._times[i] += elapsed
+                self._calls[i] += 1
+                if not is_valid:
+                    self._failures[i] += 1
+            if not is_valid:
+                return False
+        return True
+
+    def _reorder(self):
+        def expected_cost(i):
+            calls = self._calls[i]
+            if calls == 0:
+                return 0.0
+            # Smooth the failure rate so that constraints that have not failed
+            # yet are not ranked last forever.
+            failure_rate = (self._failures[i] + 1) / (calls + 2)
+            return self._times[i] / calls / failure_rate
+
+        self._order.sort(key=expected_cost)
+
+
+def check_constraint(constraint, partition):
+    is_valid = constraint(partition)
+    if is_valid is False:
+        return False
+    elif is_valid is True:
+        return True
+    raise TypeError("Constraint {} returned a non-boolean.".format(repr(constraint)))
+
 
 def within_percent_of_ideal_population(
     initial_partition, percent=0.01, pop_key="population"
@@ -61,7 +144,7 @@ def within_percent_of_ideal_population(
     """
 
     def population(partition):
-        return partition[pop_key].values()
+        return partition[pop_key]
 
     number_of_districts = len(initial_partition[pop_key].keys())
     total_population = sum(initial_partition[pop_key].values())
@@ -106,13 +189,50 @@ def districts_within_tolerance(partition, attribute_name="population", percentag
     if percentage >= 1:
         percentage *= 0.01
 
-    values = partition[attribute_name].values()
-    max_difference = max(values) - min(values)
+    smallest, largest = extreme_values(partition, attribute_name)
+    max_difference = largest - smallest
 
-    within_tolerance = max_difference <= percentage * min(values)
+    within_tolerance = max_difference <= percentage * smallest
     return within_tolerance
 
 
+# The smallest and largest values of updaters, by partition and updater key, so
+# that a child partition can update them from its parent's.
+_extremes = weakref.WeakKeyDictionary()
+
+
+def extreme_values(partition, key):
+    """The smallest and largest values of the ``{part: value}`` updater ``key``.
+
+    When the extremes of the parent partition are known and the parts changed by
+    the last flip held neither of them, they are updated from the values of the
+    changed parts only.
+    """
+    values = partition[key]
+    extremes = None
+
+    parent = getattr(partition, "parent", None)
+    try:
+        known = _extremes.get(parent, {}).get(key)
+    except TypeError:
+        known = None
+    if known is not None and partition.flows is not None:
+        smallest, largest = known
+        previous = parent[key]
+        changed = [part for part in partition.flows if part in values]
+        if all(smallest < previous.get(part, smallest) < largest for part in changed):
+            new_values = [values[part] for part in changed]
+            extremes = (min([smallest] + new_values), max([largest] + new_values))
+
+    if extremes is None:
+        extremes = (min(values.values()), max(values.values()))
+    try:
+        _extremes.setdefault(partition, {})[key] = extremes
+    except TypeError:
+        pass
+    return extremes
+
+
 def refuse_new_splits(partition_county_field):
     """Refuse all proposals that split a county that was previous unsplit.
 
@@ -0,0 +1,265 @@
+"""Streaming convergence diagnostics for Markov chain runs.
+
+A :class:`ConvergenceMonitor` follows score functions of the states of one or
+more chains, and keeps their effective sample size, autocorrelations and split
+R-hat up to date without storing the history of the scores. Passed to
+:class:`~gerrychain.MarkovChain`, it can also stop the chain once its targets
+are met::
+
+    monitor = ConvergenceMonitor(
+        {"cut_edges": lambda partition: len(partition["cut_edges"])},
+        target_ess=1000,
+        max_rhat=1.01,
+    )
+    chain = MarkovChain(proposal, constraints, accept, initial_state,
+                        total_steps=10**7, monitor=monitor)
+    for partition in chain:
+        ...
+    print(monitor.summary())
+
+To monitor an ensemble, pass the score values of each chain to
+:meth:`ConvergenceMonitor.add`, and stop iterating once
+:meth:`ConvergenceMonitor.converged` returns ``True``.
+"""
+import collections
+import math
+
+import pandas
+
+
+class BatchMeans:
+    """Streaming statistics of one series of numbers.
+
+    The series is summarized by at most ``max_batches`` consecutive batches of
+    equal size (their count, sum, and sum of squares). When there are too many
+    batches, neighboring batches are merged and the batch size doubles, so the
+    memory used does not grow with the length of the series.
+    """
+
+    def __init__(self, max_batches=64, max_lag=10):
+        """
+        :param max_batches: (optional) The largest number of batches to keep. Must
+            be even.
+        :param max_lag: (optional) The largest lag to keep autocorrelations for.
+        """
+        self.max_batches = max_batches
+        self.max_lag = max_lag
+        self.batch_size = 1
+        self.batches = []
+        self.count = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self._current = [0, 0.0, 0.0]
+        self._recent = collections.deque(maxlen=max_lag)
+        self._products = [0.0] * (max_lag + 1)
+
+    def add(self, value):
+        """Add the next value of the series."""
+        value = float(value)
+        self.count += 1
+        self.total += value
+        self.total_squares += value * value
+        for lag, previous in enumerate(reversed(self._recent), 1):
+            self._products[lag] += value * previous
+        self._recent.append(value)
+
+        current = self._current
+        current[0] += 1
+        current[1] += value
+        current[2] += value * value
+        if current[0] == self.batch_size:
+            self.batches.append(tuple(current))
+            self._current = [0, 0.0, 0.0]
+            if len(self.batches) > self.max_batches:
+                self._merge()
+
+    def _merge(self):
+        batches = self.batches
+        merged = [
+            tuple(a + b for a, b in zip(batches[i], batches[i + 1]))
+            for i in range(0, len(batches) - 1, 2)
+        ]
+        if len(batches) % 2:
+            # The odd batch out becomes the start of the next, larger batch.
+            self._current = [a + b for a, b in zip(batches[-1], self._current)]
+        self.batches = merged
+        self.batch_size *= 2
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float("nan")
+
+    @property
+    def variance(self):
+        """The sample variance of the series."""
+        if self.count < 2:
+            return float("nan")
+        return max(
+            (self.total_squares - self.total * self.total / self.count) / (self.count - 1),
+            0.0,
+        )
+
+    def autocorrelation(self, lag):
+        """The autocorrelation of the series at the given lag, at most ``max_lag``."""
+        if not 0 < lag <= self.max_lag:
+            raise ValueError("lag must be between 1 and {}.".format(self.max_lag))
+        variance = self.variance
+        if self.count <= lag or not variance:
+            return float("nan")
+        covariance = self._products[lag] / (self.count - lag) - self.mean ** 2
+        return covariance / variance
+
+    @property
+    def effective_sample_size(self):
+        """The effective sample size, estimated from the variance of the batch
+        means. ``nan`` until there are at least two full batches."""
+        if len(self.batches) < 2:
+            return float("nan")
+        means = [total / count for count, total, _ in self.batches]
+        mean = sum(means) / len(means)
+        batch_variance = sum((m - mean) ** 2 for m in means) / (len(means) - 1)
+        variance = self.variance
+        if batch_variance == 0:
+            return float(self.count) if variance == 0 else float("nan")
+        return self.count * variance / (self.batch_size * batch_variance)
+
+    def halves(self):
+        """The (count, mean, variance) of the first and second halves of the full
+        batches, for split R-hat."""
+        half = len(self.batches) // 2
+        result = []
+        for batches in (self.batches[:half], self.batches[half:2 * half]):
+            count = sum(batch[0] for batch in batches)
+            total = sum(batch[1] for batch in batches)
+            squares = sum(batch[2] for batch in batches)
+            if count < 2:
+                return None
+            variance = max((squares - total * total / count) / (count - 1), 0.0)
+            result.append((count, total / count, variance))
+        return result
+
+
+def split_rhat(series):
+    """The split R-hat of a collection of :class:`BatchMeans` of the same score
+    on different chains (or of a single chain). ``nan`` until every chain has at
+    least two full batches.
+    """
+    halves = []
+    for statistics in series:
+        chain_halves = statistics.halves()
+        if chain_halves is None:
+            return float("nan")
+        halves.extend(chain_halves)
+
+    n = min(count for count, _, _ in halves)
+    means = [mean for _, mean, _ in halves]
+    grand_mean = sum(means) / len(means)
+    between = n * sum((m - grand_mean) ** 2 for m in means) / (len(means) - 1)
+    within = sum(variance for _, _, variance in halves) / len(halves)
+    if within == 0:
+        return 1.0 if between == 0 else float("inf")
+    pooled = (n - 1) / n * within + between / n
+    return math.sqrt(pooled / within)
+
+
+class ConvergenceMonitor:
+    """Tracks the effective sample size, autocorrelations, and split R-hat of
+    score functions over one or more chains, in constant memory.
+
+    The effective sample size of a score is summed over the chains. The monitor
+    has converged when every score has at least ``target_ess`` effective samples
+    and a split R-hat of at most ``max_rhat`` (for the targets that are given).
+    """
+
+    def __init__(
+        self,
+        scores,
+        target_ess=None,
+        max_rhat=None,
+        check_every=1000,
+        max_batches=64,
+        max_lag=10,
+    ):
+        """
+        :param scores: Dictionary mapping names to functions of a partition
+            returning a number.
+        :param target_ess: (optional) The effective sample size to reach.
+        :param max_rhat: (optional) The largest acceptable split R-hat.
+        :param check_every: (optional) The number of states between the
+            convergence checks of :meth:`should_stop`.
+        :param max_batches: (optional) See :class:`BatchMeans`.
+        :param max_lag: (optional) See :class:`BatchMeans`.
+        """
+        self.scores = scores
+        self.target_ess = target_ess
+        self.max_rhat = max_rhat
+        self.check_every = check_every
+        self.max_batches = max_batches
+        self.max_lag = max_lag
+        self.series = collections.defaultdict(dict)
+        self.count = 0
+
+    def update(self, partition, chain=0):
+        """Evaluate the scores on the next state of the given chain."""
+        self.add({name: score(partition) for name, score in self.scores.items()}, chain)
+
+    def add(self, values, chain=0):
+        """Add the next values of the scores of the given chain, as a dictionary
+        mapping score names to numbers."""
+        series = self.series
+        for name, value in values.items():
+            statistics = series[name].get(chain)
+            if statistics is None:
+                statistics = series[name][chain] = BatchMeans(self.max_batches, self.max_lag)
+            statistics.add(value)
+        self.count += 1
+
+    def effective_sample_size(self, name):
+        return sum(s.effective_sample_size for s in self.series[name].values())
+
+    def rhat(self, name):
+        return split_rhat(self.series[name].values())
+
+    def autocorrelation(self, name, lag, chain=0):
+        return self.series[name][chain].autocorrelation(lag)
+
+    def converged(self):
+        """Whether every score has reached the targets."""
+        if self.target_ess is None and self.max_rhat is None:
+            return False
+        for name in self.scores or self.series:
+            if name not in self.series:
+                return False
+            if self.target_ess is not None:
+                if not self.effective_sample_size(name) >= self.target_ess:
+                    return False
+            if self.max_rhat is not None and not self.rhat(name) <= self.max_rhat:
+                return False
+        return True
+
+    def should_stop(self):
+        """Whether a chain should stop. Only checks for convergence every
+        ``check_every`` states."""
+        return self.count > 0 and self.count % self.check_every == 0 and self.converged()
+
+    def summary(self):
+        """Returns a :class:`pandas.DataFrame` with the number of values, mean,
+        effective sample size, lag-1 autocorrelation (averaged over chains) and
+        split R-hat of each score."""
+        rows = []
+        for name, chains in self.series.items():
+            rows.append(
+                {
+                    "score": name,
+                    "count": sum(s.count for s in chains.values()),
+                    "mean": sum(s.total for s in chains.values())
+                    / sum(s.count for s in chains.values()),
+                    "ess": self.effective_sample_size(name),
+                    "autocorrelation": sum(s.autocorrelation(1) for s in chains.values())
+                    / len(chains),
+                    "rhat": self.rhat(name),
+                }
+            )
+        return pandas.DataFrame(
+            rows, columns=["score", "count", "mean", "ess", "autocorrelation", "rhat"]
+        )
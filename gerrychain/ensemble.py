@@ -0,0 +1,190 @@
+"""Run many independent Markov chains in worker processes.
+
+Example usage::
+
+    from gerrychain.ensemble import run_ensemble
+
+    def score(partition):
+        return sorted(partition["population"].values())
+
+    for chain, step, value in run_ensemble(
+        proposal, constraints, accept, initial_partition,
+        total_steps=10000, chains=32, score=score,
+    ):
+        results[chain].append(value)
+
+Each chain gets its own random stream, seeded from the ensemble ``seed`` and the
+chain's index, so an ensemble gives the same results whichever worker runs each
+chain and however many processes there are.
+"""
+import multiprocessing
+import os
+import queue
+import traceback
+
+from . import random as gerrychain_random
+from .chain import MarkovChain
+from .random import random
+
+DONE = "done"
+ERROR = "error"
+
+# How often (in seconds) to check that the workers are still alive while
+# waiting for results.
+POLL_INTERVAL = 1.0
+
+
+def chain_seed(seed, index):
+    """The seed of the random stream of chain number ``index``."""
+    return "{}-{}".format(seed, index)
+
+
+def run_ensemble(
+    proposal,
+    constraints,
+    accept,
+    initial_state,
+    total_steps,
+    chains,
+    score,
+    processes=None,
+    seed=None,
+    in_place=False,
+    batch_size=100,
+    context=None,
+):
+    """Run ``chains`` independent :class:`~gerrychain.MarkovChain` runs across a
+    pool of worker processes, and yield ``(chain, step, score(partition))`` tuples
+    as the workers send them back.
+
+    Results arrive in batches, so the steps of different chains are interleaved.
+    The steps of each chain arrive in order.
+
+    :param proposal: The proposal function of each chain.
+    :param constraints: The constraints of each chain.
+    :param accept: The acceptance function of each chain.
+    :param initial_state: The initial :class:`~gerrychain.Partition` of each chain.
+    :param total_steps: The number of steps of each chain.
+    :param chains: The number of chains to run.
+    :param score: Function computing the (picklable) value to send back for each
+        state of a chain, e.g. a summary statistic or ``partition.assignment.to_dict()``.
+    :param processes: (optional) The number of worker processes. Defaults to the
+        number of CPUs.
+    :param seed: (optional) The seed of the ensemble. Defaults to the
+        ``GERRYCHAIN_RANDOM_SEED`` seed of :mod:`gerrychain.random`.
+    :param in_place: (optional) Whether to run the chains in place. See
+        :class:`~gerrychain.MarkovChain`.
+    :param batch_size: (optional) The number of results a worker sends at a time.
+    :param context: (optional) The :mod:`multiprocessing` start method or context
+        to use. With the ``"fork"`` start method, the functions do not need to be
+        picklable.
+    :raises RuntimeError: if a chain fails, or a worker process dies.
+    """
+    if seed is None:
+        seed = gerrychain_random.seed
+    if not isinstance(context, multiprocessing.context.BaseContext):
+        context = multiprocessing.get_context(context)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    processes = max(min(processes, chains), 1)
+
+    spec = (
+        proposal,
+        constraints,
+        accept,
+        initial_state,
+        total_steps,
+        score,
+        seed,
+        in_place,
+        batch_size,
+    )
+    # Each worker takes chain numbers from the task queue until it gets None. The
+    # specification (with the initial partition and its graph) is sent to each
+    # worker once, not once per chain.
+    tasks = context.Queue()
+    for index in range(chains):
+        tasks.put(index)
+    for _ in range(processes):
+        tasks.put(None)
+    results = context.Queue()
+
+    workers = []
+    try:
+        for _ in range(processes):
+            worker = context.Process(
+                target=_run_chains, args=(spec, tasks, results), daemon=True
+            )
+            worker.start()
+            workers.append(worker)
+
+        running = chains
+        while running:
+            try:
+                index, kind, payload = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                _check_workers(workers)
+                continue
+            if kind == DONE:
+                running -= 1
+            elif kind == ERROR:
+                raise RuntimeError(
+                    "Chain {} failed in a worker process:\n{}".format(index, payload)
+                )
+            else:
+                for step, value in payload:
+                    yield (index, step, value)
+        for worker in workers:
+            worker.join()
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+
+def _check_workers(workers):
+    """Raise if a worker process died, e.g. because the chain specification could
+    not be unpickled or the process was killed, since its chains would never
+    finish."""
+    for worker in workers:
+        if worker.exitcode not in (None, 0):
+            raise RuntimeError(
+                "A worker process exited unexpectedly with exit code {}.".format(
+                    worker.exitcode
+                )
+            )
+
+
+def _run_chains(spec, tasks, results):
+    for index in iter(tasks.get, None):
+        _run_chain(spec, results, index)
+
+
+def _run_chain(spec, results, index):
+    (
+        proposal,
+        constraints,
+        accept,
+        initial_state,
+        total_steps,
+        score,
+        seed,
+        in_place,
+        batch_size,
+    ) = spec
+    try:
+        random.seed(chain_seed(seed, index))
+        chain = MarkovChain(
+            proposal, constraints, accept, initial_state, total_steps, in_place=in_place
+        )
+        batch = []
+        for step, partition in enumerate(chain):
+            batch.append((step, score(partition)))
+            if len(batch) >= batch_size:
+                results.put((index, None, batch))
+                batch = []
+        if batch:
+            results.put((index, None, batch))
+        results.put((index, DONE, None))
+    except Exception:
+        results.put((index, ERROR, traceback.format_exc()))
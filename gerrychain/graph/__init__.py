@@ -1,3 +1,6 @@
 from .adjacency import *
 from .geo import *
 from .graph import *
+from .compiled import CompiledGraph
+from .edges import EdgeIndex, EdgeSet
+from .shared import SharedGraph
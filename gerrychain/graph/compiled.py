@@ -0,0 +1,699 @@
+import numbers
+from collections.abc import Mapping
+
+import networkx
+import numpy
+
+from .edges import EdgeIndex
+
+MISSING = object()
+
+# NumPy type codes whose values a memoryview can read as Python numbers
+MEMORYVIEW_TYPES = "?bBhHiIlLqQfd"
+
+
+class CompiledGraph:
+    """A frozen, array-backed view of a graph.
+
+    Nodes get dense integer ids (their position in :attr:`node_labels`), the
+    adjacency structure is stored in `CSR`_ form (:attr:`indptr` and :attr:`indices`),
+    each edge gets a canonical integer id, and the node and edge attributes are
+    stored as NumPy columns. Later changes to the original graph are not seen by
+    the compiled view.
+
+    A :class:`CompiledGraph` supports the read-only parts of the NetworkX API that
+    GerryChain uses (``graph.nodes[node][key]``, ``graph.edges[edge][key]``,
+    ``graph.neighbors(node)``, ``graph.subgraph(nodes)``, ...), so a
+    :class:`~gerrychain.Partition` and its updaters and constraints can run on it
+    directly::
+
+        partition = Partition(graph.compile(), assignment, updaters)
+
+    Neighbors and attributes are read from the arrays themselves (through
+    :class:`memoryview` objects, which are cheaper to index from Python than
+    NumPy arrays), so no per-node Python objects are kept.
+
+    .. _`CSR`: https://en.wikipedia.org/wiki/Sparse_matrix
+    """
+
+    def __init__(
+        self,
+        node_labels,
+        edge_labels,
+        indptr,
+        indices,
+        adjacent_edges,
+        node_columns,
+        edge_columns,
+        graph_data=None,
+    ):
+        """
+        :param node_labels: Tuple (or ``range``) of nodes. The position of a node is
+            its id.
+        :param edge_labels: Sequence of canonical ``(u, v)`` edge tuples. The
+            position of an edge is its id.
+        :param indptr: CSR row pointers: the neighbors of node ``i`` are
+            ``indices[indptr[i]:indptr[i + 1]]``.
+        :param indices: CSR neighbor ids.
+        :param adjacent_edges: The id of the edge corresponding to each entry of
+            ``indices``.
+        :param node_columns: Dictionary mapping node attribute keys to arrays
+            indexed by node id.
+        :param edge_columns: Dictionary mapping edge attribute keys to arrays
+            indexed by edge id.
+        :param graph_data: (optional) The graph-level attribute dictionary.
+        """
+        self.node_labels = node_labels
+        if isinstance(node_labels, range) and node_labels == range(len(node_labels)):
+            self.node_ids = RangeIds(len(node_labels))
+        else:
+            self.node_ids = {node: i for i, node in enumerate(node_labels)}
+        self.edge_labels = edge_labels
+        self.indptr = indptr
+        self.indices = indices
+        self.adjacent_edges = adjacent_edges
+        self.node_columns = node_columns
+        self.edge_columns = edge_columns
+        self.graph = dict(graph_data or {})
+
+        self._indptr = memoryview(indptr)
+        self._indices = memoryview(indices)
+        self._adjacent_edges = memoryview(adjacent_edges)
+        self._ids_are_labels = isinstance(self.node_ids, RangeIds)
+        self._node_readers = {}
+        self._edge_readers = {}
+        self._edge_index = None
+
+        self.nodes = CompiledNodeView(self, self)
+        self.edges = CompiledEdgeView(self, self)
+        self.adj = self._adj = CompiledAdjacency(self, self)
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Compile a NetworkX graph. The order of each node's neighbors matches
+        the order of ``graph.neighbors(node)``.
+        """
+        node_labels = tuple(graph.nodes)
+        node_ids = {node: i for i, node in enumerate(node_labels)}
+        if all(type(node) is int and node == i for node, i in node_ids.items()):
+            # Nodes 0, 1, ..., n - 1 are their own ids
+            node_labels = range(len(node_labels))
+
+        edge_index = EdgeIndex.from_graph(graph)
+        edge_labels = edge_index.labels
+
+        indptr = [0]
+        indices = []
+        adjacent_edges = []
+        for node in node_labels:
+            for neighbor, edge_id in edge_index.incidence[node]:
+                indices.append(node_ids[neighbor])
+                adjacent_edges.append(edge_id)
+            indptr.append(len(indices))
+
+        node_columns = compile_columns(
+            [graph.nodes[node] for node in node_labels]
+        )
+        edge_columns = compile_columns([graph.edges[edge] for edge in edge_labels])
+
+        return cls(
+            node_labels,
+            edge_labels,
+            numpy.array(indptr, dtype=numpy.int64),
+            numpy.array(indices, dtype=numpy.int64),
+            numpy.array(adjacent_edges, dtype=numpy.int64),
+            node_columns,
+            edge_columns,
+            graph.graph,
+        )
+
+    def __reduce__(self):
+        # Memoryviews cannot be pickled, so the graph is rebuilt from its arrays.
+        return (
+            self.__class__,
+            (
+                self.node_labels,
+                tuple(self.edge_labels),
+                self.indptr,
+                self.indices,
+                self.adjacent_edges,
+                self.node_columns,
+                self.edge_columns,
+                self.graph,
+            ),
+        )
+
+    def __repr__(self):
+        return "<CompiledGraph [{} nodes, {} edges]>".format(
+            len(self.node_labels), len(self.edge_labels)
+        )
+
+    def __iter__(self):
+        return iter(self.node_labels)
+
+    def __len__(self):
+        return len(self.node_labels)
+
+    def __contains__(self, node):
+        return node in self.node_ids
+
+    def __getitem__(self, node):
+        return self.adj[node]
+
+    def number_of_nodes(self):
+        return len(self.node_labels)
+
+    def number_of_edges(self):
+        return len(self.edge_labels)
+
+    def is_directed(self):
+        return False
+
+    def is_multigraph(self):
+        return False
+
+    @property
+    def degree(self):
+        degrees = numpy.diff(self.indptr).tolist()
+        return dict(zip(self.node_labels, degrees))
+
+    @property
+    def edge_index(self):
+        """The :class:`~gerrychain.graph.edges.EdgeIndex` of this graph, using the
+        same edge ids. It reads the arrays of the graph rather than storing
+        dictionaries of its own."""
+        if self._edge_index is None:
+            self._edge_index = CompiledEdgeIndex(self)
+        return self._edge_index
+
+    @property
+    def edge_ids(self):
+        """Mapping of canonical edge tuples to their ids."""
+        return self.edge_index.ids
+
+    def neighbors(self, node):
+        i = self.node_ids[node]
+        indptr = self._indptr
+        ids = self._indices[indptr[i]:indptr[i + 1]].tolist()
+        if self._ids_are_labels:
+            return iter(ids)
+        return map(self.node_labels.__getitem__, ids)
+
+    def node_column(self, key):
+        """The array of the ``key`` attribute of each node, indexed by node id."""
+        return self.node_columns[key]
+
+    def edge_column(self, key):
+        """The array of the ``key`` attribute of each edge, indexed by edge id."""
+        return self.edge_columns[key]
+
+    def node_ids_of(self, nodes):
+        """Array of the ids of the given nodes."""
+        ids = self.node_ids
+        return numpy.fromiter((ids[node] for node in nodes), dtype=numpy.int64)
+
+    def edge_id(self, edge):
+        """The id of the given edge, in either orientation."""
+        ids = self.node_ids
+        i, j = ids[edge[0]], ids[edge[1]]
+        start = self._indptr[i]
+        try:
+            k = self._indices[start:self._indptr[i + 1]].tolist().index(j)
+        except ValueError:
+            raise KeyError(edge) from None
+        return self._adjacent_edges[start + k]
+
+    def _neighbor_ids(self, i):
+        """List of the ids of the neighbors of node id ``i``."""
+        indptr = self._indptr
+        return self._indices[indptr[i]:indptr[i + 1]].tolist()
+
+    def _neighbors(self, i):
+        """List of the neighbors of node id ``i``."""
+        ids = self._neighbor_ids(i)
+        if self._ids_are_labels:
+            return ids
+        return list(map(self.node_labels.__getitem__, ids))
+
+    def _incident_edges(self, i):
+        """List of the ids of the edges of node id ``i``, in the order of its
+        neighbors."""
+        indptr = self._indptr
+        return self._adjacent_edges[indptr[i]:indptr[i + 1]].tolist()
+
+    def _edge_items(self):
+        return zip(self.edge_labels, range(len(self.edge_labels)))
+
+    def _node_reader(self, key):
+        """An object giving the ``key`` attribute of node id ``i`` as ``reader[i]``."""
+        reader = self._node_readers.get(key)
+        if reader is None:
+            reader = self._node_readers[key] = column_reader(self.node_columns[key])
+        return reader
+
+    def _edge_reader(self, key):
+        """An object giving the ``key`` attribute of edge id ``i`` as ``reader[i]``."""
+        reader = self._edge_readers.get(key)
+        if reader is None:
+            reader = self._edge_readers[key] = column_reader(self.edge_columns[key])
+        return reader
+
+    def subgraph(self, nodes):
+        """Returns a read-only :class:`CompiledSubgraph` view of the subgraph
+        induced on ``nodes``. Nothing is copied; use
+        :meth:`CompiledSubgraph.to_networkx` for a new :class:`networkx.Graph`.
+        """
+        return CompiledSubgraph(self, nodes)
+
+    def to_shared_memory(self):
+        """Copy the adjacency arrays and the numeric columns of this graph into a
+        block of shared memory, which other processes can attach to without
+        copying. See :class:`~gerrychain.graph.shared.SharedGraph`.
+
+        :rtype: SharedGraph
+        """
+        from .shared import SharedGraph
+
+        return SharedGraph.publish(self)
+
+    def to_networkx(self):
+        """Returns a new :class:`networkx.Graph` with the same nodes, edges and data."""
+        return to_networkx(self, self)
+
+
+class CompiledSubgraph:
+    """A read-only view of the subgraph of a :class:`CompiledGraph` induced on a
+    set of nodes, like the subgraph views of NetworkX. It reads the arrays of the
+    full graph, skipping the nodes that are not in the subgraph.
+    """
+
+    def __init__(self, compiled, nodes):
+        """
+        :param compiled: The :class:`CompiledGraph`.
+        :param nodes: The nodes of the subgraph. Nodes that are not in ``compiled``
+            are ignored.
+        """
+        node_ids = compiled.node_ids
+        self.compiled = compiled
+        self.node_set = frozenset(node for node in nodes if node in node_ids)
+        self.node_ids = SubsetIds(node_ids, self.node_set)
+        self.graph = compiled.graph
+
+        self.nodes = CompiledNodeView(self, compiled)
+        self.edges = CompiledEdgeView(self, compiled)
+        self.adj = self._adj = CompiledAdjacency(self, compiled)
+
+    def __repr__(self):
+        return "<CompiledSubgraph [{} nodes]>".format(len(self.node_set))
+
+    def __iter__(self):
+        return iter(self.node_set)
+
+    def __len__(self):
+        return len(self.node_set)
+
+    def __contains__(self, node):
+        return node in self.node_set
+
+    def __getitem__(self, node):
+        return self.adj[node]
+
+    def number_of_nodes(self):
+        return len(self.node_set)
+
+    def number_of_edges(self):
+        return sum(1 for _ in self._edge_items())
+
+    def is_directed(self):
+        return False
+
+    def is_multigraph(self):
+        return False
+
+    @property
+    def degree(self):
+        return {node: len(self.adj[node]) for node in self}
+
+    def neighbors(self, node):
+        return iter(self._neighbors(self.node_ids[node]))
+
+    def edge_id(self, edge):
+        """The id of the given edge, in either orientation."""
+        if edge[0] not in self.node_set or edge[1] not in self.node_set:
+            raise KeyError(edge)
+        return self.compiled.edge_id(edge)
+
+    def _neighbors(self, i):
+        node_set = self.node_set
+        return [node for node in self.compiled._neighbors(i) if node in node_set]
+
+    def _incident_edges(self, i):
+        node_set = self.node_set
+        compiled = self.compiled
+        return [
+            edge_id
+            for node, edge_id in zip(compiled._neighbors(i), compiled._incident_edges(i))
+            if node in node_set
+        ]
+
+    def _edge_items(self):
+        compiled = self.compiled
+        node_ids = compiled.node_ids
+        node_set = self.node_set
+        labels = compiled.edge_labels
+        for node in node_set:
+            i = node_ids[node]
+            for neighbor, j, edge_id in zip(
+                compiled._neighbors(i),
+                compiled._neighbor_ids(i),
+                compiled._incident_edges(i),
+            ):
+                # Yield each edge once, from its endpoint with the smaller id
+                if i <= j and neighbor in node_set:
+                    yield labels[edge_id], edge_id
+
+    def subgraph(self, nodes):
+        """Returns a view of the subgraph of this subgraph induced on ``nodes``."""
+        return CompiledSubgraph(self.compiled, (node for node in nodes if node in self))
+
+    def to_networkx(self):
+        """Returns a new :class:`networkx.Graph` with the same nodes, edges and data."""
+        return to_networkx(self, self.compiled)
+
+    copy = to_networkx
+
+
+def to_networkx(view, compiled):
+    """Copy a :class:`CompiledGraph` or :class:`CompiledSubgraph` into a new
+    :class:`networkx.Graph`."""
+    graph = networkx.Graph()
+    graph.graph.update(view.graph)
+    node_ids = compiled.node_ids
+    graph.add_nodes_from(
+        (node, dict(NodeData(compiled, node_ids[node]))) for node in view
+    )
+    graph.add_edges_from(
+        (u, v, dict(EdgeData(compiled, edge_id))) for (u, v), edge_id in view._edge_items()
+    )
+    return graph
+
+
+def column_reader(column):
+    """A memoryview of a numeric column (whose items are read as Python numbers),
+    or else the column itself."""
+    if column.dtype.char in MEMORYVIEW_TYPES and column.flags.c_contiguous:
+        return memoryview(column)
+    return column
+
+
+class RangeIds(Mapping):
+    """The ``{node: id}`` mapping of a graph whose nodes are ``0, 1, ..., n - 1``,
+    without storing a dictionary."""
+
+    def __init__(self, length):
+        self.length = length
+
+    def __getitem__(self, node):
+        if type(node) is int and 0 <= node < self.length:
+            return node
+        if isinstance(node, numbers.Integral) and 0 <= node < self.length:
+            return int(node)
+        raise KeyError(node)
+
+    def __contains__(self, node):
+        if type(node) is int:
+            return 0 <= node < self.length
+        try:
+            self[node]
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(range(self.length))
+
+    def __len__(self):
+        return self.length
+
+
+class SubsetIds(Mapping):
+    """The ``{node: id}`` mapping of a graph, restricted to a set of nodes."""
+
+    def __init__(self, ids, nodes):
+        self.ids = ids
+        self.nodes = nodes
+
+    def __getitem__(self, node):
+        if node not in self.nodes:
+            raise KeyError(node)
+        return self.ids[node]
+
+    def __contains__(self, node):
+        return node in self.nodes
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+class CompiledEdgeIndex(EdgeIndex):
+    """The :class:`~gerrychain.graph.edges.EdgeIndex` of a :class:`CompiledGraph`.
+    Its ids and incidence are read from the CSR arrays of the graph."""
+
+    def __init__(self, graph):
+        self.labels = graph.edge_labels
+        self.ids = CompiledEdgeIds(graph)
+        self.incidence = CompiledIncidence(graph)
+
+
+class CompiledEdgeIds(Mapping):
+    """The ``{canonical edge tuple: edge id}`` mapping of a :class:`CompiledGraph`."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, edge):
+        try:
+            edge_id = self.graph.edge_id(edge)
+        except (IndexError, TypeError):
+            raise KeyError(edge) from None
+        if self.graph.edge_labels[edge_id] != tuple(edge):
+            # Only the canonical orientation of an edge is a key
+            raise KeyError(edge)
+        return edge_id
+
+    def __iter__(self):
+        return iter(self.graph.edge_labels)
+
+    def __len__(self):
+        return len(self.graph.edge_labels)
+
+
+class CompiledIncidence(Mapping):
+    """The ``{node: ((neighbor, edge id), ...)}`` mapping of a :class:`CompiledGraph`."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, node):
+        graph = self.graph
+        i = graph.node_ids[node]
+        return tuple(zip(graph._neighbors(i), graph._incident_edges(i)))
+
+    def __iter__(self):
+        return iter(self.graph)
+
+    def __len__(self):
+        return len(self.graph)
+
+
+class CompiledNodeView(Mapping):
+    def __init__(self, graph, compiled):
+        self.graph = graph
+        self.compiled = compiled
+        self.ids = graph.node_ids
+
+    def __getitem__(self, node):
+        return NodeData(self.compiled, self.ids[node])
+
+    def __iter__(self):
+        return iter(self.graph)
+
+    def __len__(self):
+        return len(self.graph)
+
+    def __contains__(self, node):
+        return node in self.graph
+
+
+class CompiledEdgeView(Mapping):
+    def __init__(self, graph, compiled):
+        self.graph = graph
+        self.compiled = compiled
+
+    def __getitem__(self, edge):
+        return EdgeData(self.compiled, self.graph.edge_id(edge))
+
+    def __iter__(self):
+        return (edge for edge, _ in self.graph._edge_items())
+
+    def __len__(self):
+        return self.graph.number_of_edges()
+
+    def __contains__(self, edge):
+        try:
+            self.graph.edge_id(edge)
+        except (KeyError, TypeError, IndexError):
+            return False
+        return True
+
+
+class CompiledAdjacency(Mapping):
+    def __init__(self, graph, compiled):
+        self.graph = graph
+        self.compiled = compiled
+
+    def __getitem__(self, node):
+        graph = self.graph
+        return CompiledNeighbors(graph, self.compiled, graph.node_ids[node])
+
+    def __iter__(self):
+        return iter(self.graph)
+
+    def __len__(self):
+        return len(self.graph)
+
+
+class CompiledNeighbors(Mapping):
+    """The ``{neighbor: edge data}`` mapping of one node, like ``graph.adj[node]``
+    in NetworkX. The edge data are only looked up when accessed."""
+
+    __slots__ = ("graph", "compiled", "i")
+
+    def __init__(self, graph, compiled, i):
+        self.graph = graph
+        self.compiled = compiled
+        self.i = i
+
+    def __getitem__(self, neighbor):
+        graph = self.graph
+        try:
+            k = graph._neighbors(self.i).index(neighbor)
+        except ValueError:
+            raise KeyError(neighbor) from None
+        return EdgeData(self.compiled, graph._incident_edges(self.i)[k])
+
+    def __iter__(self):
+        return iter(self.graph._neighbors(self.i))
+
+    def items(self):
+        """List of the ``(neighbor, edge data)`` pairs, read in one pass over the
+        node's row of the arrays."""
+        graph, compiled, i = self.graph, self.compiled, self.i
+        return [
+            (node, EdgeData(compiled, edge_id))
+            for node, edge_id in zip(graph._neighbors(i), graph._incident_edges(i))
+        ]
+
+    def values(self):
+        compiled = self.compiled
+        return [EdgeData(compiled, edge_id) for edge_id in self.graph._incident_edges(self.i)]
+
+    def __len__(self):
+        return len(self.graph._neighbors(self.i))
+
+    def __contains__(self, neighbor):
+        return neighbor in self.graph._neighbors(self.i)
+
+
+class NodeData(Mapping):
+    """The attributes of one node of a :class:`CompiledGraph`."""
+
+    __slots__ = ("graph", "i")
+
+    def __init__(self, graph, i):
+        self.graph = graph
+        self.i = i
+
+    def __getitem__(self, key):
+        try:
+            reader = self.graph._node_readers[key]
+        except KeyError:
+            reader = self.graph._node_reader(key)
+        value = reader[self.i]
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        return (key for key in self.graph.node_columns if key in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        return (
+            key in self.graph.node_columns
+            and self.graph._node_reader(key)[self.i] is not MISSING
+        )
+
+    def copy(self):
+        return dict(self)
+
+
+class EdgeData(Mapping):
+    """The attributes of one edge of a :class:`CompiledGraph`."""
+
+    __slots__ = ("graph", "i")
+
+    def __init__(self, graph, i):
+        self.graph = graph
+        self.i = i
+
+    def __getitem__(self, key):
+        try:
+            reader = self.graph._edge_readers[key]
+        except KeyError:
+            reader = self.graph._edge_reader(key)
+        value = reader[self.i]
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        return (key for key in self.graph.edge_columns if key in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        return (
+            key in self.graph.edge_columns
+            and self.graph._edge_reader(key)[self.i] is not MISSING
+        )
+
+    def copy(self):
+        return dict(self)
+
+
+def compile_columns(rows):
+    """Turn a list of attribute dictionaries into a dictionary of columns."""
+    keys = {}
+    for row in rows:
+        keys.update(dict.fromkeys(row))
+    return {key: compile_column([row.get(key, MISSING) for row in rows]) for key in keys}
+
+
+def compile_column(values):
+    """Store numeric data as a numeric NumPy array, and anything else (strings,
+    geometries, missing values) as an array of objects."""
+    if all(isinstance(value, numbers.Number) for value in values):
+        try:
+            return numpy.array(values)
+        except OverflowError:
+            pass
+    column = numpy.empty(len(values), dtype=object)
+    column[:] = values
+    return column
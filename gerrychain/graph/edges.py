@@ -0,0 +1,165 @@
+import functools
+import operator
+from collections.abc import Set
+
+
+def canonical_edge(edge):
+    """The canonical orientation of an edge: its endpoints in sorted order, if the
+    nodes can be compared, and the given order otherwise."""
+    u, v = edge[0], edge[1]
+    try:
+        return (u, v) if u <= v else (v, u)
+    except TypeError:
+        return (u, v)
+
+
+class EdgeIndex:
+    """A table giving each edge of a graph a single integer id.
+
+    :ivar labels: Tuple of the canonical ``(u, v)`` tuples of the edges, by id.
+    :ivar ids: Dictionary mapping canonical edge tuples to their ids.
+    :ivar incidence: Dictionary mapping each node to a tuple of
+        ``(neighbor, edge id)`` pairs, in the order of ``graph.neighbors(node)``.
+    """
+
+    def __init__(self, labels, incidence):
+        self.labels = labels
+        self.ids = {edge: i for i, edge in enumerate(labels)}
+        self.incidence = incidence
+
+    @classmethod
+    def from_graph(cls, graph):
+        labels = tuple(canonical_edge(edge) for edge in graph.edges)
+
+        # Look up edges in both orientations, in case the nodes are not sortable
+        either_orientation = {}
+        for i, (u, v) in enumerate(labels):
+            either_orientation[(u, v)] = either_orientation[(v, u)] = i
+
+        incidence = {
+            node: tuple(
+                (neighbor, either_orientation[(node, neighbor)])
+                for neighbor in graph.neighbors(node)
+            )
+            for node in graph.nodes
+        }
+        return cls(labels, incidence)
+
+    @classmethod
+    def of(cls, graph):
+        """The edge index of ``graph``: the index the graph provides as
+        ``graph.edge_index`` (like a :class:`~gerrychain.graph.CompiledGraph`,
+        which cannot change), or else a new index of the graph's current edges."""
+        own_index = getattr(graph, "edge_index", None)
+        if isinstance(own_index, EdgeIndex):
+            return own_index
+        return cls.from_graph(graph)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def id(self, edge):
+        """The id of the given edge, in either orientation."""
+        try:
+            return self.ids[edge]
+        except KeyError:
+            return self.ids[(edge[1], edge[0])]
+
+    def empty(self):
+        return EdgeSet(self)
+
+
+class EdgeSet(Set):
+    """An immutable set of edges, stored as a frozenset of edge ids from an
+    :class:`EdgeIndex`.
+
+    It behaves like a set of canonical ``(u, v)`` edge tuples: iterating yields
+    the tuples (in the iteration order of the frozenset of ids, which only depends
+    on how the set was built) and membership tests take tuples. Set
+    operations between two :class:`EdgeSet` objects are done on the integer ids.
+    """
+
+    __slots__ = ("index", "ids")
+
+    def __init__(self, index, ids=frozenset()):
+        self.index = index
+        self.ids = ids
+
+    @classmethod
+    def from_edges(cls, index, edges):
+        return cls(index, frozenset(index.id(edge) for edge in edges))
+
+    def __contains__(self, edge):
+        edge_id = self.index.ids.get(edge)
+        return edge_id is not None and edge_id in self.ids
+
+    def __iter__(self):
+        return map(self.index.labels.__getitem__, self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return "EdgeSet({})".format(set(self))
+
+    def __reduce__(self):
+        # Pickle as a plain frozenset of edge tuples, rather than with the index.
+        return (frozenset, (frozenset(self),))
+
+    def _from_iterable(self, iterable):
+        edges = list(iterable)
+        try:
+            return EdgeSet(self.index, frozenset(self.index.ids[edge] for edge in edges))
+        except (KeyError, TypeError):
+            return frozenset(edges)
+
+    def _same_index(self, other):
+        return isinstance(other, EdgeSet) and other.index is self.index
+
+    def __eq__(self, other):
+        if self._same_index(other):
+            return self.ids == other.ids
+        return Set.__eq__(self, other)
+
+    def __or__(self, other):
+        if self._same_index(other):
+            return EdgeSet(self.index, self.ids | other.ids)
+        return Set.__or__(self, other)
+
+    def __and__(self, other):
+        if self._same_index(other):
+            return EdgeSet(self.index, self.ids & other.ids)
+        return Set.__and__(self, other)
+
+    def __sub__(self, other):
+        if self._same_index(other):
+            return EdgeSet(self.index, self.ids - other.ids)
+        return Set.__sub__(self, other)
+
+    def __xor__(self, other):
+        if self._same_index(other):
+            return EdgeSet(self.index, self.ids ^ other.ids)
+        return Set.__xor__(self, other)
+
+    __hash__ = Set._hash
+
+    def union(self, *others):
+        return functools.reduce(operator.or_, map(as_set, others), self)
+
+    def intersection(self, *others):
+        return functools.reduce(operator.and_, map(as_set, others), self)
+
+    def difference(self, *others):
+        return functools.reduce(operator.sub, map(as_set, others), self)
+
+    def issubset(self, other):
+        return self <= as_set(other)
+
+    def issuperset(self, other):
+        return self >= as_set(other)
+
+
+def as_set(iterable):
+    if isinstance(iterable, Set):
+        return iterable
+    return set(iterable)
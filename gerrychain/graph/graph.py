@@ -8,6 +8,7 @@ from shapely.ops import unary_union
 from shapely.prepared import prep
 
 from .adjacency import neighbors
+from .compiled import CompiledGraph
 from .geo import GeometryError, invalid_geometries, reprojected
 
 
@@ -142,6 +143,17 @@ class Graph(networkx.Graph):
 
         return graph
 
+    def compile(self):
+        """Returns a frozen, array-backed
+        :class:`~gerrychain.graph.compiled.CompiledGraph` view of this graph, with
+        dense integer node ids, CSR neighbor arrays, canonical edge ids and NumPy
+        columns of the node and edge attributes.
+
+        Changes made to the graph after compiling it are not seen by the
+        compiled view.
+        """
+        return CompiledGraph.from_graph(self)
+
     def add_data(self, df, columns=None):
         """Add columns of a DataFrame to a graph as node attributes using
         by matching the DataFrame's index to node ids.
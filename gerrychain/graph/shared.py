@@ -0,0 +1,233 @@
+"""Publish a :class:`~gerrychain.graph.CompiledGraph` in shared memory.
+
+Example usage::
+
+    shared = graph.compile().to_shared_memory()
+
+    def worker(shared):
+        graph = shared.attach()
+        partition = Partition(graph, assignment, updaters)
+        ...
+
+    # ... start worker processes with ``shared`` as an argument ...
+
+    shared.unlink()
+
+Shared graphs need :mod:`multiprocessing.shared_memory`, which was added in
+Python 3.8.
+"""
+import os
+import sys
+from collections.abc import Sequence
+
+import numpy
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    resource_tracker = shared_memory = None
+
+# Before Python 3.13, opening a block registers it with the resource tracker of
+# the process, which unlinks it when the process exits.
+TRACKS_OPENED_BLOCKS = os.name == "posix" and sys.version_info < (3, 13)
+
+from .compiled import CompiledGraph
+
+ALIGNMENT = 64
+
+
+class SharedGraph:
+    """A handle on a :class:`~gerrychain.graph.CompiledGraph` whose adjacency arrays
+    and numeric attribute columns live in a :class:`multiprocessing.shared_memory.SharedMemory`
+    block.
+
+    The handle is small and picklable, so it can be passed to worker processes.
+    :meth:`attach` returns a :class:`~gerrychain.graph.CompiledGraph` whose arrays are
+    read-only views of the shared block, so every process reads the same memory.
+
+    The graph's node labels are only shared without copying when the nodes are the
+    integers ``0, 1, ..., n - 1`` (in that order). Other node labels, attribute
+    columns that are not numeric (strings, geometries, ...) and the graph-level
+    attributes are pickled with the handle, and so are copied into each process.
+
+    The process that published the graph owns the block and should call
+    :meth:`unlink` (or use the handle as a context manager) once the workers are done.
+    """
+
+    def __init__(self, name, layout, node_labels, object_columns, graph_data):
+        """
+        :param name: The name of the shared memory block.
+        :param layout: Dictionary mapping array keys to ``(offset, dtype, length)``.
+        :param node_labels: Tuple of nodes, or a ``range`` for integer nodes.
+        :param object_columns: Dictionary mapping ``("node", key)`` and ``("edge", key)``
+            to the attribute columns that are not shared.
+        :param graph_data: The graph-level attribute dictionary.
+        """
+        self.name = name
+        self.layout = layout
+        self.node_labels = node_labels
+        self.object_columns = object_columns
+        self.graph_data = graph_data
+        self._memory = None
+
+    @classmethod
+    def publish(cls, graph):
+        """Copy the arrays of a :class:`~gerrychain.graph.CompiledGraph` into a new
+        shared memory block."""
+        require_shared_memory()
+        node_labels = graph.node_labels
+        if tuple(node_labels) == tuple(range(len(node_labels))):
+            node_labels = range(len(node_labels))
+        else:
+            node_labels = tuple(node_labels)
+
+        edges = numpy.array(
+            [(graph.node_ids[u], graph.node_ids[v]) for u, v in graph.edge_labels],
+            dtype=numpy.int64,
+        ).reshape(-1, 2)
+        arrays = {
+            "indptr": graph.indptr,
+            "indices": graph.indices,
+            "adjacent_edges": graph.adjacent_edges,
+            "edge_u": edges[:, 0],
+            "edge_v": edges[:, 1],
+        }
+        object_columns = {}
+        for kind, columns in [("node", graph.node_columns), ("edge", graph.edge_columns)]:
+            for key, column in columns.items():
+                if column.dtype == object:
+                    object_columns[(kind, key)] = column
+                else:
+                    arrays[(kind, key)] = column
+
+        layout = {}
+        size = 0
+        for key, array in arrays.items():
+            size = -(-size // ALIGNMENT) * ALIGNMENT
+            layout[key] = (size, array.dtype.str, len(array))
+            size += array.nbytes
+
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        shared = cls(memory.name, layout, node_labels, object_columns, graph.graph)
+        shared._memory = memory
+        for key, array in arrays.items():
+            shared._array(key)[...] = array
+        return shared
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_memory"] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.unlink()
+
+    def _array(self, key):
+        if self._memory is None:
+            self._memory = open_untracked(self.name)
+        offset, dtype, length = self.layout[key]
+        return numpy.ndarray(
+            (length,), dtype=numpy.dtype(dtype), buffer=self._memory.buf, offset=offset
+        )
+
+    def attach(self):
+        """Returns a :class:`~gerrychain.graph.CompiledGraph` backed by the shared
+        memory block. Its arrays are read-only."""
+        arrays = {}
+        for key in self.layout:
+            array = self._array(key)
+            array.flags.writeable = False
+            arrays[key] = array
+
+        node_columns = {}
+        edge_columns = {}
+        for columns, kind in [(node_columns, "node"), (edge_columns, "edge")]:
+            for key in self.layout:
+                if isinstance(key, tuple) and key[0] == kind:
+                    columns[key[1]] = arrays[key]
+            for (column_kind, key), column in self.object_columns.items():
+                if column_kind == kind:
+                    columns[key] = column
+
+        graph = CompiledGraph(
+            self.node_labels,
+            EdgeLabels(self.node_labels, arrays["edge_u"], arrays["edge_v"]),
+            arrays["indptr"],
+            arrays["indices"],
+            arrays["adjacent_edges"],
+            node_columns,
+            edge_columns,
+            self.graph_data,
+        )
+        # Keep the block open for as long as the graph is in use.
+        graph._shared_graph = self
+        return graph
+
+    def close(self):
+        """Close this process's access to the shared memory block."""
+        if self._memory is not None:
+            try:
+                self._memory.close()
+            except BufferError:
+                # A graph attached in this process still uses the block. It is
+                # closed when that graph is garbage collected.
+                return
+            self._memory = None
+
+    def unlink(self):
+        """Free the shared memory block. Call this once, in the process that
+        published the graph, when no process needs the graph anymore."""
+        if self._memory is None:
+            self._memory = open_untracked(self.name)
+        if TRACKS_OPENED_BLOCKS:
+            # Unlinking unregisters the block from the resource tracker, which
+            # processes that attached to it may share and have unregistered it
+            # from already.
+            resource_tracker.register(self._memory._name, "shared_memory")
+        self._memory.unlink()
+        self.close()
+
+
+def require_shared_memory():
+    if shared_memory is None:
+        raise RuntimeError("Shared graphs require Python 3.8 or later.")
+
+
+def open_untracked(name):
+    """Open an existing shared memory block without leaving it to the resource
+    tracker of this process. Otherwise, the block would be unlinked for every
+    process when this one exits. Only the process that published the graph
+    frees it."""
+    require_shared_memory()
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    memory = shared_memory.SharedMemory(name=name)
+    if TRACKS_OPENED_BLOCKS:
+        resource_tracker.unregister(memory._name, "shared_memory")
+    return memory
+
+
+class EdgeLabels(Sequence):
+    """The sequence of ``(u, v)`` edge tuples of a shared graph, read from the
+    shared arrays of endpoint ids."""
+
+    def __init__(self, node_labels, edge_u, edge_v):
+        self.node_labels = node_labels
+        self.edge_u = edge_u
+        self.edge_v = edge_v
+        self._edge_u = memoryview(edge_u)
+        self._edge_v = memoryview(edge_v)
+
+    def __getitem__(self, i):
+        labels = self.node_labels
+        return (labels[self._edge_u[i]], labels[self._edge_v[i]])
+
+    def __iter__(self):
+        labels = self.node_labels
+        return ((labels[u], labels[v]) for u, v in zip(self._edge_u, self._edge_v))
+
+    def __len__(self):
+        return len(self.edge_u)
@@ -0,0 +1,146 @@
+"""Opt-in timing and counters for Markov chain runs.
+
+Pass ``instrumentation=True`` (or an :class:`Instrumentation` instance) to
+:class:`~gerrychain.MarkovChain` to record where the time of a run goes::
+
+    chain = MarkovChain(proposal, constraints, accept, initial_state,
+                        total_steps=1000, instrumentation=True)
+    for partition in chain:
+        pass
+    print(chain.instrumentation.summary())
+
+When instrumentation is disabled, the chain runs the functions it was given
+directly, and :class:`~gerrychain.Partition` only checks one attribute when it
+looks up an updater.
+"""
+import collections
+from time import perf_counter
+
+import pandas
+
+
+class Record:
+    """Call count, failure count, cache hits, and total wall time of one stage,
+    constraint, or updater."""
+
+    __slots__ = ("calls", "failures", "hits", "time")
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.hits = 0
+        self.time = 0.0
+
+
+class Instrumentation:
+    """Records per-stage wall time (proposal, constraints, accept), per-constraint
+    calls and failures, per-updater compute time and cache hits, and the number of
+    invalid proposals that had to be redrawn.
+
+    Updater times are inclusive: an updater that looks up other updaters is also
+    charged for computing them.
+    """
+
+    def __init__(self):
+        self.stages = collections.defaultdict(Record)
+        self.constraints = collections.defaultdict(Record)
+        self.updaters = collections.defaultdict(Record)
+
+    @property
+    def retries(self):
+        """The number of proposals that failed the constraints and were redrawn."""
+        return self.stages["constraints"].failures
+
+    @property
+    def rejections(self):
+        """The number of valid proposals that were not accepted."""
+        return self.stages["accept"].failures
+
+    def stage(self, name, function, count_failures=True):
+        """Wrap ``function`` so that its calls are timed as the stage ``name``."""
+        return TimedCall(function, self.stages[name], count_failures)
+
+    def constraint(self, constraint):
+        """Wrap ``constraint`` so that its calls and failures are recorded."""
+        name = getattr(constraint, "__name__", repr(constraint))
+        return TimedCall(constraint, self.constraints[name], True)
+
+    def compute(self, key, updater, partition):
+        """Compute the updater ``key`` on ``partition``, recording the time taken."""
+        record = self.updaters[key]
+        start = perf_counter()
+        value = updater(partition)
+        record.time += perf_counter() - start
+        record.calls += 1
+        return value
+
+    def hit(self, key):
+        """Record a lookup of the updater ``key`` that was served from the cache."""
+        self.updaters[key].hits += 1
+
+    def summary(self):
+        """Returns a :class:`pandas.DataFrame` with one row per stage, constraint
+        and updater, giving the number of calls, failures, and cache hits, and
+        the total and mean wall time in seconds.
+        """
+        rows = []
+        for kind, records in [
+            ("stage", self.stages),
+            ("constraint", self.constraints),
+            ("updater", self.updaters),
+        ]:
+            for name, record in records.items():
+                rows.append(
+                    {
+                        "kind": kind,
+                        "name": name,
+                        "calls": record.calls,
+                        "failures": record.failures,
+                        "cache_hits": record.hits,
+                        "total_time": record.time,
+                        "mean_time": record.time / record.calls
+                        if record.calls
+                        else float("nan"),
+                    }
+                )
+        return pandas.DataFrame(
+            rows,
+            columns=[
+                "kind",
+                "name",
+                "calls",
+                "failures",
+                "cache_hits",
+                "total_time",
+                "mean_time",
+            ],
+        )
+
+
+class TimedCall:
+    """A function wrapper that adds the calls, failures (falsy results) and wall
+    time of the function to a :class:`Record`."""
+
+    __slots__ = ("function", "record", "count_failures")
+
+    def __init__(self, function, record, count_failures):
+        self.function = function
+        self.record = record
+        self.count_failures = count_failures
+
+    def __call__(self, *args, **kwargs):
+        start = perf_counter()
+        result = self.function(*args, **kwargs)
+        record = self.record
+        record.time += perf_counter() - start
+        record.calls += 1
+        if self.count_failures and not result:
+            record.failures += 1
+        return result
+
+    @property
+    def __name__(self):
+        return getattr(self.function, "__name__", repr(self.function))
+
+    def __repr__(self):
+        return repr(self.function)
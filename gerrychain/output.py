@@ -0,0 +1,229 @@
+"""Stream the scores of a Markov chain run to disk.
+
+Appending per-step scores to lists keeps the whole run in memory. A
+:class:`ScoreWriter` evaluates named score functions at each step, buffers the
+values in fixed-size columnar chunks, and writes full chunks from a background
+thread, so memory use does not grow with the length of the run::
+
+    scores = {
+        "cut_edges": lambda partition: len(partition["cut_edges"]),
+        "percents": lambda partition: partition["SEN12"].percents("Democratic"),
+        "efficiency_gap": lambda partition: efficiency_gap(partition["SEN12"]),
+    }
+    with ScoreWriter("scores.npz", scores) as writer:
+        for partition in chain:
+            writer.record(partition)
+
+    columns = read_scores("scores.npz")
+
+Files ending in ``.parquet`` are written with :mod:`pyarrow`, which must be
+installed, and can be memory-mapped for analysis. Other files are written as
+NumPy ``.npz`` archives holding one array per column and chunk. NumPy cannot
+memory-map the arrays of an ``.npz`` archive (:func:`numpy.load` ignores
+``mmap_mode`` for them), so :func:`read_scores` reads them into memory; use
+Parquet for runs whose scores do not fit in memory.
+"""
+import queue
+import threading
+import zipfile
+
+import numpy
+
+NPZ = "npz"
+PARQUET = "parquet"
+
+
+class ScoreWriter:
+    """Evaluates score functions on each recorded state and streams the values
+    to a Parquet or NPZ file.
+
+    Each score may return a number or a fixed-length sequence of numbers (e.g.
+    one value per district). Every value of a score must have the same shape as
+    its first value. Integer and boolean scores are stored as 64-bit integers and
+    booleans, and all other scores as 64-bit floats.
+    """
+
+    def __init__(self, path, scores, chunk_size=10000, format=None):
+        """
+        :param path: The file to write.
+        :param scores: Dictionary mapping column names to functions of a partition.
+        :param chunk_size: (optional) The number of steps per chunk.
+        :param format: (optional) ``"parquet"`` or ``"npz"``. Defaults to
+            ``"parquet"`` if the path ends in ``.parquet``, and ``"npz"`` otherwise.
+        """
+        if format is None:
+            format = PARQUET if str(path).endswith(".parquet") else NPZ
+        if format == PARQUET:
+            sink = ParquetSink(path)
+        elif format == NPZ:
+            sink = NpzSink(path)
+        else:
+            raise ValueError("Unknown score file format: {}".format(format))
+
+        self.path = path
+        self.scores = scores
+        self.chunk_size = chunk_size
+        self._sink = sink
+        self._buffers = None
+        self._row = 0
+        self._error = None
+        # At most two full chunks wait for the writer thread at any time.
+        self._chunks = queue.Queue(maxsize=2)
+        self._thread = threading.Thread(target=self._write_chunks, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def record(self, partition):
+        """Evaluate the scores on ``partition`` and append their values."""
+        values = {name: score(partition) for name, score in self.scores.items()}
+        if self._buffers is None:
+            self._buffers = self._allocate(values)
+        row = self._row
+        for name, value in values.items():
+            self._buffers[name][row] = value
+        self._row = row + 1
+        if self._row == self.chunk_size:
+            self._flush()
+
+    def close(self):
+        """Write the remaining values, wait for the writer thread, and close
+        the file."""
+        if self._thread is None:
+            return
+        if self._row:
+            self._flush()
+        self._chunks.put(None)
+        self._thread.join()
+        self._thread = None
+        self._check()
+
+    def _allocate(self, values):
+        buffers = {}
+        for name, value in values.items():
+            value = numpy.asarray(value)
+            if value.dtype.kind == "b":
+                dtype = numpy.bool_
+            elif value.dtype.kind in "iu":
+                dtype = numpy.int64
+            else:
+                dtype = numpy.float64
+            buffers[name] = numpy.empty((self.chunk_size,) + value.shape, dtype=dtype)
+        return buffers
+
+    def _flush(self):
+        self._check()
+        chunk = {name: buffer[: self._row] for name, buffer in self._buffers.items()}
+        self._chunks.put(chunk)
+        self._buffers = {
+            name: numpy.empty_like(buffer) for name, buffer in self._buffers.items()
+        }
+        self._row = 0
+
+    def _check(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Writing the scores failed.") from error
+
+    def _write_chunks(self):
+        try:
+            while True:
+                chunk = self._chunks.get()
+                if chunk is None:
+                    break
+                self._sink.write(chunk)
+        except BaseException as error:
+            self._error = error
+            # Keep taking chunks so that record() does not block forever.
+            while self._chunks.get() is not None:
+                pass
+        finally:
+            self._sink.close()
+
+
+class NpzSink:
+    """Writes each chunk as one ``.npy`` entry per column to a ``.npz`` archive.
+    The archive is read into memory, since its entries cannot be memory-mapped."""
+
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True)
+        self.chunks = 0
+
+    def write(self, chunk):
+        for name, column in chunk.items():
+            entry = "{}/{:08d}.npy".format(name, self.chunks)
+            with self.archive.open(entry, "w", force_zip64=True) as f:
+                numpy.lib.format.write_array(f, column, allow_pickle=False)
+        self.chunks += 1
+
+    def close(self):
+        self.archive.close()
+
+
+class ParquetSink:
+    """Writes each chunk as a row group of a Parquet file. Columns with a value
+    per district are stored as fixed-size lists."""
+
+    def __init__(self, path):
+        import pyarrow.parquet
+
+        self.path = path
+        self.parquet = pyarrow.parquet
+        self.writer = None
+
+    def write(self, chunk):
+        import pyarrow
+
+        columns = {}
+        for name, column in chunk.items():
+            if column.ndim == 1:
+                columns[name] = pyarrow.array(column)
+            else:
+                width = int(numpy.prod(column.shape[1:]))
+                columns[name] = pyarrow.FixedSizeListArray.from_arrays(
+                    pyarrow.array(column.reshape(-1)), width
+                )
+        table = pyarrow.table(columns)
+        if self.writer is None:
+            self.writer = self.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def read_scores(path):
+    """Read a file written by a :class:`ScoreWriter` into a dictionary mapping
+    each column name to a NumPy array with one row per recorded step.
+
+    Parquet files are memory-mapped while they are read. The arrays of NPZ
+    archives are always read into memory."""
+    if str(path).endswith(".parquet"):
+        return _read_parquet(path)
+
+    chunks = {}
+    with numpy.load(path) as archive:
+        for entry in sorted(archive.files):
+            name = entry.rsplit("/", 1)[0]
+            chunks.setdefault(name, []).append(archive[entry])
+    return {name: numpy.concatenate(arrays) for name, arrays in chunks.items()}
+
+
+def _read_parquet(path):
+    import pyarrow.parquet
+
+    table = pyarrow.parquet.read_table(path, memory_map=True)
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name).combine_chunks()
+        if hasattr(column, "flatten") and hasattr(column.type, "list_size"):
+            values = column.flatten().to_numpy(zero_copy_only=False)
+            columns[name] = values.reshape(len(column), column.type.list_size)
+        else:
+            columns[name] = column.to_numpy(zero_copy_only=False)
+    return columns
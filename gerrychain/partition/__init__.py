@@ -1,4 +1,5 @@
 from .partition import Partition
 from .geographic import GeographicPartition
+from .mutable import MutablePartition
 
-__all__ = ['Partition', 'GeographicPartition']
+__all__ = ['Partition', 'GeographicPartition', 'MutablePartition']
@@ -1,8 +1,11 @@
 from collections import defaultdict
+from collections.abc import Mapping
 
+import numpy
 import pandas
 
 from ..updaters.flows import flows_from_changes
+from .persistent import NodeIndex, PersistentMapping, PersistentSet
 
 
 class Assignment:
@@ -13,12 +16,24 @@ class Assignment:
     convenient/cheap to access the set of nodes in each part.
 
     An :class:`Assignment` has a ``parts`` property that is a dictionary of the form
-    ``{part: <frozenset of nodes in part>}``.
+    ``{part: <frozenset of nodes in part>}``. It also keeps a ``mapping`` dictionary
+    of the form ``{node: part}``, so that looking up a node's part does not depend
+    on the number of parts.
+
+    Copies of an assignment share its ``mapping``. Each copy records the parts of
+    the nodes that moved since in its own ``changes`` dictionary, which is merged
+    into a new mapping once it holds more than about the square root of the number
+    of nodes. So copying an assignment does not cost ``O(number of nodes)``.
     """
 
-    def __init__(self, parts: dict):
+    def __init__(self, parts: dict, mapping: dict = None, changes: dict = None):
         self.parts = parts
 
+        if mapping is None:
+            mapping = {node: part for part, nodes in parts.items() for node in nodes}
+        self.mapping = mapping
+        self.changes = {} if changes is None else changes
+
     @classmethod
     def from_dict(cls, assignment):
         """Create an Assignment from a dictionary. This is probably the method you want
@@ -29,28 +44,51 @@ class Assignment:
         parts = {
             part: frozenset(nodes) for part, nodes in level_sets(assignment).items()
         }
-        return cls(parts)
+        return cls(parts, dict(assignment.items()))
 
     def __getitem__(self, node):
-        for part, nodes in self.parts.items():
-            if node in nodes:
-                return part
-        raise KeyError(node)
+        changes = self.changes
+        if node in changes:
+            return changes[node]
+        return self.mapping[node]
 
     def copy(self):
         """Returns a copy of the assignment.
-        Does not duplicate the frozensets of nodes, just the parts dictionary.
+        Does not duplicate the frozensets of nodes or the mapping, just the parts
+        and changes dictionaries.
         """
-        return Assignment(self.parts.copy())
+        return Assignment(self.parts.copy(), self.mapping, self.changes.copy())
 
     def update(self, mapping: dict):
         """Update the assignment for some nodes using the given mapping.
         """
-        flows = flows_from_changes(self, mapping)
+        self.update_flows(flows_from_changes(self, mapping))
+
+    def update_flows(self, flows):
+        """Update the assignment using the given flows of nodes between parts, as
+        computed by :func:`~gerrychain.updaters.flows.flows_from_changes`.
+
+        :param flows: dictionary of the form ``{part: {"in": <set of nodes>,
+            "out": <set of nodes>}}``
+        """
+        changes = self.changes
         for part, flow in flows.items():
             # Union between frozenset and set returns an object whose type
             # matches the object on the left, which here is a frozenset
             self.parts[part] = (self.parts[part] - flow["out"]) | flow["in"]
+            for node in flow["in"]:
+                changes[node] = part
+        self._merge_changes()
+
+    def _merge_changes(self):
+        # The mapping is shared with the copies of this assignment, so the
+        # changes are only merged into a new mapping once there are enough of
+        # them to make copying them slower than copying the mapping now and then.
+        if len(self.changes) ** 2 > len(self.mapping):
+            mapping = dict(self.mapping)
+            mapping.update(self.changes)
+            self.mapping = mapping
+            self.changes = {}
 
     def items(self):
         """Iterate over ``(node, part)`` tuples, where ``node`` is assigned to ``part``.
@@ -68,6 +106,9 @@ class Assignment:
         """
         for part, nodes in new_parts.items():
             self.parts[part] = frozenset(nodes)
+            for node in nodes:
+                self.changes[node] = part
+        self._merge_changes()
 
     def get(self, key, default=None):
         try:
@@ -84,12 +125,293 @@ class Assignment:
 
     def to_dict(self):
         """Convert the assignment to a {node: part} dictionary.
-        This is expensive and should be used rarely."""
-        return {node: part for part, nodes in self.parts.items() for node in nodes}
+        This makes a copy of the assignment's mapping."""
+        mapping = dict(self.mapping)
+        mapping.update(self.changes)
+        return mapping
+
+
+class MutableAssignment(Assignment):
+    """An :class:`Assignment` that is updated in place. Its parts are mutable
+    sets, so moving a node costs ``O(1)`` instead of rebuilding the frozensets of
+    the parts it leaves and joins. Used by
+    :class:`~gerrychain.partition.MutablePartition`.
+    """
+
+    @classmethod
+    def from_dict(cls, assignment):
+        """Create a MutableAssignment from a dictionary or pandas Series."""
+        return cls(dict(level_sets(assignment)), dict(assignment.items()))
+
+    def __getitem__(self, node):
+        return self.mapping[node]
+
+    def copy(self):
+        """Returns a copy of the assignment, with copies of the sets of nodes."""
+        return MutableAssignment(
+            {part: set(nodes) for part, nodes in self.parts.items()}, self.mapping.copy()
+        )
+
+    def update_flows(self, flows):
+        """Update the assignment in place using the given flows of nodes between
+        parts."""
+        for part, flow in flows.items():
+            nodes = self.parts.setdefault(part, set())
+            nodes -= flow["out"]
+            nodes |= flow["in"]
+            for node in flow["in"]:
+                self.mapping[node] = part
+
+    def update_parts(self, new_parts):
+        """Update some parts of the assignment. Does not check that every node is
+        still assigned to a part.
+
+        :param dict new_parts: dictionary mapping (some) parts to their new sets or
+            frozensets of nodes
+        """
+        for part, nodes in new_parts.items():
+            self.parts[part] = set(nodes)
+            for node in nodes:
+                self.mapping[node] = part
+
+
+class ArrayAssignment(Assignment):
+    """An :class:`Assignment` that stores the plan as a NumPy array of integer part
+    codes, indexed by a dense integer id for each node.
+
+    Copying an :class:`ArrayAssignment` copies one compact integer array instead of
+    a dictionary of nodes, and updating it is a vectorized write into that array.
+    This makes it a good fit for very large graphs (e.g. census blocks). The node
+    ids and part labels are shared between copies.
+
+    The ``parts`` property is derived lazily from the array: the frozenset of
+    nodes in a part is only built when that part is accessed.
+
+    Example usage::
+
+        assignment = ArrayAssignment.from_dict(plan, nodes=graph.nodes)
+        partition = Partition(graph, assignment, updaters)
+    """
+
+    def __init__(self, nodes, array, labels, index=None, codes=None):
+        """
+        :param nodes: Tuple of nodes. The position of a node in this tuple is its id.
+        :param array: NumPy integer array giving the part code of each node id.
+        :param labels: Tuple of part labels. The position of a label in this tuple
+            is its part code.
+        :param index: (optional) Dictionary mapping each node to its id.
+        :param codes: (optional) Dictionary mapping each part label to its code.
+        """
+        if index is None:
+            index = {node: i for i, node in enumerate(nodes)}
+        if codes is None:
+            codes = {label: code for code, label in enumerate(labels)}
+
+        self.nodes = nodes
+        self.array = array
+        self.labels = labels
+        self.index = index
+        self.codes = codes
+        self._parts = None
+
+    @classmethod
+    def from_dict(cls, assignment, nodes=None):
+        """Create an ArrayAssignment from a dictionary or pandas Series.
+
+        :param assignment: Dictionary or Series mapping nodes to parts.
+        :param nodes: (optional) The nodes in the order that determines their ids,
+            e.g. ``graph.nodes``. Defaults to the order of ``assignment``'s keys.
+        """
+        if nodes is None:
+            nodes = assignment.keys()
+        nodes = tuple(nodes)
+
+        codes, uniques = pandas.factorize(
+            pandas.Series([assignment[node] for node in nodes])
+        )
+        labels = tuple(uniques.tolist())
+        return cls(nodes, codes.astype(numpy.int32), labels)
+
+    @property
+    def parts(self):
+        if self._parts is None:
+            self._parts = ArrayParts(self)
+        return self._parts
+
+    def __getitem__(self, node):
+        return self.labels[self.array[self.index[node]]]
+
+    def copy(self):
+        """Returns a copy of the assignment. Only the array of part codes is
+        duplicated.
+        """
+        return ArrayAssignment(
+            self.nodes, self.array.copy(), self.labels, self.index, self.codes
+        )
+
+    def update(self, mapping: dict):
+        """Update the assignment for some nodes using the given mapping.
+        """
+        ids = numpy.fromiter(
+            (self.index[node] for node in mapping), dtype=numpy.intp, count=len(mapping)
+        )
+        codes = numpy.fromiter(
+            (self._code(part) for part in mapping.values()),
+            dtype=self.array.dtype,
+            count=len(mapping),
+        )
+        self.array[ids] = codes
+        self._parts = None
+
+    def update_flows(self, flows):
+        """Update the assignment using the given flows of nodes between parts."""
+        self.update({node: part for part, flow in flows.items() for node in flow["in"]})
+
+    def _code(self, part):
+        """Returns the code of ``part``, registering it if it is a new part."""
+        try:
+            return self.codes[part]
+        except KeyError:
+            # The labels are shared with the copies of this assignment, so we
+            # register the new part on new containers.
+            self.labels = self.labels + (part,)
+            self.codes = dict(self.codes)
+            self.codes[part] = len(self.labels) - 1
+            return self.codes[part]
+
+    def items(self):
+        """Iterate over ``(node, part)`` tuples, where ``node`` is assigned to ``part``.
+        """
+        labels = self.labels
+        for node, code in zip(self.nodes, self.array.tolist()):
+            yield (node, labels[code])
+
+    def update_parts(self, new_parts):
+        """Update some parts of the assignment. Does not check that every node is
+        still assigned to a part.
+
+        :param dict new_parts: dictionary mapping (some) parts to their new sets or
+            frozensets of nodes
+        """
+        self.update({node: part for part, nodes in new_parts.items() for node in nodes})
+
+    def to_series(self):
+        """Convert the assignment to a :class:`pandas.Series`."""
+        return pandas.Series(
+            pandas.Index(self.labels).take(self.array), index=list(self.nodes)
+        )
+
+    def to_dict(self):
+        """Convert the assignment to a {node: part} dictionary."""
+        return dict(self.items())
+
+
+class ArrayParts(Mapping):
+    """The ``{part: <frozenset of nodes in part>}`` view of an
+    :class:`ArrayAssignment`. The frozensets are built (and cached) on first access.
+    """
+
+    def __init__(self, assignment):
+        self.assignment = assignment
+        self.cache = {}
+
+    def __getitem__(self, part):
+        if part not in self.cache:
+            assignment = self.assignment
+            code = assignment.codes[part]
+            nodes = assignment.nodes
+            self.cache[part] = frozenset(
+                nodes[i] for i in numpy.flatnonzero(assignment.array == code).tolist()
+            )
+        return self.cache[part]
+
+    def __iter__(self):
+        return iter(self.assignment.labels)
+
+    def __len__(self):
+        return len(self.assignment.labels)
+
+
+class PersistentAssignment(Assignment):
+    """An :class:`Assignment` whose parts are :class:`~.persistent.PersistentSet`
+    objects and whose node-to-part mapping is a :class:`~.persistent.PersistentMapping`.
+
+    Updating a part no longer rebuilds a frozenset of the whole part: a flip costs
+    ``O(log n)`` per moved node, and the updated assignment shares its structure
+    with the assignment it was copied from. This keeps flip chains from slowing
+    down as districts get larger.
+
+    Example usage::
+
+        partition = Partition(graph, PersistentAssignment.from_dict(plan), updaters)
+    """
+
+    def __init__(self, parts: dict, mapping: PersistentMapping):
+        self.parts = parts
+        self.mapping = mapping
+
+    def __getitem__(self, node):
+        return self.mapping[node]
+
+    @classmethod
+    def from_dict(cls, assignment, nodes=None):
+        """Create a PersistentAssignment from a dictionary or pandas Series.
+
+        :param assignment: Dictionary or Series mapping nodes to parts.
+        :param nodes: (optional) The nodes in the order that determines their ids.
+            Defaults to the order of ``assignment``'s keys.
+        """
+        if nodes is None:
+            nodes = assignment.keys()
+        index = NodeIndex(nodes)
+
+        parts = {
+            part: PersistentSet.from_nodes(index, nodes)
+            for part, nodes in level_sets(assignment).items()
+        }
+        return cls(parts, PersistentMapping.from_dict(index, assignment))
+
+    def copy(self):
+        """Returns a copy of the assignment. The persistent sets and mapping are
+        immutable, so they are shared rather than copied.
+        """
+        return PersistentAssignment(self.parts.copy(), self.mapping)
+
+    def update_flows(self, flows):
+        """Update the assignment using the given flows of nodes between parts."""
+        for part, flow in flows.items():
+            self.parts[part] = self._part(part).changed(flow["in"], flow["out"])
+        self.mapping = self.mapping.updated(
+            {node: part for part, flow in flows.items() for node in flow["in"]}
+        )
+
+    def update_parts(self, new_parts):
+        """Update some parts of the assignment. Does not check that every node is
+        still assigned to a part.
+
+        :param dict new_parts: dictionary mapping (some) parts to their new sets or
+            frozensets of nodes
+        """
+        for part, nodes in new_parts.items():
+            self.parts[part] = PersistentSet.from_nodes(self.mapping.index, nodes)
+        self.mapping = self.mapping.updated(
+            {node: part for part, nodes in new_parts.items() for node in nodes}
+        )
+
+    def _part(self, part):
+        if part in self.parts:
+            return self.parts[part]
+        return PersistentSet(self.mapping.index)
+
+    def to_dict(self):
+        """Convert the assignment to a {node: part} dictionary."""
+        return dict(self.mapping.items())
 
 
 def get_assignment(assignment, graph=None):
-    if isinstance(assignment, str):
+    if isinstance(assignment, Assignment):
+        return assignment
+    elif isinstance(assignment, str):
         if graph is None:
             raise TypeError(
                 "You must provide a graph when using a node attribute for the assignment"
@@ -99,8 +421,6 @@ def get_assignment(assignment, graph=None):
         )
     elif callable(getattr(assignment, "items", None)):
         return Assignment.from_dict(assignment)
-    elif isinstance(assignment, Assignment):
-        return assignment
     else:
         raise TypeError("Assignment must be a dict or a node attribute key")
 
@@ -0,0 +1,205 @@
+from collections.abc import Mapping
+
+from ..updaters.flows import flows_from_changes
+from .assignment import Assignment, MutableAssignment
+from .partition import Partition
+from .subgraphs import SubgraphView
+
+
+class MutablePartition(Partition):
+    """A :class:`Partition` that is changed in place.
+
+    :meth:`flip` applies the flips to this partition and returns it, instead of
+    building a new partition. The state before the flip stays available as
+    :attr:`parent` (a :class:`PartitionSnapshot`), so the updaters still compute
+    their new values incrementally from the previous ones, and the constraints and
+    acceptance functions work unchanged. :meth:`rollback` undoes the flips made
+    since the last :meth:`commit`.
+
+    A flip does not copy the assignment: updating it and recording the undo log
+    (the flows of the flipped nodes) costs ``O(|flips|)``. The updaters still
+    build their new values as they do for a :class:`Partition`, though. For
+    instance, ``cut_edges`` builds a new set of all the cut edges
+    (``O(number of cut edges)``), and a tally copies its dictionary of totals
+    (``O(number of parts)``).
+
+    This is what ``MarkovChain(..., in_place=True)`` runs on. Since there is only
+    one state, proposals must only call ``partition.flip`` on the state they are
+    given, once, and a snapshot is only valid until the next flip.
+
+    Example usage::
+
+        state = MutablePartition.from_partition(partition)
+        state.flip({node: part})
+        if not is_valid(state):
+            state.rollback()
+    """
+
+    def _first_time(self, graph, assignment, updaters):
+        super()._first_time(graph, assignment, updaters)
+        self.assignment = MutableAssignment.from_dict(self.assignment.to_dict())
+        self._undo = []
+        self._commits = 0
+
+    @classmethod
+    def from_partition(cls, partition):
+        """Create a MutablePartition with the same graph, assignment, and updaters
+        as ``partition``. The updater values already computed are reused.
+        """
+        state = cls(partition.graph, partition.assignment, partition.updaters)
+        state.edge_index = partition.edge_index
+        state.instrumentation = partition.instrumentation
+        state._cache.update(partition._cache)
+        return state
+
+    def __repr__(self):
+        number_of_parts = len(self)
+        s = "s" if number_of_parts > 1 else ""
+        return "MutablePartition of a graph into {} part{}".format(number_of_parts, s)
+
+    def flip(self, flips):
+        """Apply the given `flips` to this partition in place.
+
+        :param flips: dictionary assigning nodes of the graph to their new districts
+        :return: this partition
+        :rtype: MutablePartition
+        """
+        flows = flows_from_changes(self.assignment, flips)
+        snapshot = PartitionSnapshot(self, flows)
+        self._undo.append(snapshot)
+
+        self.assignment.update_flows(flows)
+        self._invalidate_subgraphs(flows)
+
+        self.parent = snapshot
+        self.flips = flips
+        self._flows = flows
+        self._edge_flows = None
+        self._cache = dict()
+        return self
+
+    def commit(self):
+        """Keep the flips made since the last commit. The previous state stays
+        available as :attr:`parent` until the next flip."""
+        self._undo.clear()
+        self._commits += 1
+
+    def rollback(self):
+        """Undo the flips made since the last commit, restoring the assignment
+        and the updater values."""
+        while self._undo:
+            snapshot = self._undo.pop()
+            self.assignment.update_flows(
+                {
+                    part: {"in": flow["out"], "out": flow["in"]}
+                    for part, flow in snapshot.undo_flows.items()
+                }
+            )
+            self._invalidate_subgraphs(snapshot.undo_flows)
+            self.subgraphs.subgraphs_cache.update(snapshot.subgraphs_cache)
+            self._cache = snapshot._cache
+
+        # The snapshots of earlier steps were relative to an assignment that has
+        # since changed, so the restored state has no parent.
+        self.parent = None
+        self.flips = None
+        self._flows = None
+        self._edge_flows = None
+
+    def _invalidate_subgraphs(self, flows):
+        for part in flows:
+            self.subgraphs.subgraphs_cache.pop(part, None)
+
+
+class PartitionSnapshot(Partition):
+    """The state of a :class:`MutablePartition` before its last flip.
+
+    The snapshot does not copy the assignment: it reads the current assignment of
+    the mutable partition and undoes the last flows on the fly. It keeps the
+    updater cache of the previous state, so ``partition.parent[key]`` is as cheap
+    as for an ordinary :class:`Partition`.
+    """
+
+    def __init__(self, state, flows):
+        """
+        :param state: The :class:`MutablePartition`, before the flip is applied.
+        :param flows: The flows of the flip about to be applied.
+        """
+        self.graph = state.graph
+        self.edge_index = state.edge_index
+        self.updaters = state.updaters
+        self.instrumentation = state.instrumentation
+        self.parent = None
+        self.flips = None
+        self._flows = None
+        self._edge_flows = None
+
+        self.undo_flows = flows
+        self.subgraphs_cache = {
+            part: state.subgraphs.subgraphs_cache[part]
+            for part in flows
+            if part in state.subgraphs.subgraphs_cache
+        }
+        self.assignment = SnapshotAssignment(state.assignment, flows)
+        self._cache = state._cache
+        self.subgraphs = SubgraphView(self.graph, self.parts)
+
+
+class SnapshotAssignment(Assignment):
+    """The assignment of a :class:`MutableAssignment` before the given flows were
+    applied to it."""
+
+    def __init__(self, current, flows):
+        self.current = current
+        self.flows = flows
+        self.previous = {
+            node: part for part, flow in flows.items() for node in flow["out"]
+        }
+        self._parts = None
+
+    @property
+    def parts(self):
+        if self._parts is None:
+            self._parts = SnapshotParts(self.current.parts, self.flows)
+        return self._parts
+
+    def __getitem__(self, node):
+        if node in self.previous:
+            return self.previous[node]
+        return self.current[node]
+
+    def items(self):
+        for node in self.current.mapping:
+            yield (node, self[node])
+
+    def copy(self):
+        return Assignment.from_dict(self.to_dict())
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+class SnapshotParts(Mapping):
+    """The ``{part: <frozenset of nodes in part>}`` view of a
+    :class:`SnapshotAssignment`. Only the parts changed by the flows are rebuilt,
+    on first access."""
+
+    def __init__(self, current, flows):
+        self.current = current
+        self.flows = flows
+        self.cache = {}
+
+    def __getitem__(self, part):
+        if part not in self.flows:
+            return self.current[part]
+        if part not in self.cache:
+            flow = self.flows[part]
+            nodes = self.current.get(part, frozenset())
+            self.cache[part] = frozenset(nodes - flow["in"]) | flow["out"]
+        return self.cache[part]
+
+    def __iter__(self):
+        return iter(self.current)
+
+    def __len__(self):
+        return len(self.current)
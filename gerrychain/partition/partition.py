@@ -2,7 +2,7 @@ import json
 
 import geopandas
 
-from ..graph import Graph
+from ..graph import EdgeIndex, Graph
 from ..updaters import compute_edge_flows, flows_from_changes
 from .assignment import get_assignment
 from .subgraphs import SubgraphView
@@ -17,6 +17,10 @@ class Partition:
 
     default_updaters = {}
 
+    #: The :class:`~gerrychain.instrumentation.Instrumentation` recording the
+    #: time spent computing updaters, if any. Inherited by child partitions.
+    instrumentation = None
+
     def __init__(
         self, graph=None, assignment=None, updaters=None, parent=None, flips=None
     ):
@@ -41,6 +45,8 @@ class Partition:
 
         self.assignment = get_assignment(assignment, graph)
 
+        self.edge_index = EdgeIndex.of(graph)
+
         if updaters is None:
             updaters = dict()
         self.updaters = self.default_updaters.copy()
@@ -48,21 +54,22 @@ class Partition:
 
         self.parent = None
         self.flips = None
-        self.flows = None
-        self.edge_flows = None
+        self._flows = None
+        self._edge_flows = None
 
     def _from_parent(self, parent, flips):
         self.parent = parent
         self.flips = flips
+        self._flows = None
+        self._edge_flows = None
 
         self.assignment = parent.assignment.copy()
-        self.assignment.update(flips)
+        self.assignment.update_flows(self.flows)
 
         self.graph = parent.graph
+        self.edge_index = parent.edge_index
         self.updaters = parent.updaters
-
-        self.flows = flows_from_changes(parent.assignment, flips)
-        self.edge_flows = compute_edge_flows(self)
+        self.instrumentation = parent.instrumentation
 
     def __repr__(self):
         number_of_parts = len(self)
@@ -98,16 +105,53 @@ class Partition:
         :param key: Property to access.
         """
         if key not in self._cache:
-            self._cache[key] = self.updaters[key](self)
+            if self.instrumentation is None:
+                self._cache[key] = self.updaters[key](self)
+            else:
+                self._cache[key] = self.instrumentation.compute(
+                    key, self.updaters[key], self
+                )
+        elif self.instrumentation is not None:
+            self.instrumentation.hit(key)
         return self._cache[key]
 
+    def __getstate__(self):
+        # The updater values are computed again after unpickling. Sets of edges
+        # are pickled without their edge index, so they could not be updated.
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        return state
+
     def __getattr__(self, key):
+        if "_cache" not in self.__dict__:
+            # Not initialized yet, e.g. while unpickling
+            raise AttributeError(key)
         return self[key]
 
     @property
     def parts(self):
         return self.assignment.parts
 
+    @property
+    def flows(self):
+        """The nodes flowing into and out of each part, relative to the parent
+        partition, as ``{part: {"in": <set of nodes>, "out": <set of nodes>}}``.
+        Computed on first access. None if the partition has no parent.
+        """
+        if self._flows is None and self.parent is not None:
+            self._flows = flows_from_changes(self.parent.assignment, self.flips)
+        return self._flows
+
+    @property
+    def edge_flows(self):
+        """The cut edges flowing into and out of each part, relative to the parent
+        partition. Computed on first access, so that chains without edge-based
+        updaters never pay for it. None if the partition has no parent.
+        """
+        if self._edge_flows is None and self.parent is not None:
+            self._edge_flows = compute_edge_flows(self)
+        return self._edge_flows
+
     def plot(self, geometries, **kwargs):
         """Plot the partition, using the provided geometries.
 
@@ -0,0 +1,217 @@
+"""Persistent (immutable, structure-sharing) containers keyed by dense node ids.
+
+Both containers are stored as a trie with 32 children per level. Changing a few
+entries copies only the path from the root to the changed leaves, so a new
+version costs ``O(log n)`` per changed node and shares everything else with the
+version it was derived from.
+"""
+from collections.abc import Mapping, Set
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+
+
+def trie_depth(size):
+    """Number of internal levels needed to hold ``size`` keys in leaves of
+    ``WIDTH`` keys each."""
+    leaves = max(1, (size + MASK) >> BITS)
+    depth = 0
+    while WIDTH ** depth < leaves:
+        depth += 1
+    return depth
+
+
+def get_leaf(root, depth, key):
+    """Returns the leaf at position ``key``, or None if it is missing."""
+    node = root
+    for level in range(depth - 1, -1, -1):
+        if node is None:
+            return None
+        node = node[(key >> (BITS * level)) & MASK]
+    return node
+
+
+def set_leaf(node, depth, key, leaf):
+    """Returns a copy of the trie rooted at ``node`` with the leaf at position
+    ``key`` replaced. Only the path to that leaf is copied."""
+    if depth == 0:
+        return leaf
+    children = list(node) if node is not None else [None] * WIDTH
+    slot = (key >> (BITS * (depth - 1))) & MASK
+    children[slot] = set_leaf(children[slot], depth - 1, key, leaf)
+    return tuple(children)
+
+
+def build_trie(leaves, depth):
+    """Build a trie from a ``{key: leaf}`` dictionary."""
+    level = leaves
+    for _ in range(depth):
+        parents = {}
+        for key, child in level.items():
+            parents.setdefault(key >> BITS, [None] * WIDTH)[key & MASK] = child
+        level = {key: tuple(children) for key, children in parents.items()}
+    return level.get(0)
+
+
+def iter_leaves(node, depth, prefix=0):
+    """Iterate over ``(key, leaf)`` pairs of the trie in key order."""
+    if node is None:
+        return
+    if depth == 0:
+        yield prefix, node
+        return
+    for slot, child in enumerate(node):
+        if child is not None:
+            yield from iter_leaves(child, depth - 1, (prefix << BITS) | slot)
+
+
+def count_bits(bits):
+    return bin(bits).count("1")
+
+
+class NodeIndex:
+    """Assigns a dense integer id to each node. Shared by all of the persistent
+    containers derived from one another."""
+
+    def __init__(self, nodes):
+        self.nodes = tuple(nodes)
+        self.ids = {node: i for i, node in enumerate(self.nodes)}
+        self.depth = trie_depth(len(self.nodes))
+
+
+class PersistentSet(Set):
+    """An immutable set of nodes stored as a bitmap trie over node ids.
+
+    :meth:`changed` returns a new set that shares all of its untouched leaves
+    with this one.
+    """
+
+    __slots__ = ("index", "root", "length")
+
+    def __init__(self, index, root=None, length=0):
+        self.index = index
+        self.root = root
+        self.length = length
+
+    @classmethod
+    def from_nodes(cls, index, nodes):
+        leaves = {}
+        for node in nodes:
+            i = index.ids[node]
+            leaves[i >> BITS] = leaves.get(i >> BITS, 0) | (1 << (i & MASK))
+        length = sum(count_bits(bits) for bits in leaves.values())
+        return cls(index, build_trie(leaves, index.depth), length)
+
+    def __contains__(self, node):
+        i = self.index.ids.get(node)
+        if i is None:
+            return False
+        bits = get_leaf(self.root, self.index.depth, i >> BITS)
+        return bits is not None and bool((bits >> (i & MASK)) & 1)
+
+    def __iter__(self):
+        nodes = self.index.nodes
+        for key, bits in iter_leaves(self.root, self.index.depth):
+            offset = key << BITS
+            while bits:
+                lowest = bits & -bits
+                yield nodes[offset + lowest.bit_length() - 1]
+                bits ^= lowest
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return "PersistentSet({})".format(set(self))
+
+    def _from_iterable(self, iterable):
+        # Set operations with other kinds of sets produce plain frozensets.
+        return frozenset(iterable)
+
+    __hash__ = Set._hash
+
+    def changed(self, added=(), removed=()):
+        """Returns a new set with the ``added`` nodes added and the ``removed``
+        nodes removed.
+        """
+        ids = self.index.ids
+        changes = {}
+        for node in added:
+            i = ids[node]
+            on, off = changes.get(i >> BITS, (0, 0))
+            changes[i >> BITS] = (on | (1 << (i & MASK)), off)
+        for node in removed:
+            i = ids[node]
+            on, off = changes.get(i >> BITS, (0, 0))
+            changes[i >> BITS] = (on, off | (1 << (i & MASK)))
+
+        root, length, depth = self.root, self.length, self.index.depth
+        for key, (on, off) in changes.items():
+            old = get_leaf(root, depth, key) or 0
+            new = (old | on) & ~off
+            if new != old:
+                length += count_bits(new) - count_bits(old)
+                root = set_leaf(root, depth, key, new or None)
+        return PersistentSet(self.index, root, length)
+
+
+class PersistentMapping(Mapping):
+    """An immutable ``{node: value}`` mapping stored as a trie over node ids.
+
+    :meth:`updated` returns a new mapping that shares all of its untouched leaves
+    with this one.
+    """
+
+    __slots__ = ("index", "root", "length")
+
+    _missing = object()
+
+    def __init__(self, index, root=None, length=0):
+        self.index = index
+        self.root = root
+        self.length = length
+
+    @classmethod
+    def from_dict(cls, index, mapping):
+        return cls(index).updated(mapping)
+
+    def __getitem__(self, node):
+        i = self.index.ids[node]
+        leaf = get_leaf(self.root, self.index.depth, i >> BITS)
+        value = self._missing if leaf is None else leaf[i & MASK]
+        if value is self._missing:
+            raise KeyError(node)
+        return value
+
+    def __iter__(self):
+        nodes = self.index.nodes
+        missing = self._missing
+        for key, leaf in iter_leaves(self.root, self.index.depth):
+            offset = key << BITS
+            for slot, value in enumerate(leaf):
+                if value is not missing:
+                    yield nodes[offset + slot]
+
+    def __len__(self):
+        return self.length
+
+    def updated(self, mapping):
+        """Returns a new mapping with the items of ``mapping`` set."""
+        ids = self.index.ids
+        changes = {}
+        for node, value in mapping.items():
+            i = ids[node]
+            changes.setdefault(i >> BITS, []).append((i & MASK, value))
+
+        root, length, depth = self.root, self.length, self.index.depth
+        missing = self._missing
+        for key, values in changes.items():
+            old = get_leaf(root, depth, key)
+            leaf = list(old) if old is not None else [missing] * WIDTH
+            for slot, value in values:
+                if leaf[slot] is missing:
+                    length += 1
+                leaf[slot] = value
+            root = set_leaf(root, depth, key, tuple(leaf))
+        return PersistentMapping(self.index, root, length)
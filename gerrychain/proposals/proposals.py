@@ -1,6 +1,20 @@
+from ..graph.edges import EdgeSet
 from ..random import random
 
 
+def random_edge(edges):
+    """Chooses a random edge from a set of edges.
+
+    The order a set iterates in depends on how it was built, so the edge is
+    chosen from the sorted ids of an :class:`~gerrychain.graph.EdgeSet`. This
+    way, a chain resumed from a checkpoint makes the same choices as the
+    original run.
+    """
+    if isinstance(edges, EdgeSet):
+        return edges.index.labels[random.choice(sorted(edges.ids))]
+    return random.choice(tuple(edges))
+
+
 def propose_any_node_flip(partition):
     """Flip a random node (not necessarily on the boundary) to a random part
     """
@@ -20,7 +34,7 @@ def propose_flip_every_district(partition):
     flips = dict()
 
     for dist_edges in partition["cut_edges_by_part"].values():
-        edge = random.choice(tuple(dist_edges))
+        edge = random_edge(dist_edges)
 
         index = random.choice((0, 1))
         flipped_node, other_node = edge[index], edge[1 - index]
@@ -39,7 +53,7 @@ def propose_chunk_flip(partition):
     """
     flips = dict()
 
-    edge = random.choice(tuple(partition["cut_edges"]))
+    edge = random_edge(partition["cut_edges"])
     index = random.choice((0, 1))
 
     flipped_node = edge[index]
@@ -64,7 +78,7 @@ def propose_random_flip(partition):
     """
     if len(partition["cut_edges"]) == 0:
         return partition
-    edge = random.choice(tuple(partition["cut_edges"]))
+    edge = random_edge(partition["cut_edges"])
     index = random.choice((0, 1))
     flipped_node, other_node = edge[index], edge[1 - index]
     flip = {flipped_node: partition.assignment[other_node]}
@@ -1,8 +1,18 @@
-from ..random import random
-from ..tree import recursive_tree_part
+from ..tree import random_spanning_tree, recursive_tree_part
+from .proposals import random_edge
 
 
-def recom(partition, pop_col, pop_target, epsilon, node_repeats):
+def recom(
+    partition,
+    pop_col,
+    pop_target,
+    epsilon,
+    node_repeats,
+    spanning_tree_fn=random_spanning_tree,
+    max_attempts=10000,
+    time_limit=None,
+    stats=None,
+):
     """ReCom proposal.
 
     Description from MGGG's 2018 Virginia House of Delegates report:
@@ -29,12 +39,19 @@ def recom(partition, pop_col, pop_target, epsilon, node_repeats):
 
         chain = MarkovChain(proposal, constraints, accept, partition, total_steps)
 
+    Pass ``spanning_tree_fn=uniform_spanning_tree`` (from :mod:`gerrychain.tree`) to
+    draw the spanning trees uniformly with Wilson's algorithm. ``max_attempts``,
+    ``time_limit`` and ``stats`` are passed on to
+    :func:`~gerrychain.tree.bipartition_tree`.
     """
-    edge = random.choice(tuple(partition["cut_edges"]))
+    edge = random_edge(partition["cut_edges"])
     parts_to_merge = (partition.assignment[edge[0]], partition.assignment[edge[1]])
 
     subgraph = partition.graph.subgraph(
-        partition.parts[parts_to_merge[0]] | partition.parts[parts_to_merge[1]]
+        canonical_order(
+            partition.graph,
+            partition.parts[parts_to_merge[0]] | partition.parts[parts_to_merge[1]],
+        )
     )
 
     flips = recursive_tree_part(
@@ -44,6 +61,25 @@ def recom(partition, pop_col, pop_target, epsilon, node_repeats):
         pop_target=pop_target,
         epsilon=epsilon,
         node_repeats=node_repeats,
+        spanning_tree_fn=spanning_tree_fn,
+        max_attempts=max_attempts,
+        time_limit=time_limit,
+        stats=stats,
     )
 
     return partition.flip(flips)
+
+
+def canonical_order(graph, nodes):
+    """The nodes in an order that only depends on which nodes they are: sorted, or
+    in the order of ``graph`` if they cannot be compared.
+
+    The spanning trees are drawn in the order of the nodes of the subgraph,
+    which follows the order of the set of nodes it is built from. The order of
+    a set depends on how it was built, so this keeps a chain resumed from a
+    checkpoint drawing the same trees as the original run.
+    """
+    try:
+        return sorted(nodes)
+    except TypeError:
+        return [node for node in graph if node in nodes]
@@ -0,0 +1,282 @@
+"""Replica exchange (parallel tempering) for Markov chains.
+
+Example usage::
+
+    from gerrychain.tempering import ReplicaExchange
+
+    def energy(partition):
+        return len(partition["cut_edges"])
+
+    exchange = ReplicaExchange(
+        proposal, constraints, initial_partition, energy,
+        betas=[1.0, 0.5, 0.25, 0.1], score=score,
+    )
+    for replica, level, step, value in exchange.run(rounds=1000):
+        if level == 0:
+            samples.append(value)
+    print(exchange.acceptance_rates, exchange.swap_rates)
+
+Each replica is a :class:`~gerrychain.MarkovChain` running in its own worker
+process. After every ``swap_interval`` steps, the workers send the energies of
+their current states to the parent process, which proposes to exchange the
+temperatures of replicas at neighboring temperature levels. Only the energies
+and temperatures cross process boundaries; the partitions stay where they are.
+"""
+import functools
+import math
+import multiprocessing
+import random as stdlib_random
+import traceback
+
+from . import random as gerrychain_random
+from .chain import MarkovChain
+from .ensemble import chain_seed
+from .random import random
+
+ERROR = "error"
+
+
+class MetropolisAccept:
+    """The Metropolis acceptance function at inverse temperature ``beta`` for the
+    target distribution proportional to ``exp(-beta * energy(partition))``."""
+
+    def __init__(self, energy, beta):
+        """
+        :param energy: Function of a partition returning a number.
+        :param beta: The inverse temperature.
+        """
+        self.energy = energy
+        self.beta = beta
+
+    def __call__(self, partition):
+        change = self.energy(partition) - self.energy(partition.parent)
+        if change <= 0:
+            return True
+        return random.random() < math.exp(-self.beta * change)
+
+
+class ReplicaExchange:
+    """Runs one replica of a chain per inverse temperature, each in its own worker
+    process, and periodically exchanges the temperatures of neighboring replicas.
+
+    A proposed exchange between the replicas at levels ``k`` and ``k + 1`` is
+    accepted with probability
+    ``min(1, exp((betas[k] - betas[k + 1]) * (energy_k - energy_(k + 1))))``,
+    which keeps each level's chain sampling from its own tempered distribution.
+    Even and odd pairs of levels alternate between rounds.
+
+    After a run, :attr:`acceptance_rates` gives the fraction of accepted steps at
+    each temperature level, :attr:`swap_rates` the fraction of accepted exchanges
+    between each pair of neighboring levels, and :attr:`levels` the current level
+    of each replica.
+    """
+
+    def __init__(
+        self,
+        proposal,
+        constraints,
+        initial_state,
+        energy,
+        betas,
+        score,
+        accept=None,
+        swap_interval=100,
+        seed=None,
+        in_place=False,
+        context=None,
+    ):
+        """
+        :param proposal: The proposal function of the replicas.
+        :param constraints: The constraints of the replicas.
+        :param initial_state: The initial :class:`~gerrychain.Partition` of every replica.
+        :param energy: Function of a partition returning a number. Lower energy is
+            more likely.
+        :param betas: The inverse temperatures, one per replica. Level 0 is
+            ``betas[0]``, usually the target temperature.
+        :param score: Function computing the (picklable) value to send back for
+            the state of each replica after each step.
+        :param accept: (optional) Function taking an inverse temperature and
+            returning the acceptance function of a chain at that temperature.
+            Defaults to :class:`MetropolisAccept` for ``energy``.
+        :param swap_interval: (optional) The number of steps of each replica between
+            rounds of exchanges.
+        :param seed: (optional) The seed of the replicas' random streams and of the
+            exchanges. Defaults to the ``GERRYCHAIN_RANDOM_SEED`` seed of
+            :mod:`gerrychain.random`.
+        :param in_place: (optional) Whether to run the replicas in place. See
+            :class:`~gerrychain.MarkovChain`.
+        :param context: (optional) The :mod:`multiprocessing` start method or
+            context to use.
+        """
+        if accept is None:
+            accept = functools.partial(MetropolisAccept, energy)
+        if seed is None:
+            seed = gerrychain_random.seed
+        if not isinstance(context, multiprocessing.context.BaseContext):
+            context = multiprocessing.get_context(context)
+
+        self.proposal = proposal
+        self.constraints = constraints
+        self.initial_state = initial_state
+        self.energy = energy
+        self.betas = list(betas)
+        self.score = score
+        self.accept = accept
+        self.swap_interval = swap_interval
+        self.seed = seed
+        self.in_place = in_place
+        self.context = context
+
+        replicas = len(self.betas)
+        self.levels = list(range(replicas))
+        self.steps = [0] * replicas
+        self.accepted = [0] * replicas
+        self.swap_attempts = [0] * (replicas - 1)
+        self.swap_acceptances = [0] * (replicas - 1)
+        self.rounds = 0
+        self._random = stdlib_random.Random(chain_seed(seed, "exchanges"))
+
+    @property
+    def acceptance_rates(self):
+        """The fraction of accepted proposals at each temperature level."""
+        return [
+            accepted / steps if steps else float("nan")
+            for accepted, steps in zip(self.accepted, self.steps)
+        ]
+
+    @property
+    def swap_rates(self):
+        """The fraction of accepted exchanges between levels ``k`` and ``k + 1``."""
+        return [
+            acceptances / attempts if attempts else float("nan")
+            for acceptances, attempts in zip(self.swap_acceptances, self.swap_attempts)
+        ]
+
+    def run(self, rounds):
+        """Run ``rounds`` rounds of ``swap_interval`` steps per replica, and yield
+        ``(replica, level, step, score(state))`` tuples for the state of each
+        replica after each step, where ``level`` is the replica's temperature level
+        at that step.
+        """
+        spec = (
+            self.proposal,
+            self.constraints,
+            self.accept,
+            self.initial_state,
+            rounds * self.swap_interval,
+            self.swap_interval,
+            self.score,
+            self.energy,
+            self.seed,
+            self.in_place,
+        )
+        connections = []
+        processes = []
+        try:
+            for replica in range(len(self.betas)):
+                parent, child = self.context.Pipe()
+                process = self.context.Process(
+                    target=_run_replica, args=(replica, spec, child), daemon=True
+                )
+                process.start()
+                child.close()
+                connections.append(parent)
+                processes.append(process)
+
+            for _ in range(rounds):
+                for replica, connection in enumerate(connections):
+                    connection.send(self.betas[self.levels[replica]])
+
+                energies = []
+                for replica, connection in enumerate(connections):
+                    message = connection.recv()
+                    if message[0] == ERROR:
+                        raise RuntimeError(
+                            "Replica {} failed in a worker process:\n{}".format(
+                                replica, message[1]
+                            )
+                        )
+                    batch, energy, proposals, accepted = message
+                    level = self.levels[replica]
+                    self.steps[level] += proposals
+                    self.accepted[level] += accepted
+                    energies.append(energy)
+                    for step, value in batch:
+                        yield (replica, level, step, value)
+
+                self._exchange(energies)
+
+            for connection in connections:
+                connection.send(None)
+            for process in processes:
+                process.join()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            for connection in connections:
+                connection.close()
+
+    def _exchange(self, energies):
+        replica_at = {level: replica for replica, level in enumerate(self.levels)}
+        for level in range(self.rounds % 2, len(self.betas) - 1, 2):
+            cold, hot = replica_at[level], replica_at[level + 1]
+            exponent = (self.betas[level] - self.betas[level + 1]) * (
+                energies[cold] - energies[hot]
+            )
+            self.swap_attempts[level] += 1
+            if exponent >= 0 or self._random.random() < math.exp(exponent):
+                self.swap_acceptances[level] += 1
+                self.levels[cold], self.levels[hot] = level + 1, level
+                replica_at[level], replica_at[level + 1] = hot, cold
+        self.rounds += 1
+
+
+def _run_replica(replica, spec, connection):
+    (
+        proposal,
+        constraints,
+        accept,
+        initial_state,
+        total_steps,
+        swap_interval,
+        score,
+        energy,
+        seed,
+        in_place,
+    ) = spec
+    try:
+        random.seed(chain_seed(seed, replica))
+        chain = None
+        while True:
+            beta = connection.recv()
+            if beta is None:
+                break
+            if chain is None:
+                chain = MarkovChain(
+                    proposal,
+                    constraints,
+                    accept(beta),
+                    initial_state,
+                    total_steps,
+                    in_place=in_place,
+                )
+                iter(chain)
+            else:
+                chain.accept = accept(beta)
+
+            batch = []
+            proposals = 0
+            accepted = 0
+            for _ in range(swap_interval):
+                state = next(chain)
+                step = chain.counter - 1
+                if step > 0:
+                    proposals += 1
+                    accepted += state.accepted
+                batch.append((step, score(chain.state)))
+            connection.send((batch, energy(chain.state), proposals, accepted))
+    except Exception:
+        connection.send((ERROR, traceback.format_exc()))
+    finally:
+        connection.close()
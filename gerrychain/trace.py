@@ -0,0 +1,273 @@
+"""Compact traces of Markov chain runs.
+
+Saving every state of a chain (e.g. as ``partition.assignment.to_dict()``) costs
+``O(number of nodes)`` per step. A :class:`TraceRecorder` writes the assignment
+of the first state once, and then only the flips of each step and whether it was
+accepted, in a binary log. A :class:`TraceReader` streams the plans of the run
+back without re-running the proposals::
+
+    with TraceRecorder("run.trace") as recorder:
+        for partition in chain:
+            recorder.record(partition)
+
+    for accepted, assignment in TraceReader("run.trace").plans():
+        ...
+
+Each step is stored as a 5-byte header and 8 bytes per flipped node, so a
+million single-flip steps take about 13 MB.
+"""
+import pickle
+import struct
+
+import numpy
+
+MAGIC = b"GCTRACE\x01"
+
+STEP_REJECTED = 0
+STEP_ACCEPTED = 1
+LABEL = 2
+
+# (kind, count): the number of flips of a step, or the byte length of a label.
+RECORD = struct.Struct("<BI")
+LENGTH = struct.Struct("<Q")
+
+
+class TraceRecorder:
+    """Records the states yielded by a :class:`~gerrychain.MarkovChain` to a
+    binary trace file.
+
+    Each step is stored as the flips that turn the current (last accepted) plan
+    into the yielded plan. When the yielded partition is a child of the last
+    accepted partition that was recorded, these are just its ``flips``.
+    Otherwise (for instance when some steps were not recorded), the recorder
+    finds them by comparing the whole assignment to its own copy of the
+    current plan.
+
+    With ``MarkovChain(..., in_place=True)``, a rejected step is recorded as the
+    unchanged plan that the chain yields. The recorder counts the commits of the
+    chain's :class:`~gerrychain.partition.MutablePartition` to tell whether any
+    steps were not recorded since the last record.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The file to write the trace to.
+        """
+        self.path = path
+        self._file = open(path, "wb")
+        self._nodes = None
+        self._node_ids = None
+        self._label_codes = None
+        self._current = None
+        self._state = None
+        self._commits = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def record(self, partition):
+        """Append the state ``partition`` to the trace."""
+        commits = vars(partition).get("_commits")
+        if self._current is None:
+            self._write_header(partition)
+            self._write_step(True, [])
+            self._state = partition
+            self._commits = commits
+            return
+
+        accepted = vars(partition).get("accepted", True)
+        if partition is self._state:
+            # An in-place chain yields the same partition at every step. Its flips
+            # are those of this step only if no accepted step was skipped since
+            # the last record.
+            in_step = self._commits is not None and commits == self._commits + accepted
+        else:
+            in_step = partition.parent is self._state and partition.flips is not None
+        if in_step:
+            flips = partition.flips or {}
+            pairs = [(self._node_ids[node], self._code(part)) for node, part in flips.items()]
+        else:
+            pairs = self._diff(partition)
+
+        self._write_step(accepted, pairs)
+        if accepted:
+            current = self._current
+            for node_id, code in pairs:
+                current[node_id] = code
+            self._state = partition
+        # After a rejected step that had to be compared in full, our copy of the
+        # current plan is behind the partition's, so the next step is compared too.
+        self._commits = commits if accepted or in_step else None
+
+    def _write_header(self, partition):
+        self._nodes = tuple(partition.graph.nodes)
+        self._node_ids = {node: i for i, node in enumerate(self._nodes)}
+        labels = list(partition.parts)
+        self._label_codes = {label: code for code, label in enumerate(labels)}
+        assignment = partition.assignment
+        self._current = [self._label_codes[assignment[node]] for node in self._nodes]
+
+        header = pickle.dumps(
+            {
+                "nodes": self._nodes,
+                "labels": labels,
+                "assignment": numpy.array(self._current, dtype=numpy.uint32),
+            },
+            pickle.HIGHEST_PROTOCOL,
+        )
+        self._file.write(MAGIC)
+        self._file.write(LENGTH.pack(len(header)))
+        self._file.write(header)
+
+    def _write_step(self, accepted, pairs):
+        kind = STEP_ACCEPTED if accepted else STEP_REJECTED
+        self._file.write(RECORD.pack(kind, len(pairs)))
+        if pairs:
+            flat = [value for pair in pairs for value in pair]
+            self._file.write(struct.pack("<{}I".format(len(flat)), *flat))
+
+    def _code(self, label):
+        code = self._label_codes.get(label)
+        if code is None:
+            code = len(self._label_codes)
+            self._label_codes[label] = code
+            data = pickle.dumps(label, pickle.HIGHEST_PROTOCOL)
+            self._file.write(RECORD.pack(LABEL, len(data)))
+            self._file.write(data)
+        return code
+
+    def _diff(self, partition):
+        assignment = partition.assignment
+        current = self._current
+        pairs = []
+        for node_id, node in enumerate(self._nodes):
+            code = self._code(assignment[node])
+            if code != current[node_id]:
+                pairs.append((node_id, code))
+        return pairs
+
+
+class TraceReader:
+    """Reads a trace written by a :class:`TraceRecorder`.
+
+    A truncated last step (e.g. from a run that was killed while writing) is
+    ignored.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The trace file.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("{} is not a chain trace.".format(path))
+            (length,) = LENGTH.unpack(f.read(LENGTH.size))
+            header = pickle.loads(f.read(length))
+            self._offset = f.tell()
+        self.nodes = header["nodes"]
+        self.labels = header["labels"]
+        self._initial = header["assignment"].tolist()
+
+    def initial_assignment(self):
+        """The assignment of the first recorded state, as a dictionary."""
+        labels = self.labels
+        return {node: labels[code] for node, code in zip(self.nodes, self._initial)}
+
+    def __iter__(self):
+        """Iterate over the recorded steps as ``(accepted, flips)`` tuples, where
+        ``flips`` maps nodes to their new parts, relative to the last accepted
+        plan. The first step is the initial state, with no flips."""
+        nodes = self.nodes
+        labels = list(self.labels)
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            while True:
+                head = f.read(RECORD.size)
+                if len(head) < RECORD.size:
+                    return
+                kind, count = RECORD.unpack(head)
+                if kind == LABEL:
+                    data = f.read(count)
+                    if len(data) < count:
+                        return
+                    labels.append(pickle.loads(data))
+                    continue
+
+                data = f.read(8 * count)
+                if len(data) < 8 * count:
+                    return
+                values = struct.unpack("<{}I".format(2 * count), data)
+                flips = {
+                    nodes[values[i]]: labels[values[i + 1]]
+                    for i in range(0, len(values), 2)
+                }
+                yield (kind == STEP_ACCEPTED, flips)
+
+    def plans(self):
+        """Iterate over the plans of the recorded steps as ``(accepted, assignment)``
+        tuples.
+
+        To keep each step ``O(number of flips)``, the same ``assignment``
+        dictionary is updated and yielded at every step. Copy it to keep a plan.
+        """
+        assignment = self.initial_assignment()
+        for accepted, flips in self:
+            if accepted:
+                assignment.update(flips)
+                yield (accepted, assignment)
+            else:
+                previous = {node: assignment[node] for node in flips}
+                assignment.update(flips)
+                yield (accepted, assignment)
+                assignment.update(previous)
+
+    def plan(self, step):
+        """The assignment of the given step, as a new dictionary."""
+        steps = 0
+        for _, assignment in self.plans():
+            if steps == step:
+                return dict(assignment)
+            steps += 1
+        raise IndexError("The trace has only {} steps.".format(steps))
+
+    def partitions(self, initial_state):
+        """Replay the recorded steps as partitions, like the original
+        :class:`~gerrychain.MarkovChain` yielded them: each step is a flip of the
+        last accepted partition, so the updaters are computed incrementally.
+
+        :param initial_state: A :class:`~gerrychain.Partition` of the same graph,
+            with the updaters to compute. It is flipped to the recorded initial
+            assignment if it differs.
+        """
+        steps = iter(self)
+        if next(steps, None) is None:
+            return
+
+        assignment = initial_state.assignment
+        state = initial_state
+        diff = {
+            node: part
+            for node, part in self.initial_assignment().items()
+            if assignment[node] != part
+        }
+        if diff:
+            state = initial_state.flip(diff)
+            state.parent = None
+            state.flips = None
+        yield state
+
+        for accepted, flips in steps:
+            proposed = state.flip(flips)
+            # Erase the parent of the parent, to avoid memory leak
+            state.parent = None
+            proposed.accepted = accepted
+            if accepted:
+                state = proposed
+            yield proposed
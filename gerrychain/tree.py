@@ -1,24 +1,188 @@
+from time import perf_counter
+
 import networkx as nx
-from networkx.algorithms import tree
 
 from .random import random
 
 
-def predecessors(h, root):
-    return {a: b for a, b in nx.bfs_predecessors(h, root)}
+def random_spanning_tree(graph, pop_col):
+    """Draws a random spanning tree of ``graph``: the maximum spanning tree for
+    random edge weights, found with Kruskal's algorithm.
 
+    The weights are kept in a private list indexed like ``graph.edges``, so the
+    graph is only read and can be shared between threads.
 
-def random_spanning_tree(graph, pop_col):
-    for edge in graph.edges:
-        graph.edges[edge]["weight"] = random.random()
+    :param graph: The graph
+    :param pop_col: The node attribute holding the population of each node, which
+        is copied onto the nodes of the tree
+    :return: The spanning tree, as a :class:`networkx.Graph`
+    """
+    nodes = list(graph.nodes)
+    ids = {node: i for i, node in enumerate(nodes)}
+    edges = [(ids[u], ids[v]) for u, v in graph.edges]
+    weights = [random.random() for _ in edges]
+
+    # Union-find with path halving
+    parents = list(range(len(nodes)))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    tree_edges = []
+    for index in sorted(range(len(edges)), key=weights.__getitem__, reverse=True):
+        u, v = edges[index]
+        root_u, root_v = find(u), find(v)
+        if root_u != root_v:
+            parents[root_u] = root_v
+            tree_edges.append((nodes[u], nodes[v]))
+            if len(tree_edges) == len(nodes) - 1:
+                break
+
+    spanning_tree = nx.Graph()
+    for node in nodes:
+        spanning_tree.add_node(node, **{pop_col: graph.nodes[node][pop_col]})
+    spanning_tree.add_edges_from(tree_edges)
+    return spanning_tree
+
+
+def uniform_spanning_tree(graph, pop_col):
+    """Draws a spanning tree of ``graph`` uniformly at random with Wilson's
+    algorithm (loop-erased random walks), over lists of neighbor indices.
+
+    Unlike :func:`random_spanning_tree`, which draws a minimum spanning tree for
+    random edge weights, every spanning tree is equally likely. The graph must
+    be connected.
+
+    :param graph: The graph
+    :param pop_col: The node attribute holding the population of each node, which
+        is copied onto the nodes of the tree
+    :return: The spanning tree, as a :class:`networkx.Graph`
+    """
+    nodes = list(graph.nodes)
+    ids = {node: i for i, node in enumerate(nodes)}
+    adj = graph.adj
+    neighbors = [[ids[neighbor] for neighbor in adj[node]] for node in nodes]
+
+    in_tree = [False] * len(nodes)
+    next_node = [-1] * len(nodes)
+    in_tree[random.randrange(len(nodes))] = True
+    choice = random.choice
+
+    for start in range(len(nodes)):
+        # Walk until the tree is hit. Overwriting next_node on each visit erases
+        # the loops of the walk.
+        u = start
+        while not in_tree[u]:
+            next_node[u] = choice(neighbors[u])
+            u = next_node[u]
+        u = start
+        while not in_tree[u]:
+            in_tree[u] = True
+            u = next_node[u]
 
-    edges = tree.maximum_spanning_edges(graph, algorithm="kruskal", data=False)
-    spanning_tree = nx.Graph(edges)
-    for node in graph:
-        spanning_tree.nodes[node][pop_col] = graph.nodes[node][pop_col]
+    spanning_tree = nx.Graph()
+    for node in nodes:
+        spanning_tree.add_node(node, **{pop_col: graph.nodes[node][pop_col]})
+    spanning_tree.add_edges_from(
+        (nodes[i], nodes[j]) for i, j in enumerate(next_node) if j >= 0
+    )
     return spanning_tree
 
 
+def tree_order(h, root):
+    """Returns the nodes of the tree ``h`` in breadth-first order from ``root``,
+    and a dictionary mapping each node to its predecessor (``None`` for the root).
+    """
+    order = [root]
+    pred = {root: None}
+    adj = h.adj
+    for node in order:
+        for neighbor in adj[node]:
+            if neighbor not in pred:
+                pred[neighbor] = node
+                order.append(neighbor)
+    return order, pred
+
+
+def find_balanced_edge_cuts(h, root, pop_col, pop_target, epsilon):
+    """Returns the edges of the tree ``h`` whose removal leaves a part whose
+    population is within ``epsilon * pop_target`` of ``pop_target``. Each edge is
+    oriented so that this part is on the side of ``edge[0]``; when both parts are
+    balanced, the orientation is random.
+
+    The set of edges does not depend on ``root``, which only orders the pass: the
+    subtree populations are computed in a single pass over the nodes in reverse
+    breadth-first order from ``root``, so this takes time linear in the size of
+    the tree.
+    """
+    order, pred = tree_order(h, root)
+    nodes = h.nodes
+    pops = {node: nodes[node][pop_col] for node in order}
+    tolerance = epsilon * pop_target
+
+    subtree_pops = []
+    for node in reversed(order):
+        parent = pred[node]
+        if parent is not None:
+            subtree_pops.append((node, parent, pops[node]))
+            pops[parent] += pops[node]
+    total_pop = pops[root]
+
+    cuts = []
+    for node, parent, pop in subtree_pops:
+        subtree_balanced = abs(pop - pop_target) < tolerance
+        complement_balanced = abs(total_pop - pop - pop_target) < tolerance
+        if subtree_balanced and complement_balanced:
+            cuts.append((node, parent) if random.random() < 0.5 else (parent, node))
+        elif subtree_balanced:
+            cuts.append((node, parent))
+        elif complement_balanced:
+            cuts.append((parent, node))
+    return cuts
+
+
+def subtree_nodes(h, edge):
+    """Returns the set of nodes of the tree ``h`` on the ``edge[0]`` side of ``edge``."""
+    node, parent = edge
+    adj = h.adj
+    subset = {node}
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        for neighbor in adj[current]:
+            if neighbor != parent and neighbor not in subset:
+                subset.add(neighbor)
+                stack.append(neighbor)
+    return subset
+
+
+class BipartitionError(Exception):
+    """Raised when :func:`bipartition_tree` does not find a balanced cut within its
+    budget of spanning trees or time."""
+
+
+class BipartitionStats:
+    """Counters of the work done by :func:`bipartition_tree`, for tuning
+    ``epsilon`` and the spanning tree sampler. Pass the same instance to many calls to
+    add up their counts."""
+
+    def __init__(self):
+        #: The number of calls.
+        self.calls = 0
+        #: The number of spanning trees drawn.
+        self.trees = 0
+        #: The total number of balanced cut edges found.
+        self.balanced_edges = 0
+
+    def __repr__(self):
+        return "<BipartitionStats calls={} trees={} balanced_edges={}>".format(
+            self.calls, self.trees, self.balanced_edges
+        )
+
+
 def bipartition_tree(
     graph,
     pop_col,
@@ -28,11 +192,16 @@ def bipartition_tree(
     restarts=0,
     spanning_tree=None,
     choice=random.choice,
+    spanning_tree_fn=random_spanning_tree,
+    max_attempts=10000,
+    time_limit=None,
+    stats=None,
 ):
     """This function finds a balanced 2 partition of a graph by drawing a
     spanning tree and finding an edge to cut that leaves at most an epsilon
-    imbalance between the populations of the parts. If a root fails, new roots
-    are tried until node_repeats in which case a new tree is drawn.
+    imbalance between the populations of the parts. The edge is chosen uniformly
+    among all the balanced edges of the tree, and a new tree is only drawn when
+    the tree has none.
 
     Builds up a connected subgraph with a connected complement whose population
     is ``epsilon * pop_target`` away from ``pop_target``.
@@ -45,58 +214,70 @@ def bipartition_tree(
     :param pop_target: The target population for the returned subset of nodes
     :param epsilon: The allowable deviation from  ``pop_target`` (as a percentage of
         ``pop_target``) for the subgraph's population
-    :param node_repeats: A parameter for the algorithm: how many different choices
-        of root to use before drawing a new spanning tree.
-    :param restarts: Number of iterations (used when the algorithm chooses a new root)
-    :param spanning_tree: The spanning tree for the algorithm to use (used when the
-        algorithm chooses a new root and for testing)
-    :param choice: :func:`random.choice`. Can be substituted for testing.
+    :param node_repeats: Deprecated and unused, since the balanced edges of a tree
+        do not depend on a choice of root. Kept for compatibility.
+    :param restarts: Deprecated and unused. Kept for compatibility.
+    :param spanning_tree: The spanning tree for the algorithm to use first (used
+        for testing)
+    :param choice: Deprecated and unused, since the balanced edges of a tree do
+        not depend on the node it is traversed from. Kept for compatibility.
+    :param spanning_tree_fn: (optional) The function drawing spanning trees, like
+        :func:`random_spanning_tree` (the default) or :func:`uniform_spanning_tree`.
+    :param max_attempts: (optional) The largest number of spanning trees to draw.
+        Defaults to 10000. Pass ``None`` to keep drawing trees until a balanced
+        cut is found, which never ends if there is none.
+    :param time_limit: (optional) The number of seconds after which to stop drawing
+        new spanning trees. Unlimited by default.
+    :param stats: (optional) A :class:`BipartitionStats` to count the trees and
+        balanced edges into.
+    :raises BipartitionError: if no balanced cut is found within ``max_attempts``
+        trees or ``time_limit`` seconds.
     """
+    if stats is None:
+        stats = BipartitionStats()
+    stats.calls += 1
+    if time_limit is not None:
+        deadline = perf_counter() + time_limit
 
-    if spanning_tree is None:
-        spanning_tree = random_spanning_tree(graph, pop_col)
-
-    h = spanning_tree.copy()
-
-    # this used to be greater than 2 but failed on small grids:(
-    root = choice([x for x in spanning_tree.nodes if spanning_tree.degree(x) > 1])
-
-    # BFS predecessors for iteratively contracting leaves
-    pred = predecessors(h, root)
+    attempts = 0
+    while True:
+        if spanning_tree is None:
+            if max_attempts is not None and attempts >= max_attempts:
+                raise BipartitionError(
+                    "No balanced cut found in {} spanning trees.".format(attempts)
+                )
+            if time_limit is not None and perf_counter() > deadline:
+                raise BipartitionError(
+                    "No balanced cut found in {} seconds ({} spanning trees).".format(
+                        time_limit, attempts
+                    )
+                )
+            spanning_tree = spanning_tree_fn(graph, pop_col)
+            attempts += 1
+            stats.trees += 1
 
-    # As we contract leaves, we keep track of which nodes merged together in
-    # this dictionary:
-    subsets = {x: {x} for x in graph}
+        root = next(iter(spanning_tree))
+        cuts = find_balanced_edge_cuts(spanning_tree, root, pop_col, pop_target, epsilon)
+        if cuts:
+            stats.balanced_edges += len(cuts)
+            return subtree_nodes(spanning_tree, random.choice(cuts))
 
-    while len(h) > 1:
-        leaves = [x for x in h if h.degree(x) == 1 and x != root]
+        # The tree has no balanced edge, so draw a new one
+        spanning_tree = None
 
-        for leaf in leaves:
-            if abs(h.nodes[leaf][pop_col] - pop_target) < epsilon * pop_target:
-                return subsets[leaf]
-            # Contract the leaf:
-            parent = pred[leaf]
-            h.nodes[parent][pop_col] += h.nodes[leaf][pop_col]
-            subsets[parent] |= subsets[leaf]
-            h.remove_node(leaf)
 
-    if restarts < node_repeats:
-        # Try again with new root, same tree
-        return bipartition_tree(
-            graph,
-            pop_col,
-            pop_target,
-            epsilon,
-            node_repeats,
-            restarts + 1,
-            spanning_tree,
-        )
-    else:
-        # If restarts == node_repeats, start over completely with a new tree
-        return bipartition_tree(graph, pop_col, pop_target, epsilon, node_repeats)
-
-
-def recursive_tree_part(graph, parts, pop_target, pop_col, epsilon, node_repeats=None):
+def recursive_tree_part(
+    graph,
+    parts,
+    pop_target,
+    pop_col,
+    epsilon,
+    node_repeats=None,
+    spanning_tree_fn=random_spanning_tree,
+    max_attempts=10000,
+    time_limit=None,
+    stats=None,
+):
     """Uses :func:`~gerrychain.tree_methods.bipartition_tree` recursively to partition a tree into
     ``len(parts)`` parts of population ``pop_target`` (within ``epsilon``). Can be used to
     generate initial seed plans or to implement ReCom-like "merge walk" proposals.
@@ -107,7 +288,13 @@ def recursive_tree_part(graph, parts, pop_target, pop_col, epsilon, node_repeats
     :param pop_col: Node attribute key holding population data
     :param epsilon: How far (as a percentage of ``pop_target``) from ``pop_target`` the parts
         of the partition can be
-    :param node_repeats: Parameter for :func:`~gerrychain.tree_methods.bipartition_tree` to use.
+    :param node_repeats: Deprecated and unused. Kept for compatibility.
+    :param spanning_tree_fn: (optional) The function drawing spanning trees. See
+        :func:`bipartition_tree`.
+    :param max_attempts: (optional) See :func:`bipartition_tree`.
+    :param time_limit: (optional) See :func:`bipartition_tree`. Applies to each
+        bipartition separately.
+    :param stats: (optional) See :func:`bipartition_tree`.
     :return: New assignments for the nodes of ``graph``.
     :rtype: dict
     """
@@ -116,7 +303,15 @@ def recursive_tree_part(graph, parts, pop_target, pop_col, epsilon, node_repeats
 
     for part in parts[:-1]:
         nodes = bipartition_tree(
-            graph.subgraph(remaining_nodes), pop_col, pop_target, epsilon, node_repeats
+            graph.subgraph(remaining_nodes),
+            pop_col,
+            pop_target,
+            epsilon,
+            node_repeats,
+            spanning_tree_fn=spanning_tree_fn,
+            max_attempts=max_attempts,
+            time_limit=time_limit,
+            stats=stats,
         )
 
         for node in nodes:
@@ -1,45 +1,49 @@
 import collections
+import functools
 
+from ..graph.edges import EdgeSet
 from .flows import on_edge_flow
 
 
-def put_edges_into_parts(edges, assignment):
-    by_part = collections.defaultdict(set)
-    for edge in edges:
-        # add edge to the sets corresponding to the parts it touches
-        by_part[assignment[edge[0]]].add(edge)
-        by_part[assignment[edge[1]]].add(edge)
-    return by_part
-
-
 def new_cuts(partition):
-    """The edges that were not cut, but now are"""
+    """The ids of the edges that were not cut, but now are"""
+    assignment = partition.assignment
+    incidence = partition.edge_index.incidence
     return {
-        tuple(sorted((node, neighbor)))
+        edge_id
         for node in partition.flips
-        for neighbor in partition.graph.neighbors(node)
-        if partition.crosses_parts((node, neighbor))
+        for neighbor, edge_id in incidence[node]
+        if assignment[node] != assignment[neighbor]
     }
 
 
 def obsolete_cuts(partition):
-    """The edges that were cut, but now are not"""
+    """The ids of the edges that were cut, but now are not"""
+    assignment = partition.assignment
+    old_assignment = partition.parent.assignment
+    incidence = partition.edge_index.incidence
     return {
-        tuple(sorted((node, neighbor)))
+        edge_id
         for node in partition.flips
-        for neighbor in partition.graph.neighbors(node)
-        if partition.parent.crosses_parts((node, neighbor))
-        and not partition.crosses_parts((node, neighbor))
+        for neighbor, edge_id in incidence[node]
+        if old_assignment[node] != old_assignment[neighbor]
+        and assignment[node] == assignment[neighbor]
     }
 
 
 def initialize_cut_edges(partition):
-    edges = {
-        tuple(sorted(edge))
-        for edge in partition.graph.edges
-        if partition.crosses_parts(edge)
-    }
-    return put_edges_into_parts(edges, partition.assignment)
+    edge_index = partition.edge_index
+    assignment = partition.assignment
+    by_part = collections.defaultdict(set)
+    for edge_id, (u, v) in enumerate(edge_index.labels):
+        if assignment[u] != assignment[v]:
+            by_part[assignment[u]].add(edge_id)
+            by_part[assignment[v]].add(edge_id)
+
+    result = collections.defaultdict(functools.partial(EdgeSet, edge_index))
+    for part, edge_ids in by_part.items():
+        result[part] = EdgeSet(edge_index, frozenset(edge_ids))
+    return result
 
 
 @on_edge_flow(initialize_cut_edges, alias="cut_edges_by_part")
@@ -49,16 +53,20 @@ def cut_edges_by_part(partition, previous, new_edges, old_edges):
 
 def cut_edges(partition):
     parent = partition.parent
+    edge_index = partition.edge_index
 
     if not parent:
-        return {
-            tuple(sorted(edge))
-            for edge in partition.graph.edges
-            if partition.crosses_parts(edge)
-        }
-    # Edges that weren't cut, but now are cut
-    # We sort the tuples to make sure we don't accidentally end
-    # up with both (4,5) and (5,4) (for example) in it
+        assignment = partition.assignment
+        return EdgeSet(
+            edge_index,
+            frozenset(
+                edge_id
+                for edge_id, (u, v) in enumerate(edge_index.labels)
+                if assignment[u] != assignment[v]
+            ),
+        )
+    # The edges are identified by their integer ids, so there is no need to
+    # sort endpoints to avoid having both (4,5) and (5,4) in the set.
     new, obsolete = new_cuts(partition), obsolete_cuts(partition)
 
-    return (parent["cut_edges"] | new) - obsolete
+    return EdgeSet(edge_index, (parent["cut_edges"].ids | new) - obsolete)
@@ -1,6 +1,8 @@
 import collections
 import functools
 
+from ..graph.edges import EdgeSet
+
 
 def create_flow():
     return {'in': set(), 'out': set()}
@@ -63,13 +65,14 @@ def on_flow(initializer, alias):
 
 
 def compute_edge_flows(partition):
+    """The cut edges flowing into and out of each part, as
+    :class:`~gerrychain.graph.edges.EdgeSet` objects."""
     edge_flows = collections.defaultdict(create_flow)
     assignment = partition.assignment
     old_assignment = partition.parent.assignment
+    incidence = partition.edge_index.incidence
     for node in partition.flips:
-        for neighbor in partition.graph.neighbors(node):
-            edge = tuple(sorted((node, neighbor)))
-
+        for neighbor, edge in incidence[node]:
             old_source = old_assignment[node]
             old_target = old_assignment[neighbor]
 
@@ -96,6 +99,11 @@ def compute_edge_flows(partition):
                 newly_incident_parts = {new_target, new_source} - {old_target, old_source}
                 for part in newly_incident_parts:
                     edge_flows[part]['in'].add(edge)
+
+    edge_index = partition.edge_index
+    for flow in edge_flows.values():
+        flow['in'] = EdgeSet(edge_index, frozenset(flow['in']))
+        flow['out'] = EdgeSet(edge_index, frozenset(flow['out']))
     return edge_flows
 
 
@@ -2,7 +2,10 @@ import collections
 import math
 import warnings
 
-from .flows import flows_from_changes, on_flow
+import numpy
+
+from ..graph.compiled import CompiledGraph
+from .flows import on_flow
 
 
 class DataTally:
@@ -70,6 +73,7 @@ class Tally:
         self.fields = fields
         self.alias = alias
         self.dtype = dtype
+        self._compiled_column = None
 
     def __call__(self, partition):
         if not partition.flips or not partition.parent:
@@ -82,6 +86,10 @@ class Tally:
 
         :param partition: :class:`Partition` class.
         """
+        column = self._get_compiled_column(partition.graph)
+        if column is not None:
+            return self._initialize_compiled_tally(partition, column)
+
         tally = collections.defaultdict(self.dtype)
         for node, part in partition.assignment.items():
             add = self._get_tally_from_node(partition, node)
@@ -101,21 +109,59 @@ class Tally:
 
         :param partition: :class:`Partition` class.
         """
-        parent = partition.parent
-        flips = partition.flips
-
-        old_tally = parent[self.alias]
+        old_tally = partition.parent[self.alias]
         new_tally = dict(old_tally)
 
         graph = partition.graph
+        column = self._get_compiled_column(graph)
 
-        for part, flow in flows_from_changes(parent.assignment, flips).items():
-            out_flow = compute_out_flow(graph, self.fields, flow)
-            in_flow = compute_in_flow(graph, self.fields, flow)
+        for part, flow in partition.flows.items():
+            if column is not None:
+                out_flow = column[graph.node_ids_of(flow["out"])].sum().item()
+                in_flow = column[graph.node_ids_of(flow["in"])].sum().item()
+            else:
+                out_flow = compute_out_flow(graph, self.fields, flow)
+                in_flow = compute_in_flow(graph, self.fields, flow)
             new_tally[part] = old_tally[part] - out_flow + in_flow
 
         return new_tally
 
+    def __getstate__(self):
+        # The cached column belongs to a graph in this process.
+        state = self.__dict__.copy()
+        state["_compiled_column"] = None
+        return state
+
+    def _get_compiled_column(self, graph):
+        """Returns the array (indexed by node id) of the sum of the tallied fields,
+        if ``graph`` is a :class:`~gerrychain.graph.compiled.CompiledGraph` with
+        numeric columns for all of the fields. Returns None otherwise.
+        """
+        if not isinstance(graph, CompiledGraph):
+            return None
+        if self._compiled_column is None or self._compiled_column[0] is not graph:
+            columns = [graph.node_columns.get(field) for field in self.fields]
+            if any(column is None or column.dtype == object for column in columns):
+                column = None
+            else:
+                column = sum(columns)
+            self._compiled_column = (graph, column)
+        return self._compiled_column[1]
+
+    def _initialize_compiled_tally(self, partition, column):
+        graph = partition.graph
+        for i in numpy.flatnonzero(numpy.isnan(column)).tolist():
+            warnings.warn(
+                "ignoring nan encountered at node '{}' for attribute '{}' "
+                "with fields {}".format(graph.node_labels[i], self.alias, self.fields)
+            )
+        column = numpy.where(numpy.isnan(column), 0, column)
+
+        tally = collections.defaultdict(self.dtype)
+        for part, nodes in partition.parts.items():
+            tally[part] += column[graph.node_ids_of(nodes)].sum().item()
+        return tally
+
     def _get_tally_from_node(self, partition, node):
         return sum(partition.graph.nodes[node][field] for field in self.fields)
 
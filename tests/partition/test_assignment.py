@@ -1,7 +1,20 @@
 import pandas
 import pytest
 
-from gerrychain.partition.assignment import Assignment, get_assignment
+from gerrychain import MarkovChain
+from gerrychain.accept import always_accept
+from gerrychain.constraints import no_vanishing_districts, single_flip_contiguous
+from gerrychain.grid import Grid
+from gerrychain.partition import Partition
+from gerrychain.partition.assignment import (
+    ArrayAssignment,
+    Assignment,
+    PersistentAssignment,
+    get_assignment,
+    level_sets,
+)
+from gerrychain.proposals import propose_random_flip
+from gerrychain.updaters import cut_edges
 
 
 @pytest.fixture
@@ -14,6 +27,33 @@ class TestAssignment:
         assignment.update({2: 1})
         assert assignment[2] == 1
 
+    def test_update_keeps_parts_and_lookups_in_sync(self, assignment):
+        assignment.update({1: 2, 3: 1})
+        assert assignment[1] == 2 and assignment[3] == 1
+        assert assignment.parts == {1: frozenset({3}), 2: frozenset({1, 2})}
+
+    def test_copy_does_not_share_lookups(self, assignment):
+        assignment2 = assignment.copy()
+        assignment2.update({1: 2})
+        assert assignment[1] == 1
+        assert assignment2[1] == 2
+
+    def test_copies_share_the_mapping_until_the_changes_are_merged(self):
+        plan = {node: int(node >= 50) for node in range(100)}
+        assignment = Assignment.from_dict(plan)
+        copy = assignment.copy()
+        assert copy.mapping is assignment.mapping
+
+        for node in range(10):
+            copy.update({node: 1})
+            assert copy.mapping is assignment.mapping
+        copy.update({10: 1})
+
+        assert copy.mapping is not assignment.mapping
+        assert copy.changes == {}
+        assert copy.to_dict() == {node: int(node <= 10 or node >= 50) for node in plan}
+        assert assignment.to_dict() == plan
+
     def test_assignment_copy_does_not_copy_the_node_sets(self, assignment):
         assignment2 = assignment.copy()
         for part in assignment.parts:
@@ -42,6 +82,7 @@ class TestAssignment:
     def test_can_update_parts(self, assignment):
         assignment.update_parts({2: {2}, 3: {3}})
         assert assignment.to_dict() == {1: 1, 2: 2, 3: 3}
+        assert assignment[3] == 3
 
 
 def test_get_assignment_accepts_assignment(assignment):
@@ -53,3 +94,127 @@ def test_get_assignment_accepts_assignment(assignment):
 def test_get_assignment_raises_typeerror_for_unexpected_input():
     with pytest.raises(TypeError):
         get_assignment(None)
+
+
+@pytest.fixture
+def array_assignment():
+    return ArrayAssignment.from_dict({1: 1, 2: 2, 3: 2})
+
+
+class TestArrayAssignment:
+    def test_lookups_match_the_dict(self, array_assignment):
+        assert [array_assignment[node] for node in [1, 2, 3]] == [1, 2, 2]
+
+    def test_parts_are_derived_from_the_array(self, array_assignment):
+        assert dict(array_assignment.parts) == {
+            1: frozenset({1}),
+            2: frozenset({2, 3}),
+        }
+
+    def test_can_be_updated(self, array_assignment):
+        array_assignment.update({2: 1})
+        assert array_assignment[2] == 1
+        assert array_assignment.parts[1] == frozenset({1, 2})
+        assert array_assignment.parts[2] == frozenset({3})
+
+    def test_can_be_updated_with_a_new_part(self, array_assignment):
+        copy = array_assignment.copy()
+        copy.update({3: "new"})
+        assert copy[3] == "new"
+        assert set(copy.parts) == {1, 2, "new"}
+        assert set(array_assignment.parts) == {1, 2}
+
+    def test_copy_shares_everything_but_the_array(self, array_assignment):
+        copy = array_assignment.copy()
+        copy.update({1: 2})
+        assert array_assignment[1] == 1
+        assert copy[1] == 2
+        assert copy.index is array_assignment.index
+
+    def test_to_series(self, array_assignment):
+        series = array_assignment.to_series()
+
+        assert isinstance(series, pandas.Series)
+        assert list(series.items()) == [(1, 1), (2, 2), (3, 2)]
+
+    def test_to_dict(self, array_assignment):
+        assert array_assignment.to_dict() == {1: 1, 2: 2, 3: 2}
+
+    def test_respects_the_given_node_order(self):
+        assignment = ArrayAssignment.from_dict({1: "a", 2: "b"}, nodes=[2, 1])
+        assert assignment.nodes == (2, 1)
+        assert assignment.to_dict() == {2: "b", 1: "a"}
+
+    def test_raises_keyerror_for_missing_nodes(self, array_assignment):
+        with pytest.raises(KeyError):
+            array_assignment["not a node"]
+        assert array_assignment.get("not a node", default=5) == 5
+
+    def test_can_update_parts(self, array_assignment):
+        array_assignment.update_parts({2: {2}, 1: {1, 3}})
+        assert array_assignment.to_dict() == {1: 1, 2: 2, 3: 1}
+
+
+def test_partition_runs_on_an_array_assignment(three_by_three_grid):
+    assignment = {0: 1, 1: 1, 2: 2, 3: 1, 4: 1, 5: 2, 6: 2, 7: 2, 8: 2}
+    partition = Partition(
+        three_by_three_grid,
+        ArrayAssignment.from_dict(assignment, nodes=three_by_three_grid.nodes),
+        {"cut_edges": cut_edges},
+    )
+    new_partition = partition.flip({4: 2, 2: 1, 5: 1})
+
+    assert new_partition.assignment.to_dict() == {
+        0: 1, 1: 1, 2: 1, 3: 1, 4: 2, 5: 1, 6: 2, 7: 2, 8: 2
+    }
+    assert new_partition["cut_edges"] == {
+        tuple(sorted(edge))
+        for edge in three_by_three_grid.edges
+        if new_partition.crosses_parts(edge)
+    }
+    assert partition.assignment[4] == 1
+
+
+class TestPersistentAssignment:
+    def test_can_be_updated(self):
+        assignment = PersistentAssignment.from_dict({1: 1, 2: 2, 3: 2})
+        copy = assignment.copy()
+        copy.update({2: 1})
+
+        assert copy[2] == 1
+        assert copy.parts[1] == frozenset({1, 2})
+        assert copy.parts[2] == frozenset({3})
+        assert assignment[2] == 2
+        assert assignment.parts[1] == frozenset({1})
+
+    def test_to_dict(self):
+        assignment = PersistentAssignment.from_dict({1: 1, 2: 2, 3: 2})
+        assert assignment.to_dict() == {1: 1, 2: 2, 3: 2}
+
+    def test_can_update_parts(self):
+        assignment = PersistentAssignment.from_dict({1: 1, 2: 2, 3: 2})
+        assignment.update_parts({2: {2}, 3: {3}})
+        assert assignment.to_dict() == {1: 1, 2: 2, 3: 3}
+        assert assignment.parts[3] == frozenset({3})
+
+
+def test_flip_chain_on_a_persistent_assignment_matches_naive_parts():
+    grid = Grid((10, 10))
+    partition = Partition(
+        grid.graph,
+        PersistentAssignment.from_dict(grid.assignment.to_dict()),
+        {"cut_edges": cut_edges},
+    )
+    chain = MarkovChain(
+        propose_random_flip,
+        [single_flip_contiguous, no_vanishing_districts],
+        always_accept,
+        partition,
+        200,
+    )
+    for state in chain:
+        naive_parts = level_sets(state.assignment.to_dict())
+        assert dict(state.parts) == naive_parts
+        assert state["cut_edges"] == {
+            edge for edge in state.graph.edges if state.crosses_parts(edge)
+        }
@@ -0,0 +1,123 @@
+import pytest
+
+from gerrychain import MarkovChain, Partition
+from gerrychain.constraints import no_vanishing_districts, single_flip_contiguous
+from gerrychain.grid import Grid
+from gerrychain.partition import MutablePartition
+from gerrychain.proposals import propose_random_flip
+from gerrychain.random import random
+from gerrychain.updaters import Tally, cut_edges, cut_edges_by_part
+
+
+@pytest.fixture
+def state(three_by_three_grid):
+    for node in three_by_three_grid:
+        three_by_three_grid.nodes[node]["population"] = node
+    partition = Partition(
+        three_by_three_grid,
+        {0: 1, 1: 1, 2: 1, 3: 1, 4: 1, 5: 2, 6: 2, 7: 2, 8: 2},
+        {
+            "cut_edges": cut_edges,
+            "cut_edges_by_part": cut_edges_by_part,
+            "population": Tally("population"),
+        },
+    )
+    return MutablePartition.from_partition(partition)
+
+
+def test_flip_changes_the_partition_in_place(state):
+    assert state.flip({4: 2}) is state
+    assert state.assignment[4] == 2
+    assert state.parts[2] == {4, 5, 6, 7, 8}
+    assert state.parent.assignment[4] == 1
+    assert state.parent.parts[1] == {0, 1, 2, 3, 4}
+    assert state.parent.parts[2] == {5, 6, 7, 8}
+    assert state["population"] == {1: 6, 2: 30}
+    assert state.parent["population"] == {1: 10, 2: 26}
+
+
+def test_updaters_match_an_ordinary_partition(state):
+    expected = Partition(state.graph, state.assignment.to_dict(), state.updaters)
+    expected = expected.flip({4: 2}).flip({2: 2})
+
+    state.flip({4: 2})
+    state["cut_edges"]
+    state.commit()
+    state.flip({2: 2})
+
+    assert state.assignment.to_dict() == expected.assignment.to_dict()
+    assert state["cut_edges"] == expected["cut_edges"]
+    assert state["cut_edges_by_part"] == expected["cut_edges_by_part"]
+    assert state["population"] == expected["population"]
+
+
+def test_rollback_restores_the_assignment_and_updaters(state):
+    before = state.assignment.to_dict()
+    population = state["population"]
+    subgraph = state.subgraphs[1]
+
+    state.flip({4: 2})
+    state.flip({3: 2})
+    assert state["population"] == {1: 3, 2: 33}
+    assert set(state.subgraphs[1].nodes) == {0, 1, 2}
+
+    state.rollback()
+
+    assert state.assignment.to_dict() == before
+    assert state.parts[1] == {0, 1, 2, 3, 4}
+    assert state["population"] is population
+    assert state.subgraphs[1] is subgraph
+    assert state.parent is None
+
+
+def run_chain(initial_state, in_place):
+    def accept(partition):
+        return random.random() < 0.7
+
+    chain = MarkovChain(
+        propose_random_flip,
+        [single_flip_contiguous, no_vanishing_districts],
+        accept,
+        initial_state,
+        total_steps=200,
+        in_place=in_place,
+    )
+    history = []
+    for state in chain:
+        current = chain.state
+        history.append(
+            (
+                current.assignment.to_dict(),
+                set(current["cut_edges"]),
+                dict(current["population"]),
+                dict(current["perimeter"]),
+            )
+        )
+    return history
+
+
+def test_in_place_chain_matches_ordinary_chain():
+    grid = Grid((10, 10))
+
+    random.seed(2018)
+    expected = run_chain(grid, in_place=False)
+    random.seed(2018)
+    result = run_chain(grid, in_place=True)
+
+    assert result == expected
+
+
+def test_in_place_chain_requires_flipping_the_given_state():
+    grid = Grid((4, 4))
+    chain = MarkovChain(
+        lambda partition: grid.flip({(0, 0): 1}),
+        [],
+        lambda partition: True,
+        grid,
+        total_steps=10,
+        in_place=True,
+    )
+    iterator = iter(chain)
+    next(iterator)
+    with pytest.raises(TypeError):
+        next(iterator)
@@ -7,7 +7,7 @@ import pytest
 
 from gerrychain.partition import GeographicPartition, Partition
 from gerrychain.proposals import propose_random_flip
-from gerrychain.updaters import cut_edges
+from gerrychain.updaters import compute_edge_flows, cut_edges
 
 
 @pytest.fixture
@@ -53,6 +53,31 @@ def test_geographic_partition_can_be_instantiated(example_geographic_partition):
     assert partition.updaters == GeographicPartition.default_updaters
 
 
+def test_Partition_computes_edge_flows_only_when_accessed(example_partition, monkeypatch):
+    import gerrychain.partition.partition as partition_module
+
+    calls = []
+
+    def counting_compute_edge_flows(partition):
+        calls.append(partition)
+        return compute_edge_flows(partition)
+
+    monkeypatch.setattr(
+        partition_module, "compute_edge_flows", counting_compute_edge_flows
+    )
+    new_partition = example_partition.flip({1: 2})
+    assert calls == []
+
+    assert new_partition.flows == {
+        1: {"in": set(), "out": {1}},
+        2: {"in": {1}, "out": set()},
+    }
+    assert new_partition.edge_flows is new_partition.edge_flows
+    assert calls == [new_partition]
+    assert example_partition.flows is None
+    assert example_partition.edge_flows is None
+
+
 def test_Partition_parts_is_a_dictionary_of_parts_to_nodes(example_partition):
     partition = example_partition
     flip = {1: 2}
@@ -0,0 +1,58 @@
+import pytest
+
+from gerrychain.partition.persistent import (
+    NodeIndex,
+    PersistentMapping,
+    PersistentSet,
+)
+
+
+@pytest.fixture
+def index():
+    return NodeIndex(range(2000))
+
+
+def test_persistent_set_behaves_like_a_frozenset(index):
+    nodes = {1, 5, 63, 64, 1024, 1999}
+    persistent = PersistentSet.from_nodes(index, nodes)
+
+    assert persistent == frozenset(nodes)
+    assert frozenset(nodes) == persistent
+    assert len(persistent) == len(nodes)
+    assert 64 in persistent and 65 not in persistent
+    assert "not a node" not in persistent
+    assert list(persistent) == sorted(nodes)
+    assert persistent | {7} == frozenset(nodes | {7})
+
+
+def test_changed_does_not_modify_the_original(index):
+    persistent = PersistentSet.from_nodes(index, range(100))
+    changed = persistent.changed(added={500}, removed={0, 1})
+
+    assert persistent == frozenset(range(100))
+    assert changed == frozenset(range(2, 100)) | {500}
+    assert len(changed) == 99
+
+
+def test_changed_shares_untouched_leaves(index):
+    persistent = PersistentSet.from_nodes(index, range(2000))
+    changed = persistent.changed(removed={0})
+
+    shared = [
+        child
+        for child, other in zip(persistent.root[1:], changed.root[1:])
+        if child is other
+    ]
+    assert len(shared) == len(persistent.root) - 1
+
+
+def test_persistent_mapping_can_be_updated(index):
+    mapping = PersistentMapping.from_dict(index, {node: 0 for node in range(10)})
+    updated = mapping.updated({3: 1, 11: 2})
+
+    assert mapping[3] == 0
+    assert updated[3] == 1 and updated[11] == 2
+    assert len(mapping) == 10 and len(updated) == 11
+    assert dict(updated) == {**{node: 0 for node in range(10)}, 3: 1, 11: 2}
+    with pytest.raises(KeyError):
+        mapping[11]
@@ -1,5 +1,9 @@
 from gerrychain import constraints
-from gerrychain.constraints import within_percent_of_ideal_population
+from gerrychain.constraints import (districts_within_tolerance,
+                                    within_percent_of_ideal_population)
+from gerrychain.constraints.bounds import Bounds
+from gerrychain.grid import Grid
+from gerrychain.proposals import propose_random_flip
 
 
 class TestWithinPercent:
@@ -90,3 +94,46 @@ class TestUpperBound:
         bound = constraints.UpperBound(my_function, 100)
 
         assert repr(bound) == "<UpperBound(my_function >= 100)>"
+
+
+class TestIncrementalChecks:
+    def test_bounds_on_part_values_match_the_full_check_along_a_chain(self):
+        def area(partition):
+            return partition["area"]
+
+        constraint = Bounds(area, (14, 18))
+        partition = Grid((8, 8))
+        assert constraint(partition)
+        checked = 0
+        for _ in range(300):
+            proposed = propose_random_flip(partition)
+            values = proposed["area"].values()
+            expected = 14 <= min(values) and max(values) <= 18
+            assert constraint(proposed) is expected
+            assert districts_within_tolerance(proposed, "area", 0.2) is (
+                max(values) - min(values) <= 0.2 * min(values)
+            )
+            if expected:
+                checked += 1
+                partition = proposed
+        assert checked > 0
+
+    def test_bounds_only_check_the_changed_parts_of_a_valid_parent(self):
+        seen = []
+
+        class Values(dict):
+            def __getitem__(self, part):
+                seen.append(part)
+                return super().__getitem__(part)
+
+        def area(partition):
+            return Values(partition["area"])
+
+        constraint = Bounds(area, (0, 100))
+        grid = Grid((4, 4))
+        assert constraint(grid)
+
+        seen.clear()
+        child = grid.flip({(0, 0): 1})
+        assert constraint(child)
+        assert sorted(seen) == [0, 1]
@@ -1,5 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock
 
+import pytest
+
 from gerrychain.chain import MarkovChain
 
 
@@ -45,3 +48,141 @@ def test_MarkovChain_returns_the_initial_state_first():
         else:
             assert state is not initial
         counter += 1
+
+
+def test_MarkovChain_skips_the_burn_in_and_thins_the_states():
+    initial = MockState()
+    states = [initial]
+
+    def proposal(state):
+        states.append(state.flip({1: 2}))
+        return states[-1]
+
+    chain = MarkovChain(
+        proposal, mock_is_valid, mock_accept, initial, 25, burn_in=4, thin=5
+    )
+    yielded = list(chain)
+
+    assert len(yielded) == len(chain) == 5
+    assert yielded == states[4::5]
+    assert chain.counter == 25
+
+
+def test_MarkovChain_checks_burn_in_and_thin():
+    for kwargs in [{"burn_in": -1}, {"thin": 0}]:
+        with pytest.raises(ValueError):
+            MarkovChain(mock_proposal, mock_is_valid, mock_accept, MockState(), **kwargs)
+
+
+def test_MarkovChain_with_multiplicities_collapses_rejected_steps():
+    accepts = iter([True, False, False, True, True, False, False, False, True])
+
+    def accept(state):
+        return next(accepts)
+
+    initial = MockState()
+    chain = MarkovChain(mock_proposal, mock_is_valid, accept, initial, 10)
+    pairs = list(chain.with_multiplicities())
+
+    assert pairs[0] == (initial, 1)
+    assert [multiplicity for state, multiplicity in pairs] == [1, 3, 1, 4, 1]
+    assert len(set(id(state) for state, _ in pairs)) == 5
+
+
+class ParentState:
+    def __init__(self, parent=None):
+        self.parent = parent
+
+    def flip(self, changes):
+        return ParentState(parent=self)
+
+
+def test_MarkovChain_with_multiplicities_yields_states_with_their_parents():
+    accepts = iter([True, False, False, True, True, False, False, False, True])
+
+    def accept(state):
+        return next(accepts)
+
+    chain = MarkovChain(mock_proposal, mock_is_valid, accept, ParentState(), 10)
+    pairs = [(state, state.parent) for state, _ in chain.with_multiplicities()]
+
+    states = [state for state, _ in pairs]
+    assert [parent for _, parent in pairs] == [None] + states[:-1]
+    assert all(state.parent is None for state in states)
+
+
+def test_MarkovChain_with_multiplicities_is_not_available_in_place():
+    chain = MarkovChain(
+        mock_proposal, mock_is_valid, mock_accept, MockState(), 10, in_place=True
+    )
+    with pytest.raises(ValueError):
+        list(chain.with_multiplicities())
+
+
+def test_MarkovChain_speculate_takes_the_first_valid_proposal_in_draw_order():
+    drawn = []
+
+    def proposal(state):
+        drawn.append(state.flip({1: 2}))
+        return drawn[-1]
+
+    def is_valid(state):
+        return state not in drawn or drawn.index(state) % 3 == 2
+
+    chain = MarkovChain(proposal, is_valid, mock_accept, MockState(), 5, speculate=4)
+    states = list(chain)
+
+    assert len(states) == 5
+    assert states[1:] == [drawn[2], drawn[5], drawn[8], drawn[14]]
+
+
+def test_MarkovChain_speculate_shuts_down_its_thread_pool_when_it_stops():
+    chain = MarkovChain(
+        mock_proposal, mock_is_valid, mock_accept, MockState(), 5, speculate=2
+    )
+    states = iter(chain)
+    next(states)
+    next(states)
+    thread_pool = chain._thread_pool
+    assert thread_pool is not None
+
+    list(states)
+    assert chain._thread_pool is None
+    with pytest.raises(RuntimeError):
+        thread_pool.submit(mock_is_valid, MockState())
+
+
+def test_MarkovChain_speculate_leaves_a_given_executor_running():
+    executor = ThreadPoolExecutor(2)
+    chain = MarkovChain(
+        mock_proposal,
+        mock_is_valid,
+        mock_accept,
+        MockState(),
+        5,
+        speculate=2,
+        executor=executor,
+    )
+    list(chain)
+
+    assert executor.submit(mock_is_valid, MockState()).result()
+    executor.shutdown()
+
+
+def test_MarkovChain_speculate_is_not_available_with_instrumentation():
+    with pytest.raises(ValueError):
+        MarkovChain(
+            mock_proposal,
+            mock_is_valid,
+            mock_accept,
+            MockState(),
+            instrumentation=True,
+            speculate=2,
+        )
+
+
+def test_MarkovChain_speculate_is_not_available_in_place():
+    with pytest.raises(ValueError):
+        MarkovChain(
+            mock_proposal, mock_is_valid, mock_accept, MockState(), in_place=True, speculate=2
+        )
@@ -0,0 +1,191 @@
+import functools
+import os
+import pickle
+
+import networkx
+import pytest
+
+from gerrychain import MarkovChain, Partition
+from gerrychain.accept import always_accept
+from gerrychain.checkpoint import Checkpointer, load_checkpoint, write_atomically
+from gerrychain.constraints import (
+    SelfConfiguringLowerBound,
+    SelfConfiguringUpperBound,
+    Validator,
+    WithinPercentRangeOfBounds,
+    no_vanishing_districts,
+    single_flip_contiguous,
+)
+from gerrychain.graph import Graph
+from gerrychain.grid import Grid
+from gerrychain.proposals import propose_random_flip, recom
+from gerrychain.random import random
+from gerrychain.updaters import Tally, cut_edges
+
+
+def number_of_cut_edges(partition):
+    return len(partition["cut_edges"])
+
+
+def total_area(partition):
+    return sum(partition["area"].values())
+
+
+def make_constraints():
+    return [
+        single_flip_contiguous,
+        no_vanishing_districts,
+        SelfConfiguringLowerBound(number_of_cut_edges),
+        WithinPercentRangeOfBounds(total_area, 10),
+    ]
+
+
+def accept(partition):
+    return random.random() < 0.8
+
+
+def history(chain, stop=None):
+    states = []
+    for state in chain:
+        states.append(sorted(state.assignment.to_dict().items()))
+        if len(states) == stop:
+            break
+    return states
+
+
+@pytest.mark.parametrize("in_place", [False, True])
+def test_resumed_chain_matches_the_uninterrupted_chain(tmp_path, in_place):
+    grid = Grid((8, 8))
+    path = str(tmp_path / "chain.checkpoint")
+
+    random.seed(2019)
+    expected = history(
+        MarkovChain(
+            propose_random_flip,
+            make_constraints(),
+            accept,
+            grid,
+            60,
+            in_place=in_place,
+        )
+    )
+
+    random.seed(2019)
+    interrupted = MarkovChain(
+        propose_random_flip,
+        make_constraints(),
+        accept,
+        grid,
+        60,
+        in_place=in_place,
+        checkpoint=Checkpointer(path, every=10),
+    )
+    assert history(interrupted, stop=35) == expected[:35]
+    assert load_checkpoint(path)["counter"] == 30
+
+    # Scramble the random state, as a new process would have
+    random.seed(0)
+    resumed = MarkovChain.resume(
+        path,
+        propose_random_flip,
+        make_constraints(),
+        accept,
+        grid,
+        60,
+        in_place=in_place,
+        checkpoint=Checkpointer(path, every=10),
+    )
+    assert history(resumed) == expected[30:]
+
+
+def test_resumed_recom_chain_matches_the_uninterrupted_chain(tmp_path):
+    graph = Graph(networkx.grid_graph([12, 12]))
+    for node in graph:
+        graph.nodes[node]["population"] = 1
+    partition = Partition(
+        graph,
+        {node: i // 12 for i, node in enumerate(graph)},
+        {"population": Tally("population"), "cut_edges": cut_edges},
+    )
+    proposal = functools.partial(
+        recom, pop_col="population", pop_target=12, epsilon=0.1, node_repeats=1
+    )
+    path = str(tmp_path / "chain.checkpoint")
+
+    def make_chain(checkpoint=None):
+        return MarkovChain(
+            proposal, [], always_accept, partition, 150, checkpoint=checkpoint
+        )
+
+    random.seed(2019)
+    expected = history(make_chain())
+
+    random.seed(2019)
+    interrupted = make_chain(Checkpointer(path, every=50))
+    assert history(interrupted, stop=120) == expected[:120]
+    assert load_checkpoint(path)["counter"] == 100
+
+    random.seed(0)
+    resumed = MarkovChain.resume(path, proposal, [], always_accept, partition, 150)
+    assert history(resumed) == expected[100:]
+
+
+def test_self_configuring_constraints_save_their_state():
+    constraint = SelfConfiguringUpperBound(number_of_cut_edges)
+    grid = Grid((4, 4))
+    assert constraint(grid)
+
+    restored = SelfConfiguringUpperBound(number_of_cut_edges)
+    restored.restore_state(constraint.checkpoint_state())
+    assert restored.bound == len(grid["cut_edges"])
+
+
+def test_resume_checks_the_number_of_constraints(tmp_path):
+    grid = Grid((4, 4))
+    path = str(tmp_path / "chain.checkpoint")
+    chain = MarkovChain(
+        propose_random_flip,
+        Validator(make_constraints()),
+        always_accept,
+        grid,
+        10,
+        checkpoint=Checkpointer(path, every=5),
+    )
+    history(chain)
+
+    with pytest.raises(ValueError):
+        MarkovChain.resume(path, propose_random_flip, [], always_accept, grid, 10)
+
+
+def test_write_atomically_leaves_the_old_file_on_failure(tmp_path):
+    path = str(tmp_path / "data")
+    write_atomically(path, b"old")
+
+    with pytest.raises(TypeError):
+        write_atomically(path, object())
+
+    with open(path, "rb") as f:
+        assert f.read() == b"old"
+    assert os.listdir(str(tmp_path)) == ["data"]
+    assert pickle.loads(pickle.dumps(Grid((2, 2))["cut_edges"])) == set(
+        Grid((2, 2))["cut_edges"]
+    )
+
+
+def test_snapshots_do_not_save_sets_of_edges(tmp_path):
+    grid = Grid((10, 10))
+    path = str(tmp_path / "chain.checkpoint")
+    chain = MarkovChain(
+        propose_random_flip,
+        make_constraints(),
+        always_accept,
+        grid,
+        10,
+        checkpoint=Checkpointer(path, every=5),
+    )
+    history(chain)
+
+    cache = load_checkpoint(path)["cache"]
+    assert "cut_edges" not in cache and "cut_edges_by_part" not in cache
+    assert "area" in cache
+    assert os.path.getsize(path) < 10000
@@ -0,0 +1,209 @@
+import pickle
+
+import networkx
+import numpy
+import pytest
+
+from gerrychain import MarkovChain, Partition
+from gerrychain.accept import always_accept
+from gerrychain.constraints import (
+    contiguous,
+    no_vanishing_districts,
+    single_flip_contiguous,
+)
+from gerrychain.graph import CompiledGraph, Graph
+from gerrychain.graph.compiled import CompiledNeighbors
+from gerrychain.grid import Grid
+from gerrychain.proposals import propose_random_flip
+from gerrychain.random import random
+from gerrychain.updaters import Tally
+
+
+@pytest.fixture
+def graph_with_data(three_by_three_grid):
+    graph = three_by_three_grid
+    for node in graph:
+        graph.nodes[node]["population"] = node + 1
+        graph.nodes[node]["county"] = "A" if node < 4 else "B"
+    for edge in graph.edges:
+        graph.edges[edge]["shared_perim"] = 1.5
+    return graph
+
+
+def test_compile_returns_a_compiled_graph(graph_with_data):
+    compiled = graph_with_data.compile()
+    assert isinstance(compiled, CompiledGraph)
+    assert len(compiled) == 9
+    assert compiled.number_of_edges() == 12
+
+
+def test_compiled_graph_has_the_same_nodes_edges_and_neighbors(graph_with_data):
+    compiled = graph_with_data.compile()
+
+    assert list(compiled.nodes) == list(graph_with_data.nodes)
+    assert set(compiled.edges) == set(graph_with_data.edges)
+    for node in graph_with_data:
+        assert list(compiled.neighbors(node)) == list(graph_with_data.neighbors(node))
+
+
+def test_compiled_graph_has_csr_arrays(graph_with_data):
+    compiled = graph_with_data.compile()
+    for node in graph_with_data:
+        i = compiled.node_ids[node]
+        neighbors = compiled.indices[compiled.indptr[i]:compiled.indptr[i + 1]]
+        assert [compiled.node_labels[j] for j in neighbors] == list(
+            graph_with_data.neighbors(node)
+        )
+
+
+def test_compiled_graph_stores_attributes_as_columns(graph_with_data):
+    compiled = graph_with_data.compile()
+
+    assert compiled.node_column("population").dtype.kind == "i"
+    assert compiled.node_column("county").dtype == object
+    assert compiled.edge_column("shared_perim").dtype.kind == "f"
+
+    assert compiled.nodes[4]["population"] == 5
+    assert isinstance(compiled.nodes[4]["population"], int)
+    assert compiled.nodes[4]["county"] == "B"
+    assert compiled.edges[(1, 0)]["shared_perim"] == 1.5
+    assert dict(compiled.nodes[0]) == graph_with_data.nodes[0]
+
+
+def test_compiled_graph_raises_keyerror_for_missing_attributes(graph_with_data):
+    graph_with_data.nodes[0]["only_here"] = 1
+    compiled = graph_with_data.compile()
+
+    assert compiled.nodes[0]["only_here"] == 1
+    assert "only_here" not in compiled.nodes[1]
+    with pytest.raises(KeyError):
+        compiled.nodes[1]["only_here"]
+
+
+def test_compiled_graph_is_frozen(graph_with_data):
+    compiled = graph_with_data.compile()
+    graph_with_data.add_edge(0, 8)
+    graph_with_data.nodes[0]["population"] = 100
+
+    assert (0, 8) not in compiled.edges
+    assert compiled.nodes[0]["population"] == 1
+
+
+def test_subgraph_of_compiled_graph_is_a_view(graph_with_data):
+    compiled = graph_with_data.compile()
+    subgraph = compiled.subgraph({0, 1, 3, 4})
+
+    assert set(subgraph) == {0, 1, 3, 4}
+    assert set(subgraph.edges) == {(0, 1), (0, 3), (1, 4), (3, 4)}
+    assert set(subgraph.neighbors(1)) == {0, 4}
+    assert subgraph.nodes[4]["population"] == 5
+    assert subgraph.edges[(4, 1)]["shared_perim"] == 1.5
+    assert (1, 2) not in subgraph.edges
+    assert networkx.is_connected(subgraph)
+    assert not networkx.is_connected(compiled.subgraph({0, 8}))
+
+
+def test_subgraph_of_compiled_graph_can_be_copied_to_networkx(graph_with_data):
+    subgraph = graph_with_data.compile().subgraph({0, 1, 3, 4}).to_networkx()
+
+    assert isinstance(subgraph, networkx.Graph)
+    assert set(map(frozenset, subgraph.edges)) == {
+        frozenset(edge) for edge in [(0, 1), (0, 3), (1, 4), (3, 4)]
+    }
+    assert subgraph.nodes[4]["population"] == 5
+
+
+def test_compiled_graph_can_be_converted_back_to_networkx(graph_with_data):
+    graph = Graph(graph_with_data.compile().to_networkx())
+
+    assert set(graph.edges) == set(graph_with_data.edges)
+    assert graph.nodes[2]["population"] == 3
+
+
+def run_chain(graph, assignment, updaters, steps=100):
+    partition = Partition(graph, assignment, updaters)
+    chain = MarkovChain(
+        propose_random_flip,
+        [single_flip_contiguous, no_vanishing_districts],
+        always_accept,
+        partition,
+        steps,
+    )
+    return [
+        (state.flips, {key: dict(state[key]) for key in updaters}) for state in chain
+    ]
+
+
+def test_chain_on_compiled_graph_matches_chain_on_graph():
+    grid = Grid((10, 10))
+    assignment = grid.assignment.to_dict()
+    updaters = dict(Grid.default_updaters)
+    compiled = Graph(grid.graph).compile()
+
+    random.seed(2018)
+    expected = run_chain(grid.graph, assignment, updaters)
+    random.seed(2018)
+    result = run_chain(compiled, assignment, updaters)
+
+    assert result == expected
+
+
+def test_constraints_run_on_compiled_graph(graph_with_data):
+    compiled = graph_with_data.compile()
+    partition = Partition(
+        compiled, {0: 1, 1: 1, 2: 1, 3: 1, 4: 2, 5: 2, 6: 2, 7: 2, 8: 2}
+    )
+    assert contiguous(partition)
+    assert single_flip_contiguous(partition.flip({3: 2}))
+    assert not single_flip_contiguous(partition.flip({1: 2}))
+
+
+def test_neighbors_of_compiled_graph_give_their_edge_data(graph_with_data):
+    compiled = graph_with_data.compile()
+    neighbors = compiled.adj[4]
+
+    assert [node for node, _ in neighbors.items()] == list(graph_with_data.neighbors(4))
+    assert all(data["shared_perim"] == 1.5 for _, data in neighbors.items())
+    assert neighbors[1]["shared_perim"] == 1.5
+    with pytest.raises(KeyError):
+        neighbors[8]
+
+
+def test_chain_on_compiled_graph_reads_neighbors_in_one_pass(monkeypatch):
+    grid = Grid((10, 10))
+    compiled = Graph(grid.graph).compile()
+
+    def lookup(neighbors, neighbor):
+        raise AssertionError("edge data looked up one neighbor at a time")
+
+    monkeypatch.setattr(CompiledNeighbors, "__getitem__", lookup)
+    random.seed(2018)
+    run_chain(compiled, grid.assignment.to_dict(), dict(Grid.default_updaters))
+
+
+def test_tally_on_compiled_graph_uses_python_numbers(graph_with_data):
+    partition = Partition(
+        graph_with_data.compile(),
+        {node: node % 2 for node in graph_with_data},
+        {"population": Tally("population")},
+    )
+    assert partition["population"] == {0: 1 + 3 + 5 + 7 + 9, 1: 2 + 4 + 6 + 8}
+    assert all(type(value) is int for value in partition["population"].values())
+
+    flipped = partition.flip({0: 1})
+    assert flipped["population"] == {0: 24, 1: 21}
+    assert numpy.isclose(sum(flipped["population"].values()), 45)
+
+
+def test_compiled_graph_can_be_pickled(graph_with_data):
+    compiled = graph_with_data.compile()
+    tally = Tally("population")
+    assignment = {node: node % 2 for node in graph_with_data}
+    Partition(compiled, assignment, {"population": tally})["population"]
+
+    graph, tally = pickle.loads(pickle.dumps((compiled, tally)))
+
+    assert list(graph.neighbors(4)) == list(compiled.neighbors(4))
+    assert graph.nodes[4]["population"] == 5
+    partition = Partition(graph, assignment, {"population": tally})
+    assert partition.flip({0: 1})["population"] == {0: 24, 1: 21}
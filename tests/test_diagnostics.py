@@ -0,0 +1,80 @@
+import math
+
+import numpy
+import pytest
+
+from gerrychain import MarkovChain
+from gerrychain.accept import always_accept
+from gerrychain.constraints import single_flip_contiguous
+from gerrychain.diagnostics import BatchMeans, ConvergenceMonitor, split_rhat
+from gerrychain.grid import Grid
+from gerrychain.proposals import propose_random_flip
+
+
+def ar1(length, rho, seed):
+    generator = numpy.random.default_rng(seed)
+    values = numpy.empty(length)
+    values[0] = generator.normal()
+    for i in range(1, length):
+        values[i] = rho * values[i - 1] + generator.normal()
+    return values
+
+
+def test_batch_means_keeps_bounded_memory_and_exact_moments():
+    values = ar1(10000, 0.5, 0)
+    statistics = BatchMeans(max_batches=16)
+    for value in values:
+        statistics.add(value)
+
+    assert len(statistics.batches) <= 16
+    assert statistics.mean == pytest.approx(values.mean())
+    assert statistics.variance == pytest.approx(values.var(ddof=1))
+    assert statistics.autocorrelation(1) == pytest.approx(0.5, abs=0.05)
+
+
+def test_effective_sample_size_is_smaller_for_correlated_series():
+    independent = BatchMeans()
+    correlated = BatchMeans()
+    for a, b in zip(ar1(20000, 0.0, 1), ar1(20000, 0.9, 2)):
+        independent.add(a)
+        correlated.add(b)
+
+    assert independent.effective_sample_size > 10000
+    # The ESS of an AR(1) series is about n (1 - rho) / (1 + rho)
+    assert correlated.effective_sample_size < 3000
+
+
+def test_split_rhat_detects_chains_that_disagree():
+    agreeing = [BatchMeans(), BatchMeans()]
+    disagreeing = [BatchMeans(), BatchMeans()]
+    for seed in range(2):
+        for value in ar1(5000, 0.3, seed):
+            agreeing[seed].add(value)
+            disagreeing[seed].add(value + 5 * seed)
+
+    assert split_rhat(agreeing) < 1.01
+    assert split_rhat(disagreeing) > 1.5
+    assert math.isnan(split_rhat([BatchMeans()]))
+
+
+def test_monitor_stops_the_chain_once_the_targets_are_met():
+    monitor = ConvergenceMonitor(
+        {"cut_edges": lambda partition: len(partition["cut_edges"])},
+        target_ess=50,
+        check_every=100,
+    )
+    chain = MarkovChain(
+        propose_random_flip,
+        [single_flip_contiguous],
+        always_accept,
+        Grid((8, 8)),
+        total_steps=100000,
+        monitor=monitor,
+    )
+    steps = sum(1 for _ in chain)
+
+    assert steps < 100000
+    assert steps % 100 == 0
+    assert monitor.converged()
+    assert monitor.effective_sample_size("cut_edges") >= 50
+    assert list(monitor.summary()["score"]) == ["cut_edges"]
@@ -0,0 +1,72 @@
+import networkx
+
+from gerrychain import Partition
+from gerrychain.graph import EdgeIndex, EdgeSet, Graph
+from gerrychain.updaters import cut_edges, cut_edges_by_part
+
+
+def test_edge_index_gives_each_edge_one_id(three_by_three_grid):
+    index = EdgeIndex.from_graph(three_by_three_grid)
+
+    assert len(index) == three_by_three_grid.number_of_edges()
+    for node in three_by_three_grid:
+        neighbors = [neighbor for neighbor, _ in index.incidence[node]]
+        assert neighbors == list(three_by_three_grid.neighbors(node))
+        for neighbor, edge_id in index.incidence[node]:
+            assert set(index.labels[edge_id]) == {node, neighbor}
+
+
+def test_edge_index_handles_unsortable_nodes():
+    graph = networkx.Graph([("a", 1), (1, (2, 3))])
+    index = EdgeIndex.from_graph(graph)
+
+    edges = EdgeSet.from_edges(index, [(1, "a"), ((2, 3), 1)])
+    assert len(edges) == 2
+    assert set(edges) == set(index.labels)
+
+
+def test_edge_set_behaves_like_a_set_of_sorted_tuples(three_by_three_grid):
+    index = EdgeIndex.from_graph(three_by_three_grid)
+    first = EdgeSet.from_edges(index, [(1, 0), (1, 2)])
+    second = EdgeSet.from_edges(index, [(2, 1), (4, 5)])
+
+    assert (0, 1) in first
+    assert (1, 0) not in first
+    assert first == {(0, 1), (1, 2)}
+    assert first | second == {(0, 1), (1, 2), (4, 5)}
+    assert first & second == {(1, 2)}
+    assert first - second == {(0, 1)}
+    assert first ^ second == {(0, 1), (4, 5)}
+    assert isinstance(first | second, EdgeSet)
+    assert first.union([(4, 5)]) == {(0, 1), (1, 2), (4, 5)}
+    assert hash(first) == hash(frozenset({(0, 1), (1, 2)}))
+
+
+def test_cut_edges_on_unsortable_nodes():
+    graph = networkx.Graph([("a", 1), (1, (2, 3)), ((2, 3), "a")])
+    partition = Partition(
+        graph,
+        {"a": 0, 1: 0, (2, 3): 1},
+        {"cut_edges": cut_edges, "cut_edges_by_part": cut_edges_by_part},
+    )
+    assert len(partition["cut_edges"]) == 2
+
+    new_partition = partition.flip({1: 1})
+
+    assert len(new_partition["cut_edges"]) == 2
+    assert all(
+        new_partition.crosses_parts(edge) for edge in new_partition["cut_edges"]
+    )
+    assert len(new_partition["cut_edges_by_part"][0]) == 2
+    assert len(new_partition["cut_edges_by_part"][1]) == 2
+
+
+def test_new_partitions_see_edges_that_were_rewired():
+    graph = Graph(networkx.path_graph(4))
+    Partition(graph, {0: 0, 1: 0, 2: 1, 3: 1}, {"cut_edges": cut_edges})
+
+    graph.remove_edge(1, 2)
+    graph.add_edge(0, 3)
+    partition = Partition(graph, {0: 0, 1: 0, 2: 1, 3: 1}, {"cut_edges": cut_edges})
+
+    assert set(partition["cut_edges"]) == {(0, 3)}
@@ -0,0 +1,117 @@
+import collections
+import os
+
+import pytest
+
+from gerrychain import MarkovChain
+from gerrychain.accept import always_accept
+from gerrychain.constraints import single_flip_contiguous
+from gerrychain.ensemble import chain_seed, run_ensemble
+from gerrychain.grid import Grid
+from gerrychain.proposals import propose_random_flip
+from gerrychain.random import random
+
+
+def score(partition):
+    return sorted(partition.assignment.to_dict().items())
+
+
+def failing_score(partition):
+    raise ValueError("bad score")
+
+
+def exiting_score(partition):
+    os._exit(3)
+
+
+@pytest.fixture
+def grid():
+    return Grid((6, 6))
+
+
+def test_run_ensemble_streams_every_step_of_every_chain(grid):
+    results = collections.defaultdict(list)
+    for chain, step, value in run_ensemble(
+        propose_random_flip,
+        [single_flip_contiguous],
+        always_accept,
+        grid,
+        total_steps=30,
+        chains=4,
+        score=score,
+        processes=2,
+        seed=7,
+        batch_size=8,
+        context="fork",
+    ):
+        results[chain].append((step, value))
+
+    assert sorted(results) == [0, 1, 2, 3]
+    for chain, values in results.items():
+        assert [step for step, _ in values] == list(range(30))
+
+        random.seed(chain_seed(7, chain))
+        expected = MarkovChain(
+            propose_random_flip, [single_flip_contiguous], always_accept, grid, 30
+        )
+        assert [value for _, value in values] == [score(state) for state in expected]
+
+    assert results[0] != results[1]
+
+
+def test_run_ensemble_raises_worker_errors(grid):
+    with pytest.raises(RuntimeError, match="bad score"):
+        list(
+            run_ensemble(
+                propose_random_flip,
+                [single_flip_contiguous],
+                always_accept,
+                grid,
+                total_steps=5,
+                chains=2,
+                score=failing_score,
+                processes=1,
+                context="fork",
+            )
+        )
+
+
+def test_run_ensemble_works_with_the_spawn_start_method(grid):
+    results = collections.defaultdict(list)
+    for chain, step, value in run_ensemble(
+        propose_random_flip,
+        [single_flip_contiguous],
+        always_accept,
+        grid,
+        total_steps=10,
+        chains=2,
+        score=score,
+        processes=2,
+        seed=7,
+        context="spawn",
+    ):
+        results[chain].append(value)
+
+    random.seed(chain_seed(7, 1))
+    expected = MarkovChain(
+        propose_random_flip, [single_flip_contiguous], always_accept, grid, 10
+    )
+    assert results[1] == [score(state) for state in expected]
+    assert len(results[0]) == 10
+
+
+def test_run_ensemble_raises_when_a_worker_dies(grid):
+    with pytest.raises(RuntimeError, match="exit code 3"):
+        list(
+            run_ensemble(
+                propose_random_flip,
+                [single_flip_contiguous],
+                always_accept,
+                grid,
+                total_steps=5,
+                chains=2,
+                score=exiting_score,
+                processes=1,
+                context="fork",
+            )
+        )
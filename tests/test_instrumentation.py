@@ -0,0 +1,76 @@
+from gerrychain import MarkovChain
+from gerrychain.constraints import no_vanishing_districts, single_flip_contiguous
+from gerrychain.grid import Grid
+from gerrychain.instrumentation import Instrumentation
+from gerrychain.proposals import propose_random_flip
+from gerrychain.random import random
+
+
+def run_chain(instrumentation=None, in_place=False, initial_state=None):
+    chain = MarkovChain(
+        propose_random_flip,
+        [single_flip_contiguous, no_vanishing_districts],
+        lambda partition: random.random() < 0.5,
+        initial_state or Grid((10, 10)),
+        total_steps=100,
+        in_place=in_place,
+        instrumentation=instrumentation,
+    )
+    for partition in chain:
+        partition["perimeter"]
+    return chain
+
+
+def test_chain_is_not_instrumented_by_default():
+    chain = run_chain()
+    assert chain.instrumentation is None
+    assert chain.state.instrumentation is None
+
+
+def test_instrumentation_records_stages_constraints_and_updaters():
+    chain = run_chain(instrumentation=True)
+    instrumentation = chain.instrumentation
+    assert isinstance(instrumentation, Instrumentation)
+
+    stages = instrumentation.stages
+    assert stages["proposal"].calls == stages["constraints"].calls
+    assert stages["constraints"].calls == 99 + instrumentation.retries
+    assert stages["accept"].calls == 99
+    assert 0 < instrumentation.rejections < 99
+
+    contiguity = instrumentation.constraints["single_flip_contiguous"]
+    assert contiguity.calls == stages["constraints"].calls
+    assert contiguity.failures == instrumentation.retries
+
+    cut_edges = instrumentation.updaters["cut_edges"]
+    assert cut_edges.calls > 0
+    assert cut_edges.hits > 0
+    assert cut_edges.time > 0
+
+
+def test_instrumentation_leaves_the_initial_state_alone():
+    for in_place in (False, True):
+        initial_state = Grid((10, 10))
+        chain = run_chain(True, in_place, initial_state)
+        assert chain.state.instrumentation is chain.instrumentation
+        assert initial_state.instrumentation is None
+
+
+def test_summary_is_a_table_of_every_record():
+    instrumentation = Instrumentation()
+    run_chain(instrumentation=instrumentation, in_place=True)
+    summary = instrumentation.summary()
+
+    assert list(summary.columns) == [
+        "kind",
+        "name",
+        "calls",
+        "failures",
+        "cache_hits",
+        "total_time",
+        "mean_time",
+    ]
+    rows = summary.set_index(["kind", "name"])
+    assert rows.loc[("stage", "accept"), "calls"] == 99
+    assert rows.loc[("constraint", "no_vanishing_districts"), "failures"] == 0
+    assert rows.loc[("updater", "perimeter"), "calls"] > 0
@@ -0,0 +1,63 @@
+import numpy
+import pytest
+
+from gerrychain import MarkovChain
+from gerrychain.accept import always_accept
+from gerrychain.constraints import single_flip_contiguous
+from gerrychain.grid import Grid
+from gerrychain.output import ScoreWriter, read_scores
+from gerrychain.proposals import propose_random_flip
+
+SCORES = {
+    "cut_edges": lambda partition: len(partition["cut_edges"]),
+    "areas": lambda partition: [partition["area"][part] for part in sorted(partition.parts)],
+    "mean_area": lambda partition: numpy.mean(list(partition["area"].values())),
+}
+
+
+def expected_and_written(path, **kwargs):
+    chain = MarkovChain(
+        propose_random_flip, [single_flip_contiguous], always_accept, Grid((6, 6)), 95
+    )
+    expected = {name: [] for name in SCORES}
+    with ScoreWriter(path, SCORES, chunk_size=10, **kwargs) as writer:
+        for partition in chain:
+            writer.record(partition)
+            for name, score in SCORES.items():
+                expected[name].append(score(partition))
+    return expected, read_scores(path)
+
+
+def test_score_writer_writes_npz_chunks(tmp_path):
+    expected, written = expected_and_written(str(tmp_path / "scores.npz"))
+
+    assert set(written) == set(SCORES)
+    assert written["cut_edges"].dtype == numpy.int64
+    assert written["areas"].shape == (95, 4)
+    for name in SCORES:
+        assert numpy.array_equal(written[name], numpy.array(expected[name]))
+
+
+def test_score_writer_writes_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    expected, written = expected_and_written(str(tmp_path / "scores.parquet"))
+
+    for name in SCORES:
+        assert numpy.array_equal(written[name], numpy.array(expected[name]))
+
+
+def test_score_writer_rejects_unknown_formats(tmp_path):
+    with pytest.raises(ValueError):
+        ScoreWriter(str(tmp_path / "scores.csv"), SCORES, format="csv")
+
+
+def test_score_writer_reports_errors_of_the_writer_thread(tmp_path):
+    def fail(chunk):
+        raise OSError("disk full")
+
+    writer = ScoreWriter(str(tmp_path / "scores.npz"), SCORES, chunk_size=2)
+    writer._sink.write = fail
+    with pytest.raises(RuntimeError):
+        for _ in range(5):
+            writer.record(Grid((2, 2)))
+        writer.close()
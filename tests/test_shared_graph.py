@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+
+import networkx
+import numpy
+import pytest
+
+import gerrychain
+import gerrychain.graph.shared
+from gerrychain import Partition
+from gerrychain.graph import Graph, SharedGraph
+from gerrychain.updaters import Tally, cut_edges
+
+
+@pytest.fixture
+def compiled():
+    graph = Graph(networkx.convert_node_labels_to_integers(networkx.grid_graph([5, 4])))
+    for node in graph:
+        graph.nodes[node]["population"] = node + 1
+        graph.nodes[node]["name"] = "node {}".format(node)
+    for edge in graph.edges:
+        graph.edges[edge]["shared_perim"] = 0.5
+    return graph.compile()
+
+
+def summarize(graph):
+    partition = Partition(
+        graph,
+        {node: node % 3 for node in graph},
+        {"population": Tally("population"), "cut_edges": cut_edges},
+    )
+    flipped = partition.flip({0: 1})
+    return (
+        dict(flipped["population"]),
+        set(flipped["cut_edges"]),
+        graph.nodes[7]["name"],
+        graph.edges[(0, 1)]["shared_perim"],
+    )
+
+
+def test_attached_graph_matches_the_original(compiled):
+    with compiled.to_shared_memory() as shared:
+        attached = shared.attach()
+
+        assert isinstance(shared.node_labels, range)
+        assert not isinstance(attached.node_ids, dict)
+        assert list(attached.nodes) == list(compiled.nodes)
+        assert list(attached.edges) == list(compiled.edges)
+        assert numpy.array_equal(attached.indices, compiled.indices)
+        assert not attached.indices.flags.writeable
+        assert not attached.node_column("population").flags.writeable
+        assert summarize(attached) == summarize(compiled)
+
+
+def test_shared_graph_handles_non_integer_nodes(three_by_three_grid):
+    graph = Graph(networkx.relabel_nodes(three_by_three_grid, str))
+    compiled = graph.compile()
+    with SharedGraph.publish(compiled) as shared:
+        attached = shared.attach()
+        assert attached.node_labels == compiled.node_labels
+        assert set(attached.neighbors("4")) == {"1", "3", "5", "7"}
+        assert attached.edges[("4", "1")] == {}
+
+
+def attach_and_summarize(shared, results):
+    results.put(summarize(shared.attach()))
+
+
+def test_worker_processes_attach_to_the_shared_graph(compiled):
+    context = multiprocessing.get_context("spawn")
+    with compiled.to_shared_memory() as shared:
+        results = context.Queue()
+        worker = context.Process(target=attach_and_summarize, args=(shared, results))
+        worker.start()
+        result = results.get(timeout=60)
+        worker.join()
+
+    assert result == summarize(compiled)
+
+
+def test_publishing_requires_shared_memory(compiled, monkeypatch):
+    monkeypatch.setattr(gerrychain.graph.shared, "shared_memory", None)
+
+    with pytest.raises(RuntimeError):
+        SharedGraph.publish(compiled)
+
+
+ATTACH_AND_EXIT = """
+import pickle, sys
+shared = pickle.loads(bytes.fromhex(sys.argv[1]))
+print(len(shared.attach()))
+"""
+
+
+def test_independent_processes_do_not_free_the_shared_graph(compiled):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(gerrychain.__file__)))
+    environment = dict(os.environ, PYTHONPATH=root)
+    shared = compiled.to_shared_memory()
+    try:
+        handle = pickle.dumps(shared).hex()
+        worker = subprocess.run(
+            [sys.executable, "-c", ATTACH_AND_EXIT, handle],
+            env=environment,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            timeout=60,
+        )
+        assert worker.returncode == 0, worker.stderr
+        assert worker.stdout.strip() == "20"
+        assert "leaked" not in worker.stderr
+
+        attached = pickle.loads(pickle.dumps(shared)).attach()
+        assert summarize(attached) == summarize(compiled)
+    finally:
+        shared.unlink()
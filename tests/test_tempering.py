@@ -0,0 +1,67 @@
+import collections
+
+import pytest
+
+from gerrychain.constraints import single_flip_contiguous
+from gerrychain.grid import Grid
+from gerrychain.proposals import propose_random_flip
+from gerrychain.tempering import MetropolisAccept, ReplicaExchange
+
+
+def energy(partition):
+    return len(partition["cut_edges"])
+
+
+def failing_score(partition):
+    raise ValueError("bad score")
+
+
+def make_exchange(**kwargs):
+    options = dict(
+        betas=[2.0, 1.0, 0.5, 0.0],
+        score=energy,
+        swap_interval=10,
+        seed=3,
+        context="fork",
+    )
+    options.update(kwargs)
+    return ReplicaExchange(
+        propose_random_flip, [single_flip_contiguous], Grid((6, 6)), energy, **options
+    )
+
+
+def test_replica_exchange_runs_every_replica_and_records_statistics():
+    exchange = make_exchange()
+    results = collections.defaultdict(list)
+    levels = collections.Counter()
+    for replica, level, step, value in exchange.run(rounds=6):
+        results[replica].append(step)
+        levels[level] += 1
+
+    assert all(steps == list(range(60)) for steps in results.values())
+    assert len(results) == 4
+    assert all(count == 60 for count in levels.values())
+    assert sum(exchange.steps) == 4 * 59
+    assert all(0 <= rate <= 1 for rate in exchange.acceptance_rates)
+    assert exchange.swap_attempts == [3, 3, 3]
+    assert all(0 <= rate <= 1 for rate in exchange.swap_rates)
+    assert sorted(exchange.levels) == [0, 1, 2, 3]
+    # The infinite temperature replica accepts every proposal
+    assert exchange.acceptance_rates[3] > exchange.acceptance_rates[0]
+
+
+def test_replica_exchange_is_reproducible():
+    first = list(make_exchange().run(rounds=3))
+    second = list(make_exchange().run(rounds=3))
+    assert first == second
+
+
+def test_replica_exchange_reports_worker_errors():
+    with pytest.raises(RuntimeError):
+        list(make_exchange(score=failing_score).run(rounds=2))
+
+
+def test_metropolis_accept_always_accepts_moves_that_do_not_raise_the_energy():
+    grid = Grid((4, 4))
+    accept = MetropolisAccept(energy, beta=100.0)
+    assert accept(grid.flip({(0, 0): grid.assignment[(0, 0)]}))
@@ -0,0 +1,88 @@
+import pytest
+
+from gerrychain import MarkovChain
+from gerrychain.constraints import single_flip_contiguous
+from gerrychain.grid import Grid
+from gerrychain.proposals import propose_random_flip
+from gerrychain.random import random
+from gerrychain.trace import TraceReader, TraceRecorder
+
+
+def accept(partition):
+    return random.random() < 0.7
+
+
+def run(path, in_place=False, record_every=1):
+    random.seed(2018)
+    chain = MarkovChain(
+        propose_random_flip,
+        [single_flip_contiguous],
+        accept,
+        Grid((6, 6)),
+        100,
+        in_place=in_place,
+    )
+    states = []
+    with TraceRecorder(path) as recorder:
+        for step, partition in enumerate(chain):
+            if step % record_every == 0:
+                recorder.record(partition)
+                states.append(
+                    (vars(partition).get("accepted", True), partition.assignment.to_dict())
+                )
+    return states
+
+
+@pytest.mark.parametrize("in_place", [False, True])
+def test_trace_replays_the_recorded_plans(tmp_path, in_place):
+    path = str(tmp_path / "chain.trace")
+    states = run(path, in_place=in_place)
+
+    reader = TraceReader(path)
+    assert [(accepted, dict(plan)) for accepted, plan in reader.plans()] == states
+    assert reader.plan(42) == states[42][1]
+    with pytest.raises(IndexError):
+        reader.plan(100)
+
+
+@pytest.mark.parametrize("in_place", [False, True])
+def test_trace_handles_unrecorded_steps(tmp_path, in_place):
+    path = str(tmp_path / "chain.trace")
+    states = run(path, in_place=in_place, record_every=7)
+
+    plans = [(accepted, dict(plan)) for accepted, plan in TraceReader(path).plans()]
+    assert plans == states
+
+
+def test_trace_replays_partitions_with_updaters(tmp_path):
+    path = str(tmp_path / "chain.trace")
+    states = run(path)
+
+    partitions = TraceReader(path).partitions(Grid((6, 6)))
+    for (accepted, assignment), partition in zip(states, partitions):
+        assert partition.assignment.to_dict() == assignment
+        assert set(partition["cut_edges"]) == set(
+            Grid((6, 6), assignment=assignment)["cut_edges"]
+        )
+
+
+def test_trace_ignores_a_truncated_last_step(tmp_path):
+    path = str(tmp_path / "chain.trace")
+    states = run(path)
+    with open(path, "rb+") as f:
+        f.seek(-3, 2)
+        f.truncate()
+
+    assert len(list(TraceReader(path))) == len(states) - 1
+
+
+def test_trace_records_new_part_labels(tmp_path):
+    path = str(tmp_path / "chain.trace")
+    grid = Grid((2, 2))
+    with TraceRecorder(path) as recorder:
+        recorder.record(grid)
+        assignment = grid.assignment.to_dict()
+        assignment[(0, 0)] = "new"
+        recorder.record(Grid((2, 2), assignment=assignment))
+
+    assert TraceReader(path).plan(1)[(0, 0)] == "new"
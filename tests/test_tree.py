@@ -1,3 +1,4 @@
+import collections
 import functools
 
 import networkx
@@ -7,7 +8,11 @@ from gerrychain import MarkovChain
 from gerrychain.constraints import contiguous, within_percent_of_ideal_population
 from gerrychain.partition import Partition
 from gerrychain.proposals import recom
-from gerrychain.tree import bipartition_tree, random_spanning_tree
+from gerrychain.random import random
+from gerrychain.tree import (BipartitionError, BipartitionStats,
+                             bipartition_tree, find_balanced_edge_cuts,
+                             random_spanning_tree, subtree_nodes,
+                             uniform_spanning_tree)
 from gerrychain.updaters import Tally, cut_edges
 
 
@@ -43,6 +48,15 @@ def test_bipartition_tree_returns_within_epsilon_of_target_pop(graph_with_pop):
     assert abs(part_pop - ideal_pop) / ideal_pop < epsilon
 
 
+def test_bipartition_tree_does_not_use_choice(graph_with_pop):
+    def choice(sequence):
+        raise AssertionError("choice should not be called")
+
+    ideal_pop = sum(graph_with_pop.nodes[node]["pop"] for node in graph_with_pop) / 2
+    result = bipartition_tree(graph_with_pop, "pop", ideal_pop, 0.25, 10, choice=choice)
+    assert all(node in graph_with_pop.nodes for node in result)
+
+
 def test_random_spanning_tree_returns_tree_with_pop_attribute(graph_with_pop):
     tree = random_spanning_tree(graph_with_pop, "pop")
     assert networkx.is_tree(tree)
@@ -50,6 +64,12 @@ def test_random_spanning_tree_returns_tree_with_pop_attribute(graph_with_pop):
         assert tree.nodes[node]["pop"] == graph_with_pop.nodes[node]["pop"]
 
 
+def test_random_spanning_tree_does_not_change_the_graph(graph_with_pop):
+    tree = random_spanning_tree(graph_with_pop, "pop")
+    assert networkx.is_tree(tree)
+    assert all("weight" not in data for _, _, data in graph_with_pop.edges(data=True))
+
+
 def test_bipartition_tree_returns_a_tree(graph_with_pop):
     ideal_pop = sum(graph_with_pop.nodes[node]["pop"] for node in graph_with_pop) / 2
     tree = networkx.Graph(
@@ -68,6 +88,63 @@ def test_bipartition_tree_returns_a_tree(graph_with_pop):
     )
 
 
+def test_bipartition_tree_raises_after_max_attempts(graph_with_pop):
+    stats = BipartitionStats()
+    with pytest.raises(BipartitionError):
+        bipartition_tree(graph_with_pop, "pop", 4.5, 0.01, 2, max_attempts=5, stats=stats)
+
+    assert stats.trees == 5
+    assert stats.balanced_edges == 0
+
+
+def test_bipartition_tree_raises_after_time_limit(graph_with_pop):
+    with pytest.raises(BipartitionError):
+        bipartition_tree(graph_with_pop, "pop", 4.5, 0.01, 2, time_limit=0)
+
+
+def test_bipartition_tree_gives_up_by_default_when_there_is_no_balanced_cut():
+    graph = networkx.path_graph(6)
+    for node in graph:
+        graph.nodes[node]["pop"] = 1
+
+    with pytest.raises(BipartitionError):
+        bipartition_tree(graph, "pop", 2.5, 0.01, 1)
+
+
+def test_bipartition_tree_counts_its_work(graph_with_pop):
+    stats = BipartitionStats()
+    for _ in range(3):
+        bipartition_tree(graph_with_pop, "pop", 4.5, 0.25, 10, stats=stats)
+
+    assert stats.calls == 3
+    assert stats.trees >= 3
+    assert stats.balanced_edges >= 3
+
+
+def test_find_balanced_edge_cuts_finds_every_balanced_edge():
+    path = networkx.path_graph(10)
+    for node in path:
+        path.nodes[node]["pop"] = 1
+
+    cuts = find_balanced_edge_cuts(path, 0, "pop", 5, 0.3)
+    assert len(cuts) == 3
+    assert {frozenset(edge) for edge in cuts} == {
+        frozenset(edge) for edge in [(3, 4), (4, 5), (5, 6)]
+    }
+    assert subtree_nodes(path, (5, 4)) == {5, 6, 7, 8, 9}
+
+
+def test_find_balanced_edge_cuts_does_not_depend_on_the_root():
+    path = networkx.path_graph(10)
+    for node in path:
+        path.nodes[node]["pop"] = 1
+
+    for root in path:
+        cuts = find_balanced_edge_cuts(path, root, "pop", 3, 0.2)
+        assert sorted(cuts) == [(2, 3), (7, 6)]
+        assert [len(subtree_nodes(path, edge)) for edge in sorted(cuts)] == [3, 3]
+
+
 def test_recom_works_as_a_proposal(partition_with_pop):
     graph = partition_with_pop.graph
     ideal_pop = sum(graph.nodes[node]["pop"] for node in graph) / 2
@@ -80,3 +157,47 @@ def test_recom_works_as_a_proposal(partition_with_pop):
 
     for state in chain:
         assert contiguous(state)
+
+
+def test_uniform_spanning_tree_returns_tree_with_pop_attribute(graph_with_pop):
+    tree = uniform_spanning_tree(graph_with_pop, "pop")
+    assert networkx.is_tree(tree)
+    assert set(tree.nodes) == set(graph_with_pop.nodes)
+    for node in tree:
+        assert tree.nodes[node]["pop"] == graph_with_pop.nodes[node]["pop"]
+
+
+def test_uniform_spanning_tree_draws_every_tree_equally_often():
+    # K4 minus an edge has 8 spanning trees
+    graph = networkx.complete_graph(4)
+    graph.remove_edge(0, 1)
+    for node in graph:
+        graph.nodes[node]["pop"] = 1
+
+    random.seed(2022)
+    counts = collections.Counter(
+        frozenset(frozenset(edge) for edge in uniform_spanning_tree(graph, "pop").edges)
+        for _ in range(4000)
+    )
+
+    assert len(counts) == 8
+    assert all(400 < count < 600 for count in counts.values())
+
+
+def test_recom_accepts_a_spanning_tree_function(partition_with_pop):
+    graph = partition_with_pop.graph
+    ideal_pop = sum(graph.nodes[node]["pop"] for node in graph) / 2
+    proposal = functools.partial(
+        recom,
+        pop_col="pop",
+        pop_target=ideal_pop,
+        epsilon=0.25,
+        node_repeats=5,
+        spanning_tree_fn=uniform_spanning_tree,
+    )
+    constraints = [within_percent_of_ideal_population(partition_with_pop, 0.25, "pop")]
+
+    chain = MarkovChain(proposal, constraints, lambda x: True, partition_with_pop, 50)
+
+    for state in chain:
+        assert contiguous(state)
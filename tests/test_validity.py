@@ -1,3 +1,5 @@
+import threading
+import time
 from unittest.mock import MagicMock
 
 import networkx as nx
@@ -140,6 +142,50 @@ def test_validator_raises_TypeError_if_constraint_returns_non_boolean():
         validator(mock_partition)
 
 
+def test_adaptive_validator_checks_cheap_and_often_failing_constraints_first():
+    calls = []
+
+    def slow_constraint(partition):
+        calls.append("slow")
+        time.sleep(0.001)
+        return True
+
+    def failing_constraint(partition):
+        calls.append("failing")
+        return partition % 2 == 0
+
+    validator = Validator([slow_constraint, failing_constraint], adaptive=True, reorder_every=10)
+    results = [validator(i) for i in range(40)]
+
+    assert results == [i % 2 == 0 for i in range(40)]
+    assert validator.constraints == [slow_constraint, failing_constraint]
+    assert validator.learned_order == [failing_constraint, slow_constraint]
+    assert calls[-3:] == ["failing", "slow", "failing"]
+
+
+def test_adaptive_validator_is_not_confused_by_reordering_in_another_thread():
+    def slow_constraint(partition):
+        if partition == 1:
+            # The other thread's check reorders the constraints while this
+            # check is still going through them.
+            thread = threading.Thread(target=validator, args=(2,))
+            thread.start()
+            thread.join()
+        else:
+            time.sleep(0.01)
+        return True
+
+    def odd_constraint(partition):
+        return partition % 2 == 0
+
+    validator = Validator([slow_constraint, odd_constraint], adaptive=True, reorder_every=4)
+    assert validator(0) and validator(0)
+
+    assert not validator(1)
+    assert validator.learned_order == [odd_constraint, slow_constraint]
+    assert validator._calls == [4, 4]
+
+
 def test_no_vanishing_districts_works():
     parent = MagicMock()
     parent.assignment = get_assignment({1: 1, 2: 2}, MagicMock())